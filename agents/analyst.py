@@ -1,19 +1,24 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage, SystemMessage
+import re
+from typing import List
 
+from langchain_core.messages import HumanMessage, SystemMessage
 
-class AnalystAgent:
-    def __init__(self, llm, tools):
-        self.llm = llm
-        self.tools = {tool.name: tool for tool in tools}
-        self.name = "Analyst"
-        self.role = "Data analysis and calculation specialist"
-    
-    def execute(self, user_query: str, state: dict) -> dict:
-        """Execute analyst tasks - analyze data and perform calculations"""
-        
-        # System prompt for the analyst
-        system_prompt = """
+from agents.base import BaseAgent
+from utils.context import fit_context
+from utils.facts import MARKET_CAP, PE_RATIO, PERCENT_CHANGE, extract_facts
+from utils.tracing import span
+
+# Values handed to the calculator's general analysis (statistics run vectorized)
+MAX_ANALYSIS_VALUES = 50
+
+_NUMBER = re.compile(r'\d+\.?\d*')
+# Calculator phrasing for each calculation kind
+_REQUESTS = {PE_RATIO: "P/E ratio", PERCENT_CHANGE: "percentage change", MARKET_CAP: "market cap"}
+
+
+class AnalystAgent(BaseAgent):
+    # System prompt for the analyst
+    SYSTEM_PROMPT = """
         You are an Analysis Agent specialized in data analysis and calculations.
         Your role is to analyze the information provided by the researcher and perform relevant calculations.
 
@@ -33,80 +38,136 @@ class AnalystAgent:
 
         Be analytical and focus on quantitative insights.
         """
-        
+
+    def __init__(self, llm, tools, limiter=None):
+        super().__init__(llm, tools, limiter)
+        self.name = "Analyst"
+        self.role = "Data analysis and calculation specialist"
+
+    def execute(self, user_query: str, state: dict) -> dict:
+        """Execute analyst tasks - analyze data and perform calculations"""
+
         research_findings = state.get("research_findings", "")
         research_summary = state.get("research_summary", "")
-        
-        # Determine what calculations to perform
-        calc_request = self._identify_calculations(user_query, research_findings)
-        
-        # Use calculator tool
-        calc_tool = self.tools.get("calculator")
-        if calc_tool and calc_request:
-            calculation_results = calc_tool._run(calc_request)
-        else:
-            calculation_results = "No specific calculations needed based on available data"
-        
+
+        calculation_results = self.calculate(user_query, research_findings)
+
         # Generate analysis
-        messages = [
-            SystemMessage(content=system_prompt),
+        filtered_content = self.analyze(user_query, research_findings, research_summary, calculation_results)
+
+        return self._update_state(state, calculation_results, filtered_content)
+
+    async def aexecute(self, user_query: str, state: dict) -> dict:
+        """Async variant of execute() using the tools' _arun and llm.ainvoke"""
+        research_findings = state.get("research_findings", "")
+        research_summary = state.get("research_summary", "")
+
+        calculation_results = await self.acalculate(user_query, research_findings)
+        filtered_content = await self.aanalyze(user_query, research_findings, research_summary, calculation_results)
+
+        return self._update_state(state, calculation_results, filtered_content)
+
+    def calculate(self, user_query: str, research_findings: str) -> str:
+        """Run the calculator on the raw findings (needs no research summary)"""
+        calc_tool = self.tools.get("calculator")
+        if not calc_tool:
+            return "No specific calculations needed based on available data"
+        facts = extract_facts(research_findings)
+        calculations = self._identify_calculations(user_query, research_findings)
+        with span("tool", "calculator"):
+            if facts and hasattr(calc_tool, "calculate_facts"):
+                # Typed figures go straight to the calculator, no text round-trip
+                return calc_tool.calculate_facts(facts, calculations)
+            return calc_tool._run(self._calculation_request(calculations, research_findings))
+
+    async def acalculate(self, user_query: str, research_findings: str) -> str:
+        calc_tool = self.tools.get("calculator")
+        if not calc_tool:
+            return "No specific calculations needed based on available data"
+        facts = extract_facts(research_findings)
+        calculations = self._identify_calculations(user_query, research_findings)
+        with span("tool", "calculator"):
+            if facts and hasattr(calc_tool, "calculate_facts"):
+                return calc_tool.calculate_facts(facts, calculations)
+            return await calc_tool._arun(self._calculation_request(calculations, research_findings))
+
+    def analyze(self, user_query: str, research_findings: str, research_summary: str,
+                calculation_results: str) -> str:
+        """Generate analytical insights with the LLM"""
+        messages = self._build_messages(user_query, research_findings, research_summary, calculation_results)
+        return self._invoke_llm(messages)
+
+    async def aanalyze(self, user_query: str, research_findings: str, research_summary: str,
+                       calculation_results: str) -> str:
+        messages = self._build_messages(user_query, research_findings, research_summary, calculation_results)
+        return await self._ainvoke_llm(messages)
+
+    def _build_messages(self, user_query: str, research_findings: str, research_summary: str,
+                        calculation_results: str) -> list:
+        """Build the analysis prompt for the LLM"""
+        # Raw findings count half against the budget once a summary condenses them
+        context = fit_context(
+            self.name.lower(),
+            {"research_findings": research_findings, "research_summary": research_summary,
+             "calculation_results": calculation_results},
+            weights={"research_findings": 0.5} if research_summary else None,
+            covered_by={"research_findings": ("research_summary",)},
+        )
+        research_findings, research_summary = context["research_findings"], context["research_summary"]
+        calculation_results = context["calculation_results"]
+        # In the parallel graph the summary is produced concurrently and is
+        # not available yet, so the line is left out rather than sent empty
+        summary_line = f"Research Summary: {research_summary}\n            " if research_summary else ""
+        return [
+            SystemMessage(content=self.SYSTEM_PROMPT),
             HumanMessage(content=f"""
             User Query: {user_query}
             Research Findings: {research_findings}
-            Research Summary: {research_summary}
-            Calculation Results: {calculation_results}
-            
+            {summary_line}Calculation Results: {calculation_results}
+
             Please provide analytical insights and identify key metrics or trends.
             """)
         ]
-        
-        from utils.security import OutputFilter
-        response = self.llm.invoke(messages)
-        filtered_content = OutputFilter().filter_output(getattr(response, "content", ""))
-        
-        # Update state with analysis results
+
+    def _update_state(self, state: dict, calculation_results: str, insights: str) -> dict:
+        """Update state with analysis results"""
         state["calculation_results"] = calculation_results
-        state["analysis_insights"] = filtered_content
+        state["analysis_insights"] = insights
         state["current_agent"] = "analyst"
-        
+
         return state
-    
-    def _identify_calculations(self, query: str, research_data: str) -> str:
-        """Identify what calculations should be performed"""
+
+    def _identify_calculations(self, query: str, research_data: str) -> List[str]:
+        """Identify what calculations should be performed (utils.facts kinds,
+        or "analysis" when nothing specific is asked for)"""
         calculations = []
-        
+
         query_lower = query.lower()
         data_lower = research_data.lower()
-        
-        # Extract numbers from research data
-        import re
-        numbers = re.findall(r'\d+\.?\d*', research_data)
-        
+
         # Look for specific financial calculations
         if "p/e" in query_lower or "pe ratio" in query_lower or "p/e" in data_lower:
-            if len(numbers) >= 2:
-                calculations.append(f"P/E ratio calculation with values {numbers[0]} {numbers[1]}")
-            else:
-                calculations.append("P/E ratio analysis")
-        
+            calculations.append(PE_RATIO)
         if "percentage" in query_lower or "change" in query_lower or "%" in data_lower:
-            if len(numbers) >= 2:
-                calculations.append(f"percentage change calculation {numbers[0]} {numbers[1]}")
-            else:
-                calculations.append("percentage change calculation")
-        
+            calculations.append(PERCENT_CHANGE)
         if "market cap" in query_lower or "valuation" in query_lower:
-            if len(numbers) >= 2:
-                calculations.append(f"market cap calculation {numbers[0]} {numbers[1]}")
+            calculations.append(MARKET_CAP)
+
+        return calculations or ["analysis"]
+
+    def _calculation_request(self, calculations: List[str], research_data: str) -> str:
+        """Text request for calculators without calculate_facts(), or when no
+        typed facts were found in the findings"""
+        numbers = _NUMBER.findall(research_data)
+        requests = []
+        for calculation in calculations:
+            if calculation == "analysis":
+                if numbers:
+                    requests.append(f"analysis of values: {', '.join(numbers[:MAX_ANALYSIS_VALUES])}")
+                else:
+                    requests.append("general financial analysis of available data")
+            elif len(numbers) >= 2:
+                requests.append(f"{_REQUESTS[calculation]} calculation {numbers[0]} {numbers[1]}")
             else:
-                calculations.append("market cap analysis")
-        
-        # If we have numbers but no specific calculation type, do general analysis
-        if numbers and not calculations:
-            calculations.append(f"analysis of values: {', '.join(numbers[:5])}")
-        
-        # Default analysis if no specific calculations identified
-        if not calculations:
-            calculations.append("general financial analysis of available data")
-        
-        return "; ".join(calculations)
+                requests.append(f"{_REQUESTS[calculation]} analysis")
+        return "; ".join(requests)
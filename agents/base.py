@@ -0,0 +1,120 @@
+import asyncio
+
+from utils.concurrency import StageLimiter
+from utils.security import output_filter
+from utils.singleflight import SingleFlight
+from utils.streaming import chunk_text, current_token_sink
+from utils.tracing import current_trace, estimate_prompt_tokens, estimate_tokens, span
+
+
+# Identical prompts to the same model in flight at once share one request
+_LLM_FLIGHTS = SingleFlight("llm")
+
+
+class BaseAgent:
+    """Shared plumbing for the three agents: tool lookup and LLM calls."""
+
+    def __init__(self, llm, tools, limiter: StageLimiter = None):
+        self.llm = llm
+        self.tools = {tool.name: tool for tool in tools}
+        # Per-stage concurrency caps shared across agents (unlimited by default)
+        self.limiter = limiter or StageLimiter()
+
+    def _invoke_llm(self, messages) -> str:
+        """Call the LLM synchronously and return the filtered response text.
+
+        While a token sink is active (workflow streaming) the response is
+        streamed chunk by chunk via llm.stream, redacted on the fly so the
+        sink never sees sensitive values. Identical non-streaming calls
+        already in flight are joined rather than repeated.
+        """
+        on_token = current_token_sink()
+        if on_token is not None and hasattr(self.llm, "stream"):
+            return self._call_llm(messages, on_token)
+        return _LLM_FLIGHTS.do(self._flight_key(messages), lambda: self._call_llm(messages, None), self._joined)
+
+    def _call_llm(self, messages, on_token) -> str:
+        with self.limiter.limit("llm"), span("llm", self.name.lower()) as event:
+            usage = None
+            if on_token is not None:
+                parts, redactor, emitted = [], output_filter.stream(), []
+                for chunk in self.llm.stream(messages):
+                    text = chunk_text(chunk)
+                    parts.append(text)
+                    self._emit(on_token, redactor.feed(text), emitted)
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                self._emit(on_token, redactor.flush(), emitted)
+                content = "".join(parts)
+                self._count_tokens(event, messages, content, usage)
+                return output_filter.truncate("".join(emitted))
+            response = self.llm.invoke(messages)
+            content = getattr(response, "content", "")
+            usage = getattr(response, "usage_metadata", None)
+            self._count_tokens(event, messages, content, usage)
+        return output_filter.filter_output(content)
+
+    async def _ainvoke_llm(self, messages) -> str:
+        """Call the LLM without blocking the event loop"""
+        on_token = current_token_sink()
+        if on_token is not None and hasattr(self.llm, "astream"):
+            return await self._acall_llm(messages, on_token)
+        return await _LLM_FLIGHTS.ado(self._flight_key(messages), lambda: self._acall_llm(messages, None),
+                                      self._joined)
+
+    async def _acall_llm(self, messages, on_token) -> str:
+        async with self.limiter.alimit("llm"):
+            with span("llm", self.name.lower()) as event:
+                usage = None
+                if on_token is not None:
+                    parts, redactor, emitted = [], output_filter.stream(), []
+                    async for chunk in self.llm.astream(messages):
+                        text = chunk_text(chunk)
+                        parts.append(text)
+                        self._emit(on_token, redactor.feed(text), emitted)
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                    self._emit(on_token, redactor.flush(), emitted)
+                    content = "".join(parts)
+                    self._count_tokens(event, messages, content, usage)
+                    return output_filter.truncate("".join(emitted))
+                if hasattr(self.llm, "ainvoke"):
+                    response = await self.llm.ainvoke(messages)
+                else:
+                    # Sync-only LLMs (e.g. test stubs) run in a worker thread
+                    response = await asyncio.to_thread(self.llm.invoke, messages)
+                content = getattr(response, "content", "")
+                usage = getattr(response, "usage_metadata", None)
+                self._count_tokens(event, messages, content, usage)
+        return output_filter.filter_output(content)
+
+    def _joined(self):
+        """Trace event for a call answered by another run's in-flight request:
+        an "llm" event marked coalesced, timed over the wait"""
+        return span("llm", self.name.lower(), coalesced=True)
+
+    def _flight_key(self, messages):
+        """Model settings plus the exact prompt. Clients without a model name
+        (e.g. test stubs) only coalesce with calls on the same instance."""
+        llm = self.llm
+        model = getattr(llm, "model", None) or getattr(llm, "model_name", None)
+        identity = (type(llm).__qualname__, model, getattr(llm, "temperature", None)) if model else id(llm)
+        return identity, tuple((type(m).__name__, str(getattr(m, "content", ""))) for m in messages)
+
+    @staticmethod
+    def _emit(on_token, text: str, emitted: list) -> None:
+        """Forward already-redacted text to the token sink"""
+        if text:
+            emitted.append(text)
+            on_token(text)
+
+    def _count_tokens(self, event: dict, messages, content, usage) -> None:
+        """Attach prompt/completion token counts to a trace event, estimating
+        them from the text when the model reports no usage metadata"""
+        if current_trace() is None:
+            return
+        if isinstance(usage, dict) and "input_tokens" in usage:
+            event["prompt_tokens"] = usage.get("input_tokens", 0)
+            event["completion_tokens"] = usage.get("output_tokens", 0)
+            return
+        event["prompt_tokens"] = estimate_prompt_tokens(messages)
+        event["completion_tokens"] = estimate_tokens(content if isinstance(content, str) else "")
+        event["tokens_estimated"] = True
@@ -1,19 +1,13 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 
+from agents.base import BaseAgent
+from utils.context import fit_context
+from utils.tracing import span
 
-class ReporterAgent:
-    def __init__(self, llm, tools):
-        self.llm = llm
-        self.tools = {tool.name: tool for tool in tools}
-        self.name = "Reporter"
-        self.role = "Report generation and documentation specialist"
-    
-    def execute(self, user_query: str, state: dict) -> dict:
-        """Execute reporter tasks - generate final reports and save results"""
-        
-        # System prompt for the reporter
-        system_prompt = """
+
+class ReporterAgent(BaseAgent):
+    # System prompt for the reporter
+    SYSTEM_PROMPT = """
         You are a Report Agent specialized in creating comprehensive reports and documentation.
         Your role is to synthesize all the information from research and analysis into a final report.
 
@@ -33,64 +27,99 @@ class ReporterAgent:
 
         Make your reports professional, clear, and actionable.
         """
-        
-        research_findings = state.get("research_findings", "")
-        research_summary = state.get("research_summary", "")
-        calculation_results = state.get("calculation_results", "")
-        analysis_insights = state.get("analysis_insights", "")
-        
+
+    def __init__(self, llm, tools, limiter=None):
+        super().__init__(llm, tools, limiter)
+        self.name = "Reporter"
+        self.role = "Report generation and documentation specialist"
+
+    def execute(self, user_query: str, state: dict) -> dict:
+        """Execute reporter tasks - generate final reports and save results"""
+
         # Generate comprehensive report
-        messages = [
-            SystemMessage(content=system_prompt),
+        final_report = self._invoke_llm(self._build_messages(user_query, state))
+
+        # Save report to file
+        file_tool = self.tools.get("file_processor")
+        if file_tool:
+            filename = self._generate_filename(user_query)
+            with span("tool", "file_write"):
+                save_result = file_tool._run("create_report", filename, final_report, query=user_query)
+        else:
+            save_result = "File tool not available - report not saved"
+
+        return self._update_state(state, final_report, save_result)
+
+    async def aexecute(self, user_query: str, state: dict) -> dict:
+        """Async variant of execute() using the tools' _arun and llm.ainvoke"""
+        final_report = await self._ainvoke_llm(self._build_messages(user_query, state))
+
+        file_tool = self.tools.get("file_processor")
+        if file_tool:
+            filename = self._generate_filename(user_query)
+            with span("tool", "file_write"):
+                save_result = await file_tool._arun("create_report", filename, final_report, query=user_query)
+        else:
+            save_result = "File tool not available - report not saved"
+
+        return self._update_state(state, final_report, save_result)
+
+    def _build_messages(self, user_query: str, state: dict) -> list:
+        """Build the report prompt from everything gathered upstream"""
+        # The summary and insights already digest the raw findings, so the
+        # findings lose whatever they repeat and get half the budget weight
+        context = fit_context(
+            self.name.lower(),
+            {field: state.get(field) or "" for field in
+             ("research_findings", "research_summary", "calculation_results", "analysis_insights")},
+            weights={"research_findings": 0.5},
+            covered_by={"research_findings": ("research_summary", "analysis_insights")},
+        )
+        research_findings = context["research_findings"]
+        research_summary = context["research_summary"]
+        calculation_results = context["calculation_results"]
+        analysis_insights = context["analysis_insights"]
+
+        return [
+            SystemMessage(content=self.SYSTEM_PROMPT),
             HumanMessage(content=f"""
             User Query: {user_query}
-            
+
             Research Findings: {research_findings}
             Research Summary: {research_summary}
             Calculation Results: {calculation_results}
             Analysis Insights: {analysis_insights}
-            
+
             Please create a comprehensive report that includes:
             1. Executive Summary
             2. Key Findings
             3. Analysis Results
             4. Recommendations/Conclusions
-            
+
             Format it as a professional business report.
             """)
         ]
-        
-        from utils.security import OutputFilter
-        response = self.llm.invoke(messages)
-        final_report = OutputFilter().filter_output(getattr(response, "content", ""))
-        
-        # Save report to file
-        file_tool = self.tools.get("file_processor")
-        if file_tool:
-            filename = self._generate_filename(user_query)
-            save_result = file_tool._run("create_report", filename, final_report)
-        else:
-            save_result = "File tool not available - report not saved"
-        
-        # Update state with final results
+
+    def _update_state(self, state: dict, final_report: str, save_result: str) -> dict:
+        """Update state with final results"""
         state["final_report"] = final_report
         state["save_result"] = save_result
         state["current_agent"] = "reporter"
         state["completed"] = True
-        
+
         return state
-    
+
     def _generate_filename(self, query: str) -> str:
         """Generate a filename based on the query"""
         import re
         from datetime import datetime
-        
+
         # Extract key terms for filename
         clean_query = re.sub(r'[^a-zA-Z0-9\s]', '', query)
         words = clean_query.split()[:3]  # Take first 3 words
         base_name = "_".join(words).lower() if words else "report"
-        
+
         # Add timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
+
         return f"{base_name}_report_{timestamp}.md"
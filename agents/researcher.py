@@ -1,19 +1,20 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage
+from typing import List
+import os
 
+from agents.base import BaseAgent
+from utils.context import fit_context
+from utils.tracing import span
 
-class ResearcherAgent:
-    def __init__(self, llm, tools):
-        self.llm = llm
-        self.tools = {tool.name: tool for tool in tools}
-        self.name = "Researcher"
-        self.role = "Information gatherer and web search specialist"
-    
-    def execute(self, user_query: str, state: dict) -> dict:
-        """Execute researcher tasks - primarily search for information"""
-        
-        # System prompt for the researcher
-        system_prompt = """
+
+# Simple keyword vocabularies - in production, use more sophisticated NLP
+FINANCIAL_TERMS = ["stock", "price", "performance", "analysis", "market", "earnings", "revenue"]
+COMPANY_INDICATORS = ["apple", "microsoft", "google", "amazon", "tesla", "meta", "netflix"]
+
+
+class ResearcherAgent(BaseAgent):
+    # System prompt for the researcher
+    SYSTEM_PROMPT = """
         You are a Research Agent specialized in gathering information.
         Your role is to search for relevant information to answer the user's query.
 
@@ -33,56 +34,116 @@ class ResearcherAgent:
 
         Be thorough but concise in your research.
         """
-        
+
+    def __init__(self, llm, tools, limiter=None, max_searches: int = None):
+        super().__init__(llm, tools, limiter)
+        self.name = "Researcher"
+        self.role = "Information gatherer and web search specialist"
+        # Fan-out budget: maximum number of concurrent sub-searches per query
+        self.max_searches = max_searches or int(os.getenv("RESEARCH_MAX_SEARCHES", "3"))
+
+    def execute(self, user_query: str, state: dict) -> dict:
+        """Execute researcher tasks - primarily search for information"""
+        search_results = self.search(user_query)
+
+        # Generate research summary
+        filtered_content = self.summarize(user_query, search_results)
+
+        return self._update_state(state, search_results, filtered_content)
+
+    async def aexecute(self, user_query: str, state: dict) -> dict:
+        """Async variant of execute() using the tools' _arun and llm.ainvoke"""
+        search_results = await self.asearch(user_query)
+        filtered_content = await self.asummarize(user_query, search_results)
+
+        return self._update_state(state, search_results, filtered_content)
+
+    def search(self, user_query: str) -> str:
+        """Run the search tool for the query (no LLM involved)"""
         # Determine what to search for
-        search_query = self._extract_search_terms(user_query)
-        
-        # Use search tool
+        sub_queries = self._extract_sub_queries(user_query)
+
+        # Use search tool; several sub-queries are dispatched concurrently
         search_tool = self.tools.get("search")
-        if search_tool:
-            search_results = search_tool._run(search_query)
-        else:
-            search_results = "Search tool not available"
-        
-        # Generate research summary
-        messages = [
-            SystemMessage(content=system_prompt),
+        if not search_tool:
+            return "Search tool not available"
+        with self.limiter.limit("search"), span("tool", "search"):
+            if len(sub_queries) > 1 and hasattr(search_tool, "search_many"):
+                return search_tool.search_many(sub_queries)
+            return search_tool._run(sub_queries[0])
+
+    async def asearch(self, user_query: str) -> str:
+        sub_queries = self._extract_sub_queries(user_query)
+
+        search_tool = self.tools.get("search")
+        if not search_tool:
+            return "Search tool not available"
+        async with self.limiter.alimit("search"):
+            with span("tool", "search"):
+                if len(sub_queries) > 1 and hasattr(search_tool, "asearch_many"):
+                    return await search_tool.asearch_many(sub_queries)
+                return await search_tool._arun(sub_queries[0])
+
+    def summarize(self, user_query: str, search_results: str) -> str:
+        """Summarize search results with the LLM"""
+        return self._invoke_llm(self._build_messages(user_query, search_results))
+
+    async def asummarize(self, user_query: str, search_results: str) -> str:
+        return await self._ainvoke_llm(self._build_messages(user_query, search_results))
+
+    def _build_messages(self, user_query: str, search_results: str) -> list:
+        """Build the summarization prompt for the LLM"""
+        search_results = fit_context(self.name.lower(), {"search_results": search_results})["search_results"]
+        return [
+            SystemMessage(content=self.SYSTEM_PROMPT),
             HumanMessage(content=f"""
             User Query: {user_query}
             Search Results: {search_results}
-            
+
             Please summarize the key information found and what should be analyzed next.
             """)
         ]
-        
-        from utils.security import OutputFilter
-        response = self.llm.invoke(messages)
-        filtered_content = OutputFilter().filter_output(getattr(response, "content", ""))
-        
-        # Update state with research findings
+
+    def _update_state(self, state: dict, search_results: str, summary: str) -> dict:
+        """Update state with research findings"""
         state["research_findings"] = search_results
-        state["research_summary"] = filtered_content
+        state["research_summary"] = summary
         state["current_agent"] = "researcher"
-        
+
         return state
-    
+
     def _extract_search_terms(self, query: str) -> str:
         """Extract relevant search terms from user query"""
-        # Simple keyword extraction - in production, use more sophisticated NLP
         keywords = []
-        
-        # Look for company names, stock symbols, financial terms
-        financial_terms = ["stock", "price", "performance", "analysis", "market", "earnings", "revenue"]
-        company_indicators = ["apple", "microsoft", "google", "amazon", "tesla", "meta", "netflix"]
-        
+
         query_lower = query.lower()
-        
-        for term in financial_terms:
+
+        # Look for company names, stock symbols, financial terms
+        for term in FINANCIAL_TERMS:
             if term in query_lower:
                 keywords.append(term)
-        
-        for company in company_indicators:
+
+        for company in COMPANY_INDICATORS:
             if company in query_lower:
                 keywords.append(company)
-        
+
         return " ".join(keywords) if keywords else query
+
+    def _extract_sub_queries(self, query: str) -> List[str]:
+        """Split multi-company questions into one search per company.
+
+        "compare Apple, Microsoft and Tesla" becomes ["apple stock",
+        "microsoft stock", "tesla stock"], capped at `max_searches`. Queries
+        naming zero or one company keep the single combined search.
+        """
+        query_lower = query.lower()
+
+        companies = [c for c in COMPANY_INDICATORS if c in query_lower]
+        if len(companies) <= 1:
+            return [self._extract_search_terms(query)]
+
+        # Keep the order in which companies are mentioned
+        companies.sort(key=query_lower.index)
+        terms = [t for t in FINANCIAL_TERMS if t in query_lower] or ["stock"]
+
+        return [f"{company} {' '.join(terms)}" for company in companies[:self.max_searches]]
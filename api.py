@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Headless HTTP API for the multi-agent workflow.
+
+Queries are queued as jobs and processed by a pool of worker threads that
+share one warm MultiAgentWorkflow. Identical queries already queued or
+running are deduplicated onto the same job, and a full queue answers 429.
+
+    python api.py --port 8000 --workers 4 --max-queue 64
+
+    POST /jobs                {"query": "...", "reuse": true} -> 202 {"job_id", "status", "deduplicated"}
+    GET  /jobs/<id>           job status and progress
+    GET  /jobs/<id>/events    NDJSON stream of node/token events until the job ends
+    GET  /jobs/<id>/report    final report and intermediate results (409 until done)
+    GET  /reports?q=&ticker=&since=&until=&limit=
+                              search saved reports (see reports.py)
+
+/metrics, /healthz and /readyz are served as in utils/health.py.
+"""
+
+import argparse
+import bisect
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from dotenv import load_dotenv
+
+from utils.health import HealthHandler, add_readiness_check
+from utils.metrics import API_JOBS, API_QUEUE_DEPTH
+
+
+# Largest accepted request body
+MAX_BODY_BYTES = 64 * 1024
+# Final-state fields returned by /jobs/<id>/report
+REPORT_FIELDS = (
+    "research_summary",
+    "calculation_results",
+    "analysis_insights",
+    "final_report",
+    "save_result",
+    "timings",
+    "reused_from",
+)
+
+
+class QueueFull(Exception):
+    """Raised by JobManager.submit() when no more jobs can be queued"""
+
+
+class Job:
+    """One queued query and everything observed while it runs"""
+
+    def __init__(self, query: str, reuse: bool = True):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.reuse = reuse
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.current_node: Optional[str] = None
+        self.completed_nodes: List[str] = []
+        # Events in order with their sequence numbers; token events are
+        # dropped once the job ends, so numbers are not list positions
+        self.events: List[Dict[str, Any]] = []
+        self._seqs: List[int] = []
+        self._next_seq = 0
+        self.state: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._changed = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        with self._changed:
+            if event["type"] == "node_start":
+                self.current_node = event["node"]
+            elif event["type"] == "node_end":
+                self.completed_nodes.append(event["node"])
+            self._append(event)
+            self._changed.notify_all()
+
+    def set_status(self, status: str, state: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        with self._changed:
+            self.status = status
+            if status == "running":
+                self.started_at = time.time()
+            else:
+                self.finished_at = time.time()
+                self.current_node = None
+                self.state = state
+                self.error = error
+            self._append({"type": "status", "status": status})
+            if self.done:
+                # Finished jobs stay around for a while; their token stream is
+                # in the report already, so keep only node and status events
+                kept = [i for i, event in enumerate(self.events) if event["type"] != "token"]
+                self.events = [self.events[i] for i in kept]
+                self._seqs = [self._seqs[i] for i in kept]
+            self._changed.notify_all()
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+        self._seqs.append(self._next_seq)
+        self._next_seq += 1
+
+    def wait_events(self, cursor: int, timeout: float) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Events numbered `cursor` and later, waiting up to `timeout` for new
+        ones; also returns the cursor to continue from and whether the job
+        has finished (in which case no events follow)"""
+        with self._changed:
+            if self._next_seq <= cursor and not self.done:
+                self._changed.wait(timeout)
+            start = bisect.bisect_left(self._seqs, cursor)
+            return self.events[start:], self._next_seq, self.done
+
+    def to_dict(self) -> Dict[str, Any]:
+        info = {
+            "job_id": self.id,
+            "query": self.query,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "current_node": self.current_node,
+            "completed_nodes": list(self.completed_nodes),
+        }
+        if self.error is not None:
+            info["error"] = self.error
+        if self.state is not None:
+            info["timings"] = self.state.get("timings")
+            info["save_result"] = self.state.get("save_result")
+        return info
+
+
+class JobManager:
+    """Bounded job queue drained by worker threads sharing one workflow.
+
+    Jobs are kept after they finish (up to `max_finished`, oldest evicted
+    first) so clients can fetch results.
+    """
+
+    def __init__(self, workflow, workers: int = 4, max_queue: int = 64, max_finished: int = 1000):
+        self.workflow = workflow
+        self.max_finished = max_finished
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=max_queue)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, bool], Job] = {}
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"api-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @staticmethod
+    def dedupe_key(query: str, reuse: bool = True) -> Tuple[str, bool]:
+        # reuse=False jobs must not join a run that may answer from an earlier result
+        return " ".join(query.split()).casefold(), reuse
+
+    def submit(self, query: str, reuse: bool = True) -> Tuple[Job, bool]:
+        """Queue a query; returns (job, deduplicated). Raises QueueFull.
+        reuse=False makes a new job run the agents even when the workflow
+        could reuse an earlier answer."""
+        key = self.dedupe_key(query, reuse)
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None:
+                API_JOBS.inc(outcome="deduplicated")
+                return job, True
+            job = Job(query, reuse)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                API_JOBS.inc(outcome="rejected")
+                raise QueueFull(f"Job queue is full ({self._queue.maxsize} waiting)")
+            self._inflight[key] = job
+            self._jobs[job.id] = job
+            self._evict_finished()
+        API_JOBS.inc(outcome="accepted")
+        API_QUEUE_DEPTH.set(self._queue.qsize())
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers once the jobs already queued have run"""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            API_QUEUE_DEPTH.set(self._queue.qsize())
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        job.set_status("running")
+        state, error = None, None
+        try:
+            for event in self.workflow.stream(job.query, reuse=job.reuse):
+                if event["type"] == "final":
+                    state = event["state"]
+                elif event["type"] == "node_end":
+                    # Node updates duplicate the final state; keep the event small
+                    job.add_event({"type": "node_end", "node": event["node"]})
+                else:
+                    job.add_event(event)
+        except Exception as e:
+            error = str(e)
+        with self._lock:
+            self._inflight.pop(self.dedupe_key(job.query, job.reuse), None)
+        if error is None:
+            job.set_status("succeeded", state=state)
+        else:
+            job.set_status("failed", error=error)
+        API_JOBS.inc(outcome=job.status)
+
+
+class APIHandler(HealthHandler):
+    """Job endpoints on top of the metrics/health endpoints"""
+
+    # Streamed event responses end by closing the connection
+    protocol_version = "HTTP/1.0"
+
+    @property
+    def jobs(self) -> JobManager:
+        return self.server.jobs
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0] != "/jobs":
+            return self._send_json(404, {"error": "not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            return self._send_json(413, {"error": "request body too large"})
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            query = body["query"].strip()
+            reuse = body.get("reuse", True)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return self._send_json(400, {"error": 'expected JSON body {"query": "..."}'})
+        if not isinstance(reuse, bool):
+            return self._send_json(400, {"error": "reuse must be true or false"})
+        if not query:
+            return self._send_json(400, {"error": "query must not be empty"})
+
+        try:
+            job, deduplicated = self.jobs.submit(query, reuse)
+        except QueueFull as e:
+            return self._send_json(429, {"error": str(e)}, {"Retry-After": "5"})
+        self._send_json(202, {"job_id": job.id, "status": job.status, "deduplicated": deduplicated},
+                        {"Location": f"/jobs/{job.id}"})
+
+    def do_GET(self):
+        path, _, params = self.path.partition("?")
+        parts = path.strip("/").split("/")
+        if parts == ["reports"]:
+            return self._search_reports(parse_qs(params))
+        if parts[0] != "jobs" or len(parts) not in (2, 3):
+            return super().do_GET()
+        job = self.jobs.get(parts[1])
+        if job is None:
+            return self._send_json(404, {"error": "unknown job"})
+
+        if len(parts) == 2:
+            return self._send_json(200, job.to_dict())
+        if parts[2] == "events":
+            return self._stream_events(job, include_tokens="tokens=0" not in params.split("&"))
+        if parts[2] == "report":
+            if not job.done:
+                return self._send_json(409, {"error": "job has not finished", "status": job.status})
+            if job.status == "failed":
+                return self._send_json(200, job.to_dict())
+            report = {field: job.state.get(field) for field in REPORT_FIELDS}
+            return self._send_json(200, dict(job.to_dict(), **report))
+        self._send_json(404, {"error": "not found"})
+
+    def _search_reports(self, params: Dict[str, List[str]]) -> None:
+        from utils.report_index import index_for
+
+        index = index_for(Path(os.getenv("OUTPUT_DIR", "./outputs")).resolve())
+        if index is None:
+            return self._send_json(404, {"error": "report index is disabled"})
+        def value(name: str) -> Optional[str]:
+            return (params.get(name) or [None])[0]
+
+        try:
+            hits = index.search(value("q"), ticker=value("ticker"),
+                                since=float(value("since")) if value("since") else None,
+                                until=float(value("until")) if value("until") else None,
+                                limit=max(1, min(int(value("limit") or 20), 100)))
+        except ValueError:
+            return self._send_json(400, {"error": "since/until must be epoch seconds and limit an integer"})
+        self._send_json(200, {"reports": [hit._asdict() for hit in hits]})
+
+    def _stream_events(self, job: Job, include_tokens: bool) -> None:
+        """Write the job's events as NDJSON, following it until it finishes"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        cursor = 0
+        try:
+            while True:
+                events, cursor, done = job.wait_events(cursor, timeout=15)
+                lines = [json.dumps(e, ensure_ascii=False) for e in events
+                         if include_tokens or e["type"] != "token"]
+                # An empty line doubles as a keep-alive while nothing happens
+                self.wfile.write(("\n".join(lines) + "\n").encode("utf-8"))
+                self.wfile.flush()
+                if done:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def _send_json(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def create_server(workflow, host: str = "0.0.0.0", port: int = 8000, workers: int = 4,
+                  max_queue: int = 64) -> ThreadingHTTPServer:
+    """Build the API server around a JobManager (call serve_forever() to run it)"""
+    server = ThreadingHTTPServer((host, port), APIHandler)
+    server.daemon_threads = True
+    server.jobs = JobManager(workflow, workers=workers, max_queue=max_queue)
+    add_readiness_check("api_queue", lambda: (server.jobs.queue_depth() < max_queue,
+                                              f"{server.jobs.queue_depth()}/{max_queue} queued"))
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the multi-agent workflow over HTTP")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=4, help="Jobs processed at once")
+    parser.add_argument("--max-queue", type=int, default=64, help="Queued jobs before answering 429")
+    parser.add_argument("--search-concurrency", type=int, default=None, help="Concurrent search calls")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="Concurrent LLM calls")
+    parser.add_argument("--parallel", action="store_true", help="Use the parallel fan-out graph")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if not os.getenv("GOOGLE_API_KEY"):
+        print("❌ Error: GOOGLE_API_KEY not found in environment variables", file=sys.stderr)
+        sys.exit(1)
+
+    from workflow import MultiAgentWorkflow
+
+    workflow = MultiAgentWorkflow(
+        verbose=False,
+        stage_limits={"search": args.search_concurrency, "llm": args.llm_concurrency},
+        parallel=args.parallel,
+    )
+    server = create_server(workflow, args.host, args.port, args.workers, args.max_queue)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.jobs.close(timeout=30)
+        workflow.close(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Batch runner for the multi-agent workflow.
+
+Reads one query per line from a file (or stdin), runs them concurrently
+through a single shared workflow and streams one JSON object per finished
+query. Aggregate throughput and latency stats are printed to stderr.
+
+    python batch.py queries.txt -o results.jsonl --max-concurrency 16
+    cat queries.txt | python batch.py - --llm-concurrency 8 --search-concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Iterator, TextIO
+
+from dotenv import load_dotenv
+from workflow import MultiAgentWorkflow, BatchStats
+
+
+# Final-state fields included in each JSONL record
+RESULT_FIELDS = (
+    "research_summary",
+    "calculation_results",
+    "analysis_insights",
+    "final_report",
+    "save_result",
+    "timings",
+    "reused_from",
+)
+
+
+def read_queries(stream: TextIO) -> Iterator[str]:
+    """Yield non-empty, non-comment lines as queries"""
+    for line in stream:
+        query = line.strip()
+        if query and not query.startswith("#"):
+            yield query
+
+
+def to_record(result: dict) -> dict:
+    """Flatten a batch result into a JSON-serializable record"""
+    record = {
+        "index": result["index"],
+        "query": result["query"],
+        "ok": result["ok"],
+        "latency_s": round(result["latency_s"], 3),
+    }
+    if result["ok"]:
+        state = result["state"]
+        for field in RESULT_FIELDS:
+            record[field] = state.get(field)
+    else:
+        record["error"] = result["error"]
+    return record
+
+
+async def stream_batch(workflow: MultiAgentWorkflow, source: TextIO, sink: TextIO,
+                       max_concurrency: int, reuse: bool = True) -> dict:
+    """Write a JSONL record per finished query and return the batch stats"""
+    stats = BatchStats()
+    async for result in workflow.arun_batch(read_queries(source), max_concurrency, reuse):
+        stats.add(result)
+        sink.write(json.dumps(to_record(result), ensure_ascii=False) + "\n")
+        sink.flush()
+    return stats.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many queries through the multi-agent workflow")
+    parser.add_argument("input", nargs="?", default="-", help="Query file, one per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout)")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Queries in flight at once")
+    parser.add_argument("--search-concurrency", type=int, default=None, help="Concurrent search calls")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="Concurrent LLM calls")
+    parser.add_argument("--parallel", action="store_true", help="Use the parallel fan-out graph")
+    parser.add_argument("--no-reuse", action="store_true",
+                        help="Always run the agents, even with WORKFLOW_REUSE=1")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if not os.getenv("GOOGLE_API_KEY"):
+        print("❌ Error: GOOGLE_API_KEY not found in environment variables", file=sys.stderr)
+        sys.exit(1)
+
+    workflow = MultiAgentWorkflow(
+        verbose=False,
+        stage_limits={"search": args.search_concurrency, "llm": args.llm_concurrency},
+        parallel=args.parallel,
+    )
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = asyncio.run(stream_batch(workflow, source, sink, args.max_concurrency, not args.no_reuse))
+    finally:
+        workflow.close()
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
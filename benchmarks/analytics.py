@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark for utils.analytics.summarize_many against a pure-Python loop
+computing the same core statistics (returns, volatility, drawdown, growth)
+series by series.
+
+    python benchmarks/analytics.py                   # 200 series x 10 years of daily prices
+    python benchmarks/analytics.py --series 1000 --length 252
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.analytics import summarize_many  # noqa: E402
+
+
+def python_summary(prices):
+    returns = [b / a - 1 for a, b in zip(prices, prices[1:])]
+    peak, worst = prices[0], 0.0
+    for price in prices:
+        peak = max(peak, price)
+        worst = min(worst, price / peak - 1)
+    return {
+        "mean": statistics.fmean(prices),
+        "total_return": prices[-1] / prices[0] - 1,
+        "volatility": statistics.stdev(returns),
+        "max_drawdown": worst,
+        "period_growth": (prices[-1] / prices[0]) ** (1 / (len(prices) - 1)) - 1,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=200)
+    parser.add_argument("--length", type=int, default=2520, help="Values per series")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    paths = 100 * np.cumprod(1 + rng.normal(0.0003, 0.012, (args.series, args.length)), axis=1)
+    series = {f"S{i}": row.tolist() for i, row in enumerate(paths)}
+
+    start = time.perf_counter()
+    expected = {name: python_summary(prices) for name, prices in series.items()}
+    python_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summaries = summarize_many(series, periods_per_year=252)
+    numpy_s = time.perf_counter() - start
+
+    for name, stats in expected.items():
+        for key, value in stats.items():
+            assert abs(summaries[name][key] - value) < 1e-9 * max(1.0, abs(value)), (name, key)
+    print(f"{args.series} series x {args.length} values")
+    print(f"  pure Python loop      {python_s * 1000:9.1f} ms")
+    print(f"  summarize_many        {numpy_s * 1000:9.1f} ms  {python_s / numpy_s:5.1f}x "
+          f"(includes list -> array conversion and more statistics)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
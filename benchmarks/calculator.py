@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for utils.expression (CalculatorTool's engine).
+
+Generates random arithmetic expressions and reports expressions per second
+for a cold compile+evaluate of each distinct expression, for re-evaluating
+them from the compiled-expression cache, and for CalculatorTool._run. For
+reference it also times Python's eval() with builtins disabled (what the
+calculator used before; not safe, shown only as a yardstick).
+
+    python benchmarks/calculator.py                # 5000 expressions
+    python benchmarks/calculator.py -n 20000 --seed 1
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.calc_tool import CalculatorTool  # noqa: E402
+from utils.expression import compile_expression, evaluate  # noqa: E402
+
+EVAL_NAMESPACE = {"__builtins__": {}, "sqrt": math.sqrt, "log": math.log, "abs": abs}
+
+
+def random_expression(rng: random.Random, depth: int = 0) -> str:
+    if depth > 3 or rng.random() < 0.3:
+        return str(rng.choice([rng.randint(1, 999), round(rng.uniform(0.5, 500), 2)]))
+    roll = rng.random()
+    if roll < 0.1:
+        return f"sqrt({random_expression(rng, depth + 1)})"
+    if roll < 0.2:
+        return f"({random_expression(rng, depth + 1)})"
+    op = rng.choice(["+", "-", "*", "/"])
+    return f"{random_expression(rng, depth + 1)} {op} {random_expression(rng, depth + 1)}"
+
+
+def rate(fn: Callable[[str], object], expressions: List[str]) -> float:
+    start = time.perf_counter()
+    for text in expressions:
+        try:
+            fn(text)
+        except Exception:
+            pass
+    return len(expressions) / (time.perf_counter() - start)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--count", type=int, default=5000, help="Distinct expressions")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    expressions = [random_expression(rng) for _ in range(args.count)]
+    compile_expression.cache_clear()
+    cold = rate(evaluate, expressions)
+    # The cache now holds the most recent expressions; re-run those warm
+    warm = expressions[-compile_expression.cache_parameters()["maxsize"]:]
+
+    results = [
+        ("engine, cold (parse + compile + eval)", cold),
+        ("engine, warm (cached compile)", rate(evaluate, warm)),
+        ("CalculatorTool._run (warm)", rate(CalculatorTool()._run, warm)),
+        ("eval() reference (unsafe)", rate(lambda t: eval(t, EVAL_NAMESPACE), expressions)),
+    ]
+    print(f"{args.count} expressions, e.g. {expressions[0]!r}")
+    for label, per_second in results:
+        print(f"  {label:<40} {per_second:12,.0f} expr/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark for prompt budgeting (utils.context) on large search results.
+
+Runs the workflow with a stub LLM and a search tool returning N results,
+with and without context budgeting, and reports the prompt tokens each
+agent sent plus the time spent compacting.
+
+    python benchmarks/context.py                 # 100 results
+    python benchmarks/context.py --results 500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.facts import build_findings  # noqa: E402
+from tools.calc_tool import CalculatorTool  # noqa: E402
+from tools.file_tool import FileTool  # noqa: E402
+from tools.search_tool import SearchTool  # noqa: E402
+from utils.context import fit_context  # noqa: E402
+from workflow import MultiAgentWorkflow  # noqa: E402
+
+
+class _Resp:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class StubLLM:
+    """Answers with a fixed-size text so downstream prompts grow realistically"""
+
+    def invoke(self, messages):
+        return _Resp("Summary of the findings. " * 80)
+
+
+class StubSearch(SearchTool):
+    findings: str = ""
+
+    def _run(self, query: str, run_manager=None) -> str:
+        return self.findings
+
+
+def prompt_tokens(results: int, budgeted: bool) -> dict:
+    os.environ["CONTEXT_BUDGET"] = "1" if budgeted else "0"
+    search = StubSearch(findings=build_findings(results))
+    workflow = MultiAgentWorkflow(llm=StubLLM(), tools=[search, CalculatorTool(), FileTool()],
+                                  verbose=False, llm_cache=False, answer_store=False)
+    by_agent = workflow.run("Analyze Apple stock")["timings"]["llm"]["by_agent"]
+    return {agent: totals["prompt_tokens"] for agent, totals in by_agent.items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=100, help="Search results in the findings")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["OUTPUT_DIR"] = directory
+        full = prompt_tokens(args.results, budgeted=False)
+        budgeted = prompt_tokens(args.results, budgeted=True)
+
+    print(f"{args.results} search results, prompt tokens per agent:")
+    for agent in full:
+        print(f"  {agent:<12} {full[agent]:>9} -> {budgeted[agent]:>7}")
+    print(f"  {'total':<12} {sum(full.values()):>9} -> {sum(budgeted.values()):>7}")
+
+    findings = build_findings(args.results)
+    fields = {"research_findings": findings, "research_summary": "Summary. " * 200, "analysis_insights": findings[:8000]}
+    start = time.perf_counter()
+    for _ in range(20):
+        fit_context("reporter", fields, weights={"research_findings": 0.5},
+                    covered_by={"research_findings": ("research_summary", "analysis_insights")})
+    print(f"  reporter fit_context: {(time.perf_counter() - start) / 20 * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark for utils.facts on large multi-result search outputs.
+
+Compares the analyst's previous approach (re.findall of every number, then
+pairing the first two) with the single-pass typed extraction, cold and from
+the per-findings cache, plus CalculatorTool.calculate_facts() over the result.
+
+    python benchmarks/facts.py                     # 500 results
+    python benchmarks/facts.py --results 5000 -n 10
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.calc_tool import CalculatorTool  # noqa: E402
+from utils.facts import extract_facts, parse_facts  # noqa: E402
+
+TEMPLATE = ("{i}. **{name} ({ticker}) shares**: {name} stock price is ${price:.2f}, {direction} {pct:.1f}% today. "
+            "Market cap: ${cap:.1f}{unit}. P/E ratio: {pe:.1f}. Revenue for 2024 rose on strong demand; "
+            "analysts expect 10-15 new product launches and margins near 45.2%.")
+
+
+def build_findings(results: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for i in range(1, results + 1):
+        ticker = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(4))
+        parts.append(TEMPLATE.format(
+            i=i, name=ticker.title(), ticker=ticker, price=rng.uniform(5, 900),
+            direction=rng.choice(["up", "down"]), pct=rng.uniform(0, 8),
+            cap=rng.uniform(1, 900), unit=rng.choice("TBM"), pe=rng.uniform(5, 90),
+        ))
+    return "Search results for 'benchmark':\n\n" + "\n\n".join(parts)
+
+
+def legacy(findings: str):
+    numbers = re.findall(r'\d+\.?\d*', findings)
+    return numbers[0], numbers[1]
+
+
+def best_of(fn, findings: str, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(findings)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=500, help="Search results in the findings")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    findings = build_findings(args.results)
+    facts = parse_facts(findings)
+    extract_facts(findings)  # warm the cache
+
+    print(f"{args.results} results, {len(findings) / 1024:.0f} KiB, {len(facts)} facts "
+          f"for {len(facts.labels())} labels")
+    for label, fn in (("regex numbers (legacy)", legacy), ("parse_facts (cold)", parse_facts),
+                      ("extract_facts (cached)", extract_facts)):
+        print(f"  {label:<24} {best_of(fn, findings, args.runs):9.2f} ms")
+    calculator = CalculatorTool()
+    print(f"  {'calculate_facts':<24} {best_of(lambda _: calculator.calculate_facts(facts), findings, args.runs):9.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
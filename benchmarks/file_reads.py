@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark for FileTool reads on a large report archive.
+
+Compares reading the whole file (the previous `read` action) with a ranged
+read of the tail, a line-range read near the end, and streaming the whole
+file through iter_chunks(), with and without the mmap path.
+
+    python benchmarks/file_reads.py              # 64 MiB archive
+    python benchmarks/file_reads.py --mib 256 -n 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import tools.file_tool as file_tool  # noqa: E402
+from tools.file_tool import FileTool  # noqa: E402
+
+LINE = "| {i:>8} | AAPL | $185.50 | up 2.3% | Market cap: $2.9T | P/E ratio: 28.5 — résumé |\n"
+
+
+def build_archive(path: Path, mib: int) -> int:
+    lines, written, i = [], 0, 0
+    with path.open("w", encoding="utf-8") as f:
+        while written < mib * 1024 * 1024:
+            i += 1
+            line = LINE.format(i=i)
+            lines.append(line)
+            written += len(line.encode("utf-8"))
+            if len(lines) == 10_000:
+                f.write("".join(lines))
+                lines = []
+        f.write("".join(lines))
+    return i
+
+
+def best_of(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mib", type=int, default=64, help="Archive size in MiB")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["OUTPUT_DIR"] = directory
+        path = Path(directory).resolve() / "archive.md"
+        lines = build_archive(path, args.mib)
+        size = path.stat().st_size
+        tool = FileTool()
+
+        print(f"{size / 2**20:.0f} MiB, {lines} lines")
+        cases = [
+            ("full read (legacy)", lambda: path.read_text(encoding="utf-8")),
+            ("read last 64 KiB", lambda: tool._run("read", "archive.md", offset=size - 65536, length=65536)),
+            ("read 100 lines at end", lambda: tool._run("read", "archive.md", start_line=lines - 99)),
+        ]
+        for label, fn in cases:
+            print(f"  {label:<28} {best_of(fn, args.runs):9.2f} ms")
+        for label, threshold in (("iter_chunks (read)", 1 << 62), ("iter_chunks (mmap)", 0)):
+            file_tool.MMAP_THRESHOLD = threshold
+            stream = lambda: sum(len(chunk) for chunk in tool.iter_chunks("archive.md"))  # noqa: E731
+            print(f"  {label:<28} {best_of(stream, args.runs):9.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for utils.security.OutputFilter on large reports.
+
+Compares the previous approach (one sub() per compiled pattern) with the combined single-pass filter and with the streaming
+redactor fed in small chunks, on a clean report and on one sprinkled with
+sensitive values.
+
+    python benchmarks/redaction.py                # ~1 MB reports
+    python benchmarks/redaction.py --size 200000 -n 10
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.security import REDACTED, SENSITIVE_PATTERNS, OutputFilter  # noqa: E402
+
+CLEAN_LINE = ("Q4 revenue grew 12.5% to $94.9B while gross margin reached 45.2%; "
+              "services revenue rose 11% year over year (2024-12-28).\n")
+DIRTY_LINE = ("Contact investor.relations@example.com or +1 408-996-1010; "
+              "card 4111 1111 1111 1111, SSN 123-45-6789.\n")
+
+
+def build_report(size: int, dirty_every: int) -> str:
+    lines: List[str] = []
+    total = 0
+    while total < size:
+        line = DIRTY_LINE if dirty_every and len(lines) % dirty_every == 0 else CLEAN_LINE
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)
+
+
+def legacy(text: str) -> str:
+    for pattern in SENSITIVE_PATTERNS:
+        text = pattern.sub(REDACTED, text)
+    return text
+
+
+def streaming(text: str, chunk: int = 16) -> str:
+    redactor = OutputFilter().stream()
+    parts = [redactor.feed(text[i:i + chunk]) for i in range(0, len(text), chunk)]
+    parts.append(redactor.flush())
+    return "".join(parts)
+
+
+def best_of(fn: Callable[[str], str], text: str, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000, help="Report size in characters")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args(argv)
+
+    combined = OutputFilter(max_len=10 ** 12).redact
+    for label, dirty_every in (("clean", 0), ("1 dirty line / 20", 20)):
+        text = build_report(args.size, dirty_every)
+        assert combined(text) == legacy(text) == streaming(text), "filters disagree"
+        print(f"{label} report ({len(text) / 1e6:.1f} MB):")
+        base = best_of(legacy, text, args.runs)
+        for name, fn in (("multi-pass (legacy)", legacy), ("single-pass", combined), ("streaming", streaming)):
+            ms = base if fn is legacy else best_of(fn, text, args.runs)
+            print(f"  {name:<20} {ms:9.1f} ms  {base / ms:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
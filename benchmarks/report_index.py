@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark for utils.report_index on a large outputs directory.
+
+Writes N synthetic reports, indexes them with sync(), then compares search
+latency through the FTS index with scanning every file (the only option
+before the index existed).
+
+    python benchmarks/report_index.py              # 10,000 reports
+    python benchmarks/report_index.py --reports 50000 -n 20
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.report_index import COMPANY_TICKERS, ReportIndex  # noqa: E402
+
+TOPICS = ["earnings", "revenue", "deliveries", "margins", "guidance", "buyback", "dividend", "valuation"]
+FILLER = ("The company reported results broadly in line with expectations. Analysts highlighted "
+          "operating leverage, capital allocation and competitive dynamics across segments. ") * 20
+
+
+def build_reports(directory: Path, count: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    companies = list(COMPANY_TICKERS.items())
+    for i in range(count):
+        company, ticker = rng.choice(companies)
+        topic = rng.choice(TOPICS)
+        stamp = (start + timedelta(minutes=37 * i)).strftime("%Y%m%d_%H%M%S")
+        text = f"# Analysis Report\n\n{company.title()} ({ticker}) {topic} update.\n\n{FILLER}"
+        (directory / f"analyze_{company}_{topic}_report_{stamp}.md").write_text(text)
+
+
+def best_of(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def scan(directory: Path, words) -> list:
+    return [p.name for p in directory.glob("*.md")
+            if all(word in p.read_text(encoding="utf-8").lower() for word in words)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=10_000)
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        build_reports(root, args.reports)
+        index = ReportIndex(root / "index.db")
+        start = time.perf_counter()
+        index.sync(root)
+        print(f"{args.reports} reports, initial sync {time.perf_counter() - start:.1f} s")
+        print(f"  {'incremental sync (no changes)':<34} {best_of(lambda: index.sync(root), 1):9.2f} ms")
+
+        since = datetime(2024, 6, 1).timestamp()
+        cases = [
+            ("text 'tesla deliveries'", lambda: index.search("tesla deliveries")),
+            ("ticker NVDA, newest 20", lambda: index.search(ticker="NVDA")),
+            ("text + ticker + since", lambda: index.search("guidance", ticker="AAPL", since=since)),
+        ]
+        for label, fn in cases:
+            print(f"  {label:<34} {best_of(fn, args.runs):9.2f} ms")
+        print(f"  {'file scan (legacy)':<34} {best_of(lambda: scan(root, ['tesla', 'deliveries']), 1):9.2f} ms")
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
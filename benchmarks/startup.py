@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Startup (import time) benchmark for the entry points.
+
+Imports each module in a fresh interpreter with `python -X importtime`,
+reports the best of several runs plus the slowest imports, and checks the
+result against benchmarks/startup_budget.json: a module over its `max_ms`
+budget, or pulling in one of its `forbidden` heavy packages at import
+time, fails the run (exit code 1).
+
+    python benchmarks/startup.py                # all budgeted modules
+    python benchmarks/startup.py workflow -n 10 --top 15
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BUDGET_PATH = Path(__file__).with_name("startup_budget.json")
+
+# Prints the top-level packages loaded by the import, as JSON on stdout
+PROBE = "import json, sys; __import__({module!r}); print(json.dumps(sorted(sys.modules)))"
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module: str) -> Tuple[float, List[Tuple[str, int, int]], List[str]]:
+    """Import `module` in a fresh interpreter; returns (ms, importtime rows, loaded modules)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    total_us = next(cumulative for name, _, cumulative in reversed(rows) if name == module)
+    return total_us / 1000, rows, json.loads(result.stdout.splitlines()[-1])
+
+
+def forbidden_imports(loaded: List[str], forbidden: List[str]) -> List[str]:
+    return [name for name in forbidden if any(m == name or m.startswith(name + ".") for m in loaded)]
+
+
+def check(module: str, budget: Dict, repeat: int = 5, top: int = 10) -> bool:
+    runs = [measure(module) for _ in range(repeat)]
+    best_ms, rows, loaded = min(runs, key=lambda run: run[0])
+    leaked = forbidden_imports(loaded, budget.get("forbidden", []))
+    max_ms = budget.get("max_ms")
+    ok = not leaked and (max_ms is None or best_ms <= max_ms)
+
+    print(f"{module}: {best_ms:.1f} ms (best of {repeat}, budget {max_ms} ms) {'OK' if ok else 'FAIL'}")
+    slowest = sorted((row for row in rows if row[0] != module), key=lambda row: row[2], reverse=True)[:top]
+    for name, _, cumulative in slowest:
+        print(f"    {cumulative / 1000:8.1f} ms  {name}")
+    if leaked:
+        print(f"    forbidden at import time: {', '.join(leaked)}")
+    return ok
+
+
+def main(argv=None):
+    budgets = json.loads(BUDGET_PATH.read_text(encoding="utf-8"))
+    parser = argparse.ArgumentParser(description="Measure and check entry-point import time")
+    parser.add_argument("modules", nargs="*", default=list(budgets), help="Modules to measure")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args(argv)
+
+    results = [check(module, budgets.get(module, {}), args.repeat, args.top) for module in args.modules]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
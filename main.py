@@ -77,6 +77,7 @@ def main():
                 continue
         
         elif choice == "3":
+            workflow.close()
             print("👋 Thank you for using the Multi-Agent Demo!")
             break
         
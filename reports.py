@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Search the reports saved in OUTPUT_DIR.
+
+Reports are indexed (SQLite FTS5, see utils/report_index.py) as FileTool
+creates them; `sync` indexes files the index has not seen, e.g. reports
+written before the index existed.
+
+    python reports.py search "tesla deliveries" --ticker TSLA --since 2025-01-01
+    python reports.py search --ticker AAPL --limit 5 --json
+    python reports.py sync
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from utils.report_index import ReportIndex, index_for
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def open_index(output_dir: str) -> ReportIndex:
+    index = index_for(Path(output_dir).resolve())
+    if index is None:
+        print("❌ Error: the report index is disabled (REPORT_INDEX=0)", file=sys.stderr)
+        sys.exit(1)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search saved reports")
+    parser.add_argument("--output-dir", default=None, help="Report directory (default: OUTPUT_DIR or ./outputs)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="Find reports by text, ticker and date")
+    search.add_argument("text", nargs="?", default=None, help="Words that must all appear (any order)")
+    search.add_argument("--ticker", default=None, help="Ticker or company name, e.g. TSLA or tesla")
+    search.add_argument("--since", default=None, help="Created at or after this ISO date/time")
+    search.add_argument("--until", default=None, help="Created before this ISO date/time")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--json", action="store_true", help="Print one JSON object per report")
+
+    commands.add_parser("sync", help="Index new or changed report files and drop deleted ones")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    output_dir = args.output_dir or os.getenv("OUTPUT_DIR", "./outputs")
+    index = open_index(output_dir)
+
+    if args.command == "sync":
+        counts = index.sync(output_dir)
+        print(", ".join(f"{count} {name}" for name, count in counts.items()) + f" ({len(index)} indexed)")
+        return 0
+
+    hits = index.search(args.text, ticker=args.ticker, since=_timestamp(args.since),
+                        until=_timestamp(args.until), limit=args.limit)
+    for hit in hits:
+        created = datetime.fromtimestamp(hit.created_at).isoformat(sep=" ", timespec="seconds")
+        if args.json:
+            print(json.dumps(dict(hit._asdict(), created=created), ensure_ascii=False))
+            continue
+        print(f"{created}  {hit.filename}  [{' '.join(hit.tickers)}]  {hit.query}")
+        if hit.snippet:
+            print(f"    {' '.join(hit.snippet.split())}")
+    if not hits and not args.json:
+        print("No matching reports", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Stubs and fixtures shared by the test modules"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.http import reset_http_clients
+
+
+class Resp:
+    """Chat model reply: .content, plus .usage_metadata when given"""
+
+    def __init__(self, content: str, usage_metadata=None):
+        self.content = content
+        self.usage_metadata = usage_metadata
+
+
+class FakeLLM:
+    """Minimal stub to mimic .invoke(messages)->object with .content"""
+
+    def __init__(self, reply: str = "stubbed response"):
+        self.reply = reply
+
+    def invoke(self, messages):
+        # Return a short, deterministic response regardless of messages
+        return Resp(self.reply)
+
+
+class CountingLLM:
+    """Sync-only stub that counts calls and numbers its replies"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return Resp(f"response {self.calls}")
+
+
+class StubSerper:
+    """Local Serper stand-in: fails the first `failures` requests with 503"""
+
+    def __init__(self, failures: int = 0, status: int = 503):
+        self.failures = failures
+        self.status = status
+        self.requests = 0
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                query = json.loads(self.rfile.read(length))["q"]
+                stub.requests += 1
+                stub.client_ports.add(self.client_address[1])
+                if stub.requests <= stub.failures:
+                    code, body = stub.status, b"{}"
+                else:
+                    code = 200
+                    body = json.dumps({"organic": [{"title": f"Result for {query}", "snippet": "ok",
+                                                    "link": "https://stub.example"}]}).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/search"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_env(monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "test_key")
+    monkeypatch.setenv("HTTP_BACKOFF", "0.01")
+    monkeypatch.setenv("HTTP_MAX_RETRIES", "2")
+    reset_http_clients()
+    servers = []
+
+    def start(**kwargs):
+        stub = StubSerper(**kwargs)
+        monkeypatch.setenv("SERPER_URL", stub.url)
+        servers.append(stub)
+        return stub
+
+    yield start
+    for stub in servers:
+        stub.close()
+    reset_http_clients()
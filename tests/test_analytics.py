@@ -0,0 +1,76 @@
+import math
+import statistics
+
+import numpy as np
+import pytest
+
+from tools.calc_tool import CalculatorTool
+from utils import analytics
+
+PRICES = [100.0, 102.0, 101.0, 105.0, 103.0, 108.0, 110.0, 95.0, 99.0, 112.0]
+
+
+def _returns(prices):
+    return [b / a - 1 for a, b in zip(prices, prices[1:])]
+
+
+def test_returns_and_rolling_stats_match_python():
+    returns = _returns(PRICES)
+    np.testing.assert_allclose(analytics.simple_returns(PRICES), returns)
+    np.testing.assert_allclose(analytics.log_returns(PRICES), [math.log(1 + r) for r in returns])
+    np.testing.assert_allclose(analytics.rolling_mean(PRICES, 3),
+                               [statistics.mean(PRICES[i:i + 3]) for i in range(len(PRICES) - 2)])
+    np.testing.assert_allclose(analytics.rolling_volatility(returns, 4),
+                               [statistics.stdev(returns[i:i + 4]) for i in range(len(returns) - 3)])
+
+
+def test_drawdown_and_cagr():
+    assert analytics.max_drawdown(PRICES) == pytest.approx(95 / 110 - 1)
+    assert analytics.drawdown(PRICES)[0] == 0
+    # Doubling over 2 years of monthly data is ~41.4% a year
+    monthly = np.linspace(100, 200, 25)
+    assert analytics.cagr(monthly, periods_per_year=12) == pytest.approx(math.sqrt(2) - 1)
+
+
+def test_functions_work_row_wise_on_matrices():
+    matrix = np.array([PRICES, [p * 2 for p in PRICES], PRICES[::-1]])
+    np.testing.assert_allclose(analytics.max_drawdown(matrix),
+                               [analytics.max_drawdown(row) for row in matrix])
+    assert analytics.rolling_mean(matrix, 5).shape == (3, len(PRICES) - 4)
+
+
+def test_correlation_aligns_on_most_recent_values():
+    names, matrix = analytics.correlation({"a": PRICES, "b": [p * 3 for p in PRICES[2:]], "c": PRICES[::-1]})
+    assert names == ["a", "b", "c"]
+    assert matrix[0, 1] == pytest.approx(1.0)
+    assert matrix.shape == (3, 3)
+
+
+def test_summarize_many_handles_mixed_lengths():
+    series = {"long": PRICES, "short": PRICES[:4], "twin": [p + 1 for p in PRICES]}
+    summaries = analytics.summarize_many(series, window=3, periods_per_year=252)
+    assert list(summaries) == ["long", "short", "twin"]
+    assert summaries["short"]["count"] == 4
+    assert summaries["long"] == analytics.summarize(PRICES, window=3, periods_per_year=252)
+    assert summaries["long"]["rolling_mean"] == pytest.approx(statistics.mean(PRICES[-3:]))
+    assert summaries["long"]["volatility"] == pytest.approx(statistics.stdev(_returns(PRICES)))
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        analytics.simple_returns([1.0])
+    with pytest.raises(ValueError):
+        analytics.rolling_mean(PRICES, 0)
+
+
+def test_calculator_series_and_correlation_requests():
+    calc = CalculatorTool()
+    summary = calc._run("monthly prices " + ", ".join(str(p) for p in PRICES))
+    assert "Max drawdown: -13.64%" in summary
+    assert "CAGR:" in summary
+    undated = calc._run("cagr of prices " + ", ".join(str(p) for p in PRICES))
+    assert "CAGR: not computed" in undated and "monthly" in undated
+    result = calc._run("correlation AAPL: 1, 2, 3, 5; MSFT: 2, 4, 6, 10")
+    assert "AAPL vs MSFT: 1.000" in result
+    analysis = calc._run("analysis of values: " + ", ".join(str(p) for p in PRICES))
+    assert "(10 values)" in analysis and "Average: 103.50" in analysis
@@ -0,0 +1,128 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from api import Job, JobManager, create_server
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from tests.conftest import Resp
+
+
+class GatedLLM:
+    """Stub whose calls block until `gate` is set; counts calls"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.gate.wait(10)
+        self.calls += 1
+        return Resp("report body")
+
+
+@pytest.fixture
+def api(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+    llm = GatedLLM()
+    workflow = MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()], verbose=False)
+    server = create_server(workflow, "127.0.0.1", 0, workers=1, max_queue=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield base, llm
+    llm.gate.set()
+    server.shutdown()
+    server.server_close()
+    server.jobs.close(timeout=10)
+
+
+def _request(url: str, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def test_job_lifecycle_with_dedupe_and_backpressure(api):
+    base, llm = api
+
+    status, body = _request(f"{base}/jobs", {"query": "Analyze Apple stock"})
+    assert status == 202
+    first = json.loads(body)
+    assert first["deduplicated"] is False
+
+    # Same query (modulo whitespace/case) while in flight joins the same job
+    status, body = _request(f"{base}/jobs", {"query": "  analyze  apple STOCK "})
+    duplicate = json.loads(body)
+    assert status == 202 and duplicate["job_id"] == first["job_id"] and duplicate["deduplicated"] is True
+
+    # One worker is busy (or about to be) and the queue holds one job: the third distinct query is rejected
+    _request(f"{base}/jobs", {"query": "Analyze Tesla stock"})
+    status, body = _request(f"{base}/jobs", {"query": "Analyze Microsoft stock"})
+    assert status == 429
+
+    assert _request(f"{base}/jobs/{first['job_id']}/report")[0] == 409
+
+    llm.gate.set()
+    # The event stream follows the job until it finishes
+    status, body = _request(f"{base}/jobs/{first['job_id']}/events")
+    events = [json.loads(line) for line in body.splitlines() if line]
+    assert [e["node"] for e in events if e["type"] == "node_end"] == ["researcher", "analyst", "reporter"]
+    assert events[-1] == {"type": "status", "status": "succeeded"}
+
+    status, body = _request(f"{base}/jobs/{first['job_id']}/report")
+    report = json.loads(body)
+    assert status == 200
+    assert report["final_report"] == "report body"
+    assert report["completed_nodes"] == ["researcher", "analyst", "reporter"]
+    assert report["timings"]["llm"]["calls"] == 3
+
+
+def test_reuse_false_does_not_join_a_reusing_job(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    llm = GatedLLM()
+    jobs = JobManager(MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()],
+                                         verbose=False), workers=1)
+    first, _ = jobs.submit("Analyze Apple stock")
+    assert jobs.submit("analyze apple stock") == (first, True)
+    fresh, deduplicated = jobs.submit("Analyze Apple stock", reuse=False)
+    assert fresh is not first and not deduplicated
+    assert jobs.submit("Analyze Apple stock", reuse=False) == (fresh, True)
+    llm.gate.set()
+    jobs.close(timeout=10)
+
+
+def test_finished_jobs_drop_token_events():
+    job = Job("Analyze Apple stock")
+    job.set_status("running")
+    job.add_event({"type": "node_start", "node": "researcher"})
+    for i in range(100):
+        job.add_event({"type": "token", "node": "researcher", "content": f"t{i} "})
+    events, cursor, done = job.wait_events(0, timeout=0)
+    assert len(events) == 102 and cursor == 102 and not done
+
+    # A follower part-way through the tokens continues with the events after them
+    job.add_event({"type": "node_end", "node": "researcher"})
+    job.set_status("succeeded", state={})
+    assert [e["type"] for e in job.events] == ["status", "node_start", "node_end", "status"]
+    events, cursor, done = job.wait_events(50, timeout=0)
+    assert events == [{"type": "node_end", "node": "researcher"}, {"type": "status", "status": "succeeded"}]
+    assert cursor == 104 and done
+
+
+def test_bad_requests(api):
+    base, _ = api
+    assert _request(f"{base}/jobs", {"q": "x"})[0] == 400
+    assert _request(f"{base}/jobs", {"query": "   "})[0] == 400
+    assert _request(f"{base}/jobs/unknown")[0] == 404
+    assert _request(f"{base}/healthz")[0] == 200
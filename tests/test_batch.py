@@ -0,0 +1,113 @@
+import asyncio
+import io
+import json
+import threading
+from pathlib import Path
+
+from batch import stream_batch
+from workflow import MultiAgentWorkflow, _percentile
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from tests.conftest import Resp
+
+
+class ConcurrencyTrackingLLM:
+    """Async stub that records the peak number of overlapping calls"""
+
+    def __init__(self, fail_on: str = None):
+        self.active = 0
+        self.peak = 0
+        self.fail_on = fail_on
+
+    def invoke(self, messages):
+        return Resp("stubbed response")
+
+    async def ainvoke(self, messages):
+        if self.fail_on and any(self.fail_on in m.content for m in messages):
+            raise RuntimeError("llm exploded")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return Resp("stubbed response")
+
+
+def _workflow(llm, **kwargs):
+    return MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()], verbose=False, **kwargs)
+
+
+def test_run_batch_orders_results_and_reports_stats(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    llm = ConcurrencyTrackingLLM(fail_on="query-3")
+    wf = _workflow(llm)
+
+    queries = [f"Analyze Apple stock query-{i}" for i in range(10)]
+    batch = wf.run_batch(queries, max_concurrency=4)
+
+    assert [r["query"] for r in batch["results"]] == queries
+    assert batch["results"][3]["ok"] is False and "llm exploded" in batch["results"][3]["error"]
+    stats = batch["stats"]
+    assert stats["total"] == 10 and stats["failed"] == 1 and stats["succeeded"] == 9
+    assert stats["throughput_qps"] > 0
+    assert 0 < stats["p50_s"] <= stats["p95_s"]
+
+
+def test_stage_limit_caps_llm_concurrency(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    llm = ConcurrencyTrackingLLM()
+    wf = _workflow(llm, stage_limits={"llm": 2})
+
+    wf.run_batch([f"Analyze Tesla stock {i}" for i in range(12)], max_concurrency=12)
+
+    assert llm.peak == 2
+
+
+
+def test_slow_query_source_does_not_stall_running_queries(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+    first_done = threading.Event()
+
+    def source():
+        yield "Analyze Apple stock"
+        # Like stdin waiting on its producer: blocks until the first query has finished
+        assert first_done.wait(10)
+        yield "Analyze Tesla stock"
+
+    async def collect():
+        results = []
+        async for result in _workflow(ConcurrencyTrackingLLM()).arun_batch(source(), max_concurrency=2):
+            first_done.set()
+            results.append(result)
+        return results
+
+    results = asyncio.run(asyncio.wait_for(collect(), 20))
+    assert [r["query"] for r in results] == ["Analyze Apple stock", "Analyze Tesla stock"]
+    assert all(r["ok"] for r in results)
+
+
+def test_stream_batch_writes_jsonl(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    wf = _workflow(ConcurrencyTrackingLLM())
+    source = io.StringIO("Analyze Apple stock\n\n# comment\nAnalyze Tesla stock\n")
+    sink = io.StringIO()
+
+    summary = asyncio.run(stream_batch(wf, source, sink, max_concurrency=2))
+
+    records = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert sorted(r["query"] for r in records) == ["Analyze Apple stock", "Analyze Tesla stock"]
+    assert all(r["ok"] and r["final_report"] == "stubbed response" for r in records)
+    assert summary["total"] == 2
+
+
+def test_percentile_nearest_rank():
+    assert _percentile([], 95) == 0.0
+    assert _percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert _percentile([float(i) for i in range(1, 101)], 95) == 95.0
@@ -0,0 +1,115 @@
+from unittest.mock import Mock, patch
+
+from tools.search_tool import SearchTool
+from utils.cache import MemoryCache, SQLiteCache, TieredCache, cache_from_env
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_cache_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = MemoryCache(max_size=2, ttl=10, clock=clock)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)  # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    clock.now += 11
+    assert cache.get("a") is None
+    assert cache.stats == {"hits": 2, "misses": 2, "evictions": 1, "expirations": 1}
+
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "cache.sqlite"
+    cache = SQLiteCache(path, max_size=2, ttl=60, clock=clock)
+    cache.set("a", {"x": 1})
+    clock.now += 1
+    cache.set("b", [1, 2])
+    clock.now += 1
+    cache.set("c", "three")  # evicts least recently used "a"
+    cache.close()
+
+    reopened = SQLiteCache(path, max_size=2, ttl=60, clock=clock)
+    assert reopened.get("a") is None
+    assert reopened.get("b") == [1, 2]
+    assert reopened.get("c") == "three"
+    clock.now += 61
+    assert reopened.get("c") is None
+    assert reopened.stats["expirations"] == 1
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = SQLiteCache(tmp_path / "cache.sqlite")
+    disk.set("k", "v")
+    cache = TieredCache(MemoryCache(), disk)
+
+    assert cache.get("k") == "v"
+    assert cache.get("k") == "v"
+    stats = cache.stats()
+    assert stats["disk"]["hits"] == 1
+    assert stats["memory"] == {"hits": 1, "misses": 1, "evictions": 0, "expirations": 0}
+
+
+def test_promoted_entries_keep_their_disk_expiry(tmp_path):
+    clock = FakeClock()
+    disk = SQLiteCache(tmp_path / "cache.sqlite", ttl=60, clock=clock)
+    disk.set("k", "v", ttl=30)
+    clock.now += 25
+    cache = TieredCache(MemoryCache(ttl=900, clock=clock), disk)
+    assert cache.get("k") == "v"
+    clock.now += 6  # past the entry's own 30s, well within the memory TTL
+    assert cache.get("k") is None
+
+
+def test_cache_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("SEARCH_CACHE", "0")
+    assert cache_from_env("SEARCH") is None
+
+    monkeypatch.setenv("SEARCH_CACHE", "1")
+    monkeypatch.setenv("SEARCH_CACHE_PATH", str(tmp_path / "search.sqlite"))
+    cache = cache_from_env("SEARCH")
+    assert cache.disk is not None and (tmp_path / "search.sqlite").exists()
+
+
+def test_search_tool_serves_repeated_queries_from_cache(monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "test_key")
+    response = Mock(status_code=200)
+    response.json.return_value = {"organic": [{"title": "<b>Apple</b>", "snippet": "AAPL up", "link": "https://a"}]}
+    session = Mock()
+    session.post.return_value = response
+    tool = SearchTool()
+
+    with patch("tools.search_tool.get_session", return_value=session), \
+            patch("bleach.clean", side_effect=lambda text, **kw: text) as clean:
+        first = tool._run("apple stock")
+        clean_calls = clean.call_count
+        second = tool._run("  Stock   APPLE ")
+
+    assert first == second
+    assert session.post.call_count == 1
+    assert clean.call_count == clean_calls  # formatted output came from the cache
+    assert tool.cache_stats()["memory"]["hits"] == 1
+
+
+def test_search_tool_does_not_cache_errors(monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "test_key")
+    monkeypatch.setenv("HTTP_MAX_RETRIES", "0")  # one request per search
+    session = Mock()
+    session.post.return_value = Mock(status_code=500)
+    tool = SearchTool()
+
+    with patch("tools.search_tool.get_session", return_value=session):
+        tool._run("apple stock")
+        tool._run("apple stock")
+
+    assert session.post.call_count == 2
@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import pytest
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from tests.conftest import Resp
+
+
+class FlakyLLM:
+    """Stub that fails reporter calls while `fail_reporter` is set and
+    records which agents were called"""
+
+    def __init__(self):
+        self.fail_reporter = False
+        self.calls = []
+        self.report_style = "v1"
+
+    def invoke(self, messages):
+        system = messages[0].content
+        agent = "reporter" if "Report Agent" in system else "analyst" if "Analysis Agent" in system else "researcher"
+        self.calls.append(agent)
+        if agent == "reporter":
+            if self.fail_reporter:
+                raise RuntimeError("reporter LLM unavailable")
+            return Resp(f"report {self.report_style}")
+        return Resp(f"{agent} output")
+
+
+@pytest.fixture
+def make_workflow(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "out"))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    def make(llm, **kwargs):
+        return MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()], verbose=False,
+                                  checkpoint_path=str(tmp_path / "checkpoints.sqlite"), **kwargs)
+    return make
+
+
+def test_failed_run_resumes_from_last_completed_node(make_workflow):
+    llm = FlakyLLM()
+    llm.fail_reporter = True
+    wf = make_workflow(llm)
+
+    with pytest.raises(RuntimeError):
+        wf.run("Analyze Apple stock", thread_id="t1")
+    assert llm.calls == ["researcher", "analyst", "reporter"]
+
+    llm.fail_reporter = False
+    llm.calls.clear()
+    # A new workflow instance (e.g. after a restart) picks up the same checkpoint
+    state = make_workflow(llm).run("Analyze Apple stock", thread_id="t1")
+
+    assert llm.calls == ["reporter"]
+    assert state["completed"] is True and state["final_report"] == "report v1"
+    assert state["research_summary"] == "researcher output"
+
+
+def test_completed_run_is_reused_and_rerun_from_skips_upstream(make_workflow):
+    llm = FlakyLLM()
+    wf = make_workflow(llm)
+    wf.run("Analyze Apple stock", thread_id="t2")
+
+    llm.calls.clear()
+    again = wf.run("Analyze Apple stock", thread_id="t2")
+    assert llm.calls == [] and again["final_report"] == "report v1"
+
+    llm.report_style = "v2"
+    rerun = wf.run("Analyze Apple stock", thread_id="t2", rerun_from="reporter")
+    assert llm.calls == ["reporter"]
+    assert rerun["final_report"] == "report v2"
+
+    llm.calls.clear()
+    wf.run("Analyze Apple stock", thread_id="t2", resume=False)
+    assert llm.calls == ["researcher", "analyst", "reporter"]
+
+
+def test_parallel_graph_rerun_reporter_only(make_workflow):
+    llm = FlakyLLM()
+    wf = make_workflow(llm, parallel=True)
+    wf.run("Analyze Tesla stock", thread_id="p1")
+
+    llm.calls.clear()
+    llm.report_style = "v2"
+    state = wf.run("Analyze Tesla stock", thread_id="p1", rerun_from="reporter")
+
+    assert llm.calls == ["reporter"]
+    assert state["final_report"] == "report v2"
+
+
+def test_thread_id_requires_checkpoint_path(monkeypatch):
+    monkeypatch.delenv("WORKFLOW_CHECKPOINT_PATH", raising=False)
+    wf = MultiAgentWorkflow(llm=FlakyLLM(), tools=[SearchTool(), CalculatorTool(), FileTool()], verbose=False)
+    with pytest.raises(ValueError):
+        wf.run("Analyze Apple stock", thread_id="t")
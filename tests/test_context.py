@@ -0,0 +1,80 @@
+from pathlib import Path
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from utils.context import compact, dedupe_lines, fit_context, remove_covered
+from utils.tracing import RunTrace, estimate_tokens, use_trace
+from tests.conftest import Resp
+
+
+def _results(count: int, words: int = 120) -> str:
+    body = " ".join(f"word{i}." if i % 12 == 11 else f"word{i}" for i in range(words))
+    return "\n\n".join(f"{i}. **Result {i}**: {body}" for i in range(1, count + 1))
+
+
+def test_compact_shares_budget_across_blocks():
+    text = "short block\n\n" + _results(5)
+    out = compact(text, 300)
+    assert estimate_tokens(out) <= 300
+    assert out.startswith("short block\n\n1. **Result 1**")
+    assert out.count("**Result") == 5 and out.count(" …") == 5
+    assert compact(text, 300) == out
+    assert compact("small", 10) == "small"
+
+
+def test_compact_drops_trailing_blocks_it_cannot_fit():
+    out = compact(_results(50), 400)
+    assert estimate_tokens(out) <= 400
+    assert out.endswith("more sections omitted]") and "**Result 1**" in out and "**Result 50**" not in out
+
+
+def test_duplicates_and_covered_sentences_are_removed():
+    assert dedupe_lines("a result\nother\nA  result\n\nother") == "a result\nother\n"
+    findings = "Apple shares rose 2% on strong iPhone demand. Volume was light today.\nUnrelated line"
+    summary = "Key point: apple shares rose 2% on strong iPhone demand."
+    assert remove_covered(findings, [summary]) == findings
+    summary = "Apple shares rose 2% on strong iPhone demand. Analysts were upbeat."
+    assert remove_covered(findings, [summary]) == "Volume was light today.\nUnrelated line"
+
+
+def test_fit_context_water_fills_by_weight(monkeypatch):
+    monkeypatch.setenv("CONTEXT_BUDGET_REPORTER", "500")
+    fields = {"research_findings": _results(20), "research_summary": "A short summary.", "analysis_insights": _results(3)}
+    trace = RunTrace()
+    with use_trace(trace):
+        out = fit_context("reporter", fields, weights={"research_findings": 0.5})
+    assert out["research_summary"] == "A short summary."
+    assert estimate_tokens(out["research_findings"]) < estimate_tokens(out["analysis_insights"])
+    assert sum(estimate_tokens(v) for v in out.values()) <= 500
+    context = trace.summary()["context"]
+    assert context["tokens_after"] <= 500 and context["tokens_saved"] > 0
+    assert context["by_agent"]["reporter"]["tokens_saved"] == context["tokens_saved"]
+
+    monkeypatch.setenv("CONTEXT_BUDGET", "0")
+    assert fit_context("reporter", fields) == fields
+
+
+class PromptLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages[-1].content)
+        return Resp("summary sentence.")
+
+
+def test_workflow_prompts_stay_within_budget(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(SearchTool, "_run", lambda self, query, run_manager=None: _results(200))
+    llm = PromptLLM()
+    wf = MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()], verbose=False)
+    state = wf.run("Analyze Apple stock")
+
+    # Researcher 6000, analyst and reporter 4000 tokens of upstream content plus instructions
+    assert [estimate_tokens(p) < limit + 200 for p, limit in zip(llm.prompts, (6000, 4000, 4000))] == [True] * 3
+    assert state["research_findings"] == _results(200)
+    context = state["timings"]["context"]
+    assert set(context["by_agent"]) == {"researcher", "analyst", "reporter"}
+    assert context["tokens_saved"] > 2 * estimate_tokens(_results(200)) - 20000
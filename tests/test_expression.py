@@ -0,0 +1,80 @@
+import pytest
+
+from tools.calc_tool import CalculatorTool
+from utils.expression import MAX_DEPTH, ExpressionError, compile_expression, evaluate
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2 + 3 * 4", 14),
+    ("(2 + 3) * 4", 20),
+    ("10 - 4 - 3", 3),
+    ("2 ** 3 ** 2", 512),
+    ("2 ^ 10", 1024),
+    ("-2 ** 2", -4),
+    ("2 ** -1", 0.5),
+    ("7 // 2 + 7 % 3", 4),
+    ("15 / 3", 5.0),
+    ("2e3 + .5", 2000.5),
+    ("sqrt(16) + abs(-2)", 6.0),
+    ("log(8, 2)", 3.0),
+    ("max(1, 5, 3) - min(4, 2)", 3),
+    ("round(2 * pi, 2)", 6.28),
+])
+def test_evaluates_like_python(text, expected):
+    assert evaluate(text) == pytest.approx(expected)
+
+
+def test_long_sums_do_not_nest():
+    assert evaluate("+".join(["1"] * 400)) == 400
+
+
+def test_variables():
+    growth = compile_expression("(revenue - prior) / prior * 100")
+    assert growth.names == {"revenue", "prior"}
+    assert growth({"revenue": 120, "prior": 100}) == pytest.approx(20)
+    with pytest.raises(ExpressionError, match="unknown name"):
+        growth({"revenue": 120})
+
+
+@pytest.mark.parametrize("text, message", [
+    ("2 +", "end of expression"),
+    ("2 +* 3", "unexpected"),
+    ("2 / 0", "division by zero"),
+    ("undefined_function(5)", "unknown function"),
+    ("__import__('os').system('ls')", "unexpected character"),
+    ("sqrt(-1)", "domain"),
+    ("(-8) ** 0.5", "not a real number"),
+    ("log(1, 2, 3)", "argument"),
+])
+def test_errors(text, message):
+    with pytest.raises(ExpressionError, match=message):
+        evaluate(text)
+
+
+@pytest.mark.parametrize("text", ["9 ** 99999", "(9 ** 9999) ** 9999", "exp(1000)", "1e308 * 10"])
+def test_limits_on_huge_results(text):
+    with pytest.raises(ExpressionError):
+        evaluate(text)
+
+
+def test_nesting_and_length_limits():
+    deep = "(" * (MAX_DEPTH + 1) + "1" + ")" * (MAX_DEPTH + 1)
+    with pytest.raises(ExpressionError, match="nested"):
+        evaluate(deep)
+    with pytest.raises(ExpressionError, match="longer"):
+        evaluate("1+" * 1000 + "1")
+
+
+def test_compiled_expressions_are_cached():
+    compile_expression.cache_clear()
+    evaluate("1 + 2 * 3")
+    evaluate("1 + 2 * 3")
+    assert compile_expression.cache_info().hits == 1
+
+
+def test_calculator_tool_uses_engine():
+    calc = CalculatorTool()
+    assert calc._run("1.05 ^ 2 * 100").startswith("Calculation result: 1.05 ^ 2 * 100 = 110.25")
+    assert "error" in calc._run("exec('print(1)')").lower()
+    # Free text still goes to the keyword and number handlers
+    assert calc._run("P/E ratio analysis").startswith("Unable to perform calculation")
@@ -0,0 +1,65 @@
+import pytest
+
+from agents.analyst import AnalystAgent
+from tools.calc_tool import CalculatorTool
+from tools.search_tool import FALLBACK_RESULTS
+from utils.facts import MARKET_CAP, PE_RATIO, PERCENT_CHANGE, PRICE, extract_facts, parse_facts
+from utils.tracing import RunTrace, use_trace
+
+FINDINGS = "Search results for 'big tech':\n\n" + "\n\n".join(
+    f"{i}. **{key.title()}**: {text}" for i, (key, text) in enumerate(FALLBACK_RESULTS.items(), 1)
+)
+
+
+def test_parses_typed_facts_with_labels():
+    facts = parse_facts(FINDINGS)
+    assert facts.labels() == ["AAPL", "MSFT", "GOOGL", "TSLA", "AMZN"]
+    assert facts.first(PRICE, "AAPL").value == 185.50
+    assert facts.first(PERCENT_CHANGE, "GOOGL").value == -0.5
+    assert facts.first(MARKET_CAP, "AAPL").value == pytest.approx(2.9e12)
+    assert facts.first(MARKET_CAP, "TSLA").value == pytest.approx(790e9)
+    assert facts.first(PE_RATIO, "MSFT").value == 32.1
+    assert len(facts.of(PRICE)) == 5
+
+
+def test_units_separators_and_labels_from_titles():
+    facts = parse_facts("**Nvidia results**: shares fell 4.1% to $1,075.28; market capitalization "
+                        "of 2,150 billion dollars and a price-to-earnings ratio of 70. Revenue was $26B.")
+    assert [(f.kind, f.value) for f in facts] == [
+        (PERCENT_CHANGE, -4.1), (PRICE, 1075.28), (MARKET_CAP, 2.15e12), (PE_RATIO, 70.0),
+    ]
+    assert {f.label for f in facts} == {"Nvidia results"}
+
+
+def test_extraction_is_cached_per_findings():
+    trace = RunTrace()
+    with use_trace(trace):
+        first = extract_facts(FINDINGS + " (cache test)")
+        second = extract_facts(FINDINGS + " (cache test)")
+    assert first is second
+    assert trace.summary()["cache"]["facts"] == {"hits": 1, "misses": 1}
+
+
+def test_calculator_works_on_facts_per_label():
+    result = CalculatorTool().calculate_facts(parse_facts(FINDINGS), [PE_RATIO, MARKET_CAP])
+    assert "P/E ratio (AAPL): 28.50" in result
+    assert "Implied earnings per share: 185.50 / 28.50 = 6.51" in result
+    assert "Market cap (TSLA): $790.00B" in result
+    assert "Percentage change" not in result
+
+
+class RecordingCalculator(CalculatorTool):
+    def _run(self, expression, run_manager=None):
+        raise AssertionError("text request used although facts were found")
+
+
+def test_analyst_hands_facts_to_calculator_without_text():
+    analyst = AnalystAgent(llm=None, tools=[RecordingCalculator()])
+    result = analyst.calculate("What is Apple's P/E?", FINDINGS)
+    assert result.startswith("Structured Calculations:")
+    assert "P/E ratio (AAPL): 28.50" in result
+
+
+def test_analyst_falls_back_to_text_without_facts():
+    analyst = AnalystAgent(llm=None, tools=[CalculatorTool()])
+    assert analyst.calculate("Summarize", "revenue 100 then 120").startswith("Financial Analysis:")
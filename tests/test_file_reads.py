@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+import tools.file_tool as file_tool
+from tools.file_tool import FileTool
+
+
+@pytest.fixture
+def tool(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("FILE_ASYNC_WRITES", raising=False)
+    return FileTool()
+
+
+def _lines(count: int) -> str:
+    return "".join(f"line {i} — ü\n" for i in range(1, count + 1))
+
+
+def test_small_read_is_unchanged(tool, tmp_path: Path):
+    (tmp_path / "r.md").write_text("hello")
+    assert tool._run("read", "r.md") == "File content of r.md:\nhello"
+    assert tool._run("read", "missing.md") == "File missing.md not found."
+
+
+def test_byte_range_read(tool, tmp_path: Path):
+    (tmp_path / "r.txt").write_text("0123456789")
+    out = tool._run("read", "r.txt", offset=2, length=5)
+    assert out == "File content of r.txt (bytes 2-7 of 10; next offset 7):\n23456"
+    assert tool._run("read", "r.txt", offset=8).endswith("(bytes 8-10 of 10):\n89")
+
+
+def test_large_file_read_is_capped(tool, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(file_tool, "MAX_READ_BYTES", 16)
+    (tmp_path / "big.md").write_text("x" * 40)
+    out = tool._run("read", "big.md")
+    assert out == f"File content of big.md (bytes 0-16 of 40; next offset 16):\n{'x' * 16}"
+
+
+def test_line_range_read(tool, tmp_path: Path):
+    (tmp_path / "r.md").write_text(_lines(10))
+    out = tool._run("read", "r.md", start_line=3, end_line=4)
+    assert out == "File content of r.md (lines 3-4):\nline 3 — ü\nline 4 — ü\n"
+    assert list(tool.iter_lines("r.md", 9)) == ["line 9 — ü\n", "line 10 — ü\n"]
+    assert list(tool.iter_lines("r.md", 20)) == []
+
+
+@pytest.mark.parametrize("mmap_threshold", [0, 1 << 30])
+def test_iter_chunks_streams_whole_file(tool, tmp_path: Path, monkeypatch, mmap_threshold):
+    monkeypatch.setattr(file_tool, "MMAP_THRESHOLD", mmap_threshold)
+    text = _lines(500)
+    (tmp_path / "r.md").write_text(text)
+    # Chunk size 7 splits the two-byte characters across chunks
+    chunks = list(tool.iter_chunks("r.md", chunk_size=7))
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+    assert "".join(tool.iter_chunks("r.md", offset=5, length=6)) == text.encode()[5:11].decode()
+    assert list(tool.iter_lines("r.md", 250, 251)) == ["line 250 — ü\n", "line 251 — ü\n"]
+
+
+def test_iter_rejects_unsafe_paths(tool):
+    with pytest.raises(ValueError):
+        tool.iter_chunks("../etc/passwd")
+    assert tool._run("read", "../x.md") == "File operation error: Unsafe filename/path"
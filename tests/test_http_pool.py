@@ -0,0 +1,44 @@
+import asyncio
+
+from tools.search_tool import SearchTool
+
+
+def test_sync_search_retries_and_reuses_connection(stub_env):
+    stub = stub_env(failures=2)
+    tool = SearchTool()
+
+    first = tool._run("apple stock")
+    assert "Result for apple stock" in first
+    assert stub.requests == 3
+
+    for _ in range(5):
+        assert "Result for" in tool._run("tesla stock")
+    # Keep-alive: all requests went over a single pooled connection
+    assert len(stub.client_ports) == 1
+
+
+def test_sync_search_gives_up_after_max_retries(stub_env):
+    stub = stub_env(failures=10, status=429)
+
+    result = SearchTool()._run("apple stock")
+
+    assert "status 429" in result
+    assert stub.requests == 3  # 1 attempt + 2 retries
+
+
+def test_async_search_retries_and_reuses_connection(stub_env):
+    stub = stub_env(failures=1)
+    tool = SearchTool()
+
+    async def run():
+        first = await tool._arun("apple stock")
+        # Distinct queries so the result cache doesn't absorb them
+        rest = [await tool._arun(f"tesla stock {i}") for i in range(3)]
+        return first, rest
+
+    first, rest = asyncio.run(run())
+
+    assert "Result for apple stock" in first
+    assert all("Result for tesla stock" in r for r in rest)
+    assert stub.requests == 5
+    assert len(stub.client_ports) == 1
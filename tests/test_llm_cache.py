@@ -0,0 +1,70 @@
+import asyncio
+from pathlib import Path
+
+from langchain.schema import HumanMessage, SystemMessage
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from utils.cache import MemoryCache, SQLiteCache, TieredCache
+from utils.llm_cache import CachedLLM
+from tests.conftest import CountingLLM
+
+
+class ModelLLM(CountingLLM):
+    """CountingLLM with the model settings CachedLLM keys on"""
+
+    model = "fake-model"
+    temperature = 0.3
+
+
+def test_cached_llm_keys_on_messages_model_and_temperature():
+    llm = ModelLLM()
+    cached = CachedLLM(llm, TieredCache(MemoryCache()))
+    messages = [SystemMessage(content="sys"), HumanMessage(content="hello")]
+
+    assert cached.invoke(messages).content == "response 1"
+    assert cached.invoke(list(messages)).content == "response 1"
+    assert cached.invoke([SystemMessage(content="sys"), HumanMessage(content="bye")]).content == "response 2"
+
+    key = cached.cache_key(messages)
+    llm.temperature = 0.9
+    assert cached.cache_key(messages) != key
+    assert llm.calls == 2
+
+
+def test_cached_llm_async_and_disk_backend(tmp_path: Path):
+    messages = [HumanMessage(content="hello")]
+    first = CachedLLM(ModelLLM(), TieredCache(MemoryCache(), SQLiteCache(tmp_path / "llm.sqlite")))
+    assert asyncio.run(first.ainvoke(messages)).content == "response 1"
+
+    # A fresh process (new memory tier) still hits the disk tier
+    llm = ModelLLM()
+    second = CachedLLM(llm, TieredCache(MemoryCache(), SQLiteCache(tmp_path / "llm.sqlite")))
+    assert asyncio.run(second.ainvoke(messages)).content == "response 1"
+    assert llm.calls == 0
+
+
+def test_workflow_rerun_is_served_from_llm_cache(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    llm = ModelLLM()
+    wf = MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()],
+                            verbose=False, llm_cache=TieredCache(MemoryCache()))
+
+    first = wf.run("Analyze Apple stock performance")
+    second = wf.run("Analyze Apple stock performance")
+
+    assert llm.calls == 3
+    assert first["final_report"] == second["final_report"]
+    stats = wf.llm_cache_stats()
+    assert set(stats) == {"researcher", "analyst", "reporter"}
+    assert all(s["hits"] == 1 and s["misses"] == 1 and s["hit_rate"] == 0.5 for s in stats.values())
+
+
+def test_llm_cache_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("LLM_CACHE", raising=False)
+    wf = MultiAgentWorkflow(llm=ModelLLM(), tools=[SearchTool(), CalculatorTool(), FileTool()], verbose=False)
+    assert wf.cached_llm is None and wf.llm_cache_stats() == {}
@@ -0,0 +1,108 @@
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from utils import metrics
+from utils.health import start_health_server, stop_health_server
+from utils.metrics import Counter, Gauge, Histogram, Registry
+from tests.conftest import FakeLLM
+
+
+class DownLLM:
+    def invoke(self, messages):
+        raise RuntimeError("LLM down")
+
+
+def _workflow(llm):
+    return MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()], verbose=False)
+
+
+def test_text_format_rendering():
+    registry = Registry()
+    counter = registry.register(Counter("jobs_total", "Jobs", ["status"]))
+    histogram = registry.register(Histogram("job_seconds", "Job latency", buckets=(0.1, 1.0)))
+    registry.register(Gauge("ratio", "Ratio", ["cache"], collect=lambda: {("se\"arch",): 0.5}))
+
+    counter.inc(status="ok")
+    counter.inc(2, status="ok")
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(3)
+
+    text = registry.render()
+    assert '# TYPE jobs_total counter\njobs_total{status="ok"} 3' in text
+    assert 'job_seconds_bucket{le="0.1"} 1' in text
+    assert 'job_seconds_bucket{le="1"} 2' in text
+    assert 'job_seconds_bucket{le="+Inf"} 3' in text
+    assert "job_seconds_count 3" in text and "job_seconds_sum 3.55" in text
+    assert 'ratio{cache="se\\"arch"} 0.5' in text
+    with pytest.raises(ValueError):
+        counter.inc(kind="x")
+
+
+def test_workflow_runs_feed_metrics(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+    ok_before = metrics.WORKFLOW_RUNS.value(status="ok")
+    failed_before = metrics.WORKFLOW_RUNS.value(status="error")
+    llm_before = metrics.LLM_CALLS.value(agent="reporter")
+    fallbacks_before = metrics.SEARCH_FALLBACKS.value()
+    bytes_before = metrics.FILE_BYTES_WRITTEN.value(action="create_report")
+    nodes_before = metrics.NODE_SECONDS.count(node="analyst")
+
+    _workflow(FakeLLM()).run("Analyze Apple stock")
+    with pytest.raises(RuntimeError):
+        _workflow(DownLLM()).run("Analyze Apple stock")
+
+    assert metrics.WORKFLOW_RUNS.value(status="ok") == ok_before + 1
+    assert metrics.WORKFLOW_RUNS.value(status="error") == failed_before + 1
+    assert metrics.LLM_CALLS.value(agent="reporter") == llm_before + 1
+    assert metrics.SEARCH_FALLBACKS.value() == fallbacks_before + 2
+    assert metrics.FILE_BYTES_WRITTEN.value(action="create_report") > bytes_before
+    assert metrics.NODE_SECONDS.count(node="analyst") == nodes_before + 1
+
+
+def _get(port: int, path: str):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def test_health_server_endpoints(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    server = start_health_server(0, "127.0.0.1")
+    try:
+        port = server.server_address[1]
+        assert start_health_server(0, "127.0.0.1") is server
+
+        status, body = _get(port, "/metrics")
+        assert status == 200 and "# TYPE workflow_runs_total counter" in body
+
+        assert _get(port, "/healthz")[0] == 200
+
+        monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+        status, body = _get(port, "/readyz")
+        assert status == 503
+        assert json.loads(body)["checks"]["google_api_key"]["ok"] is False
+
+        monkeypatch.setenv("GOOGLE_API_KEY", "test")
+        status, body = _get(port, "/readyz")
+        assert status == 200 and json.loads(body)["status"] == "ready"
+
+        assert _get(port, "/nope")[0] == 404
+    finally:
+        stop_health_server()
+
+
+def test_server_disabled_without_port(monkeypatch):
+    monkeypatch.delenv("METRICS_PORT", raising=False)
+    assert start_health_server() is None
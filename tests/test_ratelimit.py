@@ -0,0 +1,216 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.researcher import ResearcherAgent
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from utils.cache import MemoryCache
+from utils.metrics import PROVIDER_BACKOFFS
+from utils.ratelimit import (AdaptiveConcurrency, LimitedLLM, ProviderLimiter, TokenBucket, is_overload_error,
+                             provider_limiter, reset_provider_limiters)
+from tests.conftest import Resp
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters():
+    reset_provider_limiters()
+    yield
+    reset_provider_limiters()
+
+
+def test_token_bucket_spaces_out_calls():
+    now = [0.0]
+    bucket = TokenBucket(60, burst=2, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 1.0, 2.0]
+    now[0] += 3
+    assert bucket.reserve() == 0.0
+    bucket.charge(5)
+    assert bucket.reserve() == pytest.approx(6.0)
+
+
+def test_aimd_backs_off_once_per_cooldown_and_recovers():
+    now = [0.0]
+    limit = AdaptiveConcurrency(8, clock=lambda: now[0], name="test")
+    for _ in range(2):
+        limit.acquire()
+    limit.release(0.1, overloaded=True)
+    limit.release(0.1, overloaded=True)  # same burst: counted once
+    assert limit.limit == 4
+
+    now[0] += 2
+    limit.acquire()
+    limit.release(0.1, overloaded=True)
+    assert limit.limit == 2
+    for _ in range(20):
+        limit.acquire()
+        limit.release(0.1)
+    assert 4 < limit.limit <= 8
+
+    # A call far slower than the smoothed latency also backs off
+    before = PROVIDER_BACKOFFS.value(provider="test", reason="latency")
+    now[0] += 2
+    limit.acquire()
+    limit.release(5.0)
+    assert PROVIDER_BACKOFFS.value(provider="test", reason="latency") == before + 1
+
+    # ...but only compared with calls of its own latency class
+    now[0] += 2
+    for latency_class, latency in [("short", 0.1)] * 12 + [("long", 5.0)]:
+        limit.acquire()
+        limit.release(latency, latency_class=latency_class)
+    assert PROVIDER_BACKOFFS.value(provider="test", reason="latency") == before + 1
+
+
+def _peak(calls):
+    active, peak = 0, 0
+    for delta in calls:
+        active += delta
+        peak = max(peak, active)
+    return peak
+
+
+def test_threads_never_exceed_the_limit():
+    limiter = ProviderLimiter("threads", concurrency=AdaptiveConcurrency(3, name="threads"))
+    calls, lock = [], threading.Lock()
+
+    def work():
+        with limiter.call():
+            with lock:
+                calls.append(1)
+            time.sleep(0.01)
+            with lock:
+                calls.append(-1)
+
+    threads = [threading.Thread(target=work) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 24 and _peak(calls) == 3
+    assert limiter.concurrency.inflight == 0
+
+
+def test_coroutines_never_exceed_the_limit():
+    limiter = ProviderLimiter("tasks", concurrency=AdaptiveConcurrency(2, name="tasks"))
+    calls = []
+
+    async def work():
+        async with limiter.acall():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            calls.append(-1)
+
+    async def main():
+        await asyncio.gather(*(work() for _ in range(10)))
+        # A cancelled waiter gives up its place without leaking a slot
+        task = asyncio.ensure_future(asyncio.gather(*(work() for _ in range(3))))
+        await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert _peak(calls) == 2 and limiter.concurrency.inflight == 0
+
+
+def test_provider_limiter_is_configured_from_env(monkeypatch):
+    monkeypatch.delenv("SEARCH_RPM", raising=False)
+    monkeypatch.delenv("SEARCH_TPM", raising=False)
+    monkeypatch.delenv("SEARCH_MAX_CONCURRENCY", raising=False)
+    assert provider_limiter("search") is None
+    monkeypatch.setenv("SEARCH_RPM", "300")
+    monkeypatch.setenv("SEARCH_MAX_CONCURRENCY", "4")
+    reset_provider_limiters()
+    limiter = provider_limiter("search")
+    assert limiter.requests.rate == 5 and limiter.concurrency.max_limit == 4 and limiter.tokens is None
+
+
+def test_search_429_lowers_concurrency(stub_env, monkeypatch):
+    stub = stub_env(failures=1, status=429)
+    monkeypatch.setenv("HTTP_MAX_RETRIES", "0")
+    monkeypatch.setenv("SEARCH_MAX_CONCURRENCY", "8")
+    before = PROVIDER_BACKOFFS.value(provider="search", reason="overload")
+
+    tool = SearchTool()
+    assert "status 429" in tool._run("rate limited query")
+    assert provider_limiter("search").concurrency.limit == 4
+    assert PROVIDER_BACKOFFS.value(provider="search", reason="overload") == before + 1
+    assert "Result for second query" in asyncio.run(tool._arun("second query"))
+    assert stub.requests == 2 and provider_limiter("search").concurrency.inflight == 0
+
+
+
+def test_search_retries_go_through_the_limiter(stub_env, monkeypatch):
+    stub = stub_env(failures=2, status=429)  # HTTP_MAX_RETRIES=2: the third attempt succeeds
+    monkeypatch.setenv("SEARCH_RPM", "60")
+    monkeypatch.setenv("SEARCH_MAX_CONCURRENCY", "8")
+    before = PROVIDER_BACKOFFS.value(provider="search", reason="overload")
+
+    assert "Result for retried query" in SearchTool()._run("retried query")
+    limiter = provider_limiter("search")
+    # Each attempt took a request token and the 429s lowered the limit
+    assert stub.requests == 3 and limiter.requests._tokens == pytest.approx(57, abs=0.5)
+    assert int(limiter.concurrency.limit) == 4 and limiter.concurrency.inflight == 0
+    assert PROVIDER_BACKOFFS.value(provider="search", reason="overload") == before + 1
+
+    stub.failures = 5
+    assert "Result for async query" in asyncio.run(SearchTool()._arun("async query"))
+    assert stub.requests == 6 and limiter.requests._tokens == pytest.approx(54, abs=0.5)
+    assert limiter.concurrency.inflight == 0
+
+
+class QuotaLLM:
+    """Fake Gemini client that reports quota exhaustion on the first call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("429 Resource exhausted: quota exceeded")
+        return Resp("ok", usage_metadata={"input_tokens": 10, "output_tokens": 30})
+
+
+def test_llm_quota_errors_back_off(monkeypatch):
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "6")
+    monkeypatch.setenv("LLM_TPM", "6000")
+    agent = ResearcherAgent(LimitedLLM(QuotaLLM()), [])
+    with pytest.raises(RuntimeError):
+        agent._invoke_llm([])
+    limiter = provider_limiter("llm")
+    assert limiter.concurrency.limit == 3
+    assert agent._invoke_llm([]) == "ok"
+    # Completion tokens reported by the model are charged to the tokens/min budget
+    assert limiter.tokens._tokens == pytest.approx(6000 - 30, abs=1)
+    assert is_overload_error(RuntimeError("429 Resource exhausted"))
+    assert not is_overload_error(ValueError("bad input"))
+
+
+class TimedLLM:
+    def invoke(self, messages):
+        time.sleep(0.01)
+        return Resp("same answer")
+
+
+def test_llm_cache_hits_bypass_the_limiter(tmp_path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setenv("LLM_RPM", "600")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "4")
+    wf = MultiAgentWorkflow(llm=TimedLLM(), tools=[SearchTool(), CalculatorTool(), FileTool()],
+                            verbose=False, llm_cache=MemoryCache(), answer_store=False)
+    wf.run("Analyze Apple stock")
+    limiter = provider_limiter("llm")
+    budget = limiter.requests._tokens
+    samples = sum(count for _, count in limiter.concurrency.latencies.values())
+
+    wf.run("Analyze Apple stock")
+    assert wf.llm_cache_stats()["reporter"]["hits"] == 1
+    # No requests taken and no near-zero latencies fed to the AIMD baseline
+    assert limiter.requests._tokens >= budget
+    assert sum(count for _, count in limiter.concurrency.latencies.values()) == samples
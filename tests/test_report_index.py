@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+import reports
+from api import create_server
+from tools.file_tool import FileTool
+from utils.report_index import ReportIndex, extract_tickers, index_for, parse_report_name
+from utils.writer import ReportWriter
+
+
+@pytest.fixture
+def index(tmp_path: Path):
+    index = ReportIndex(tmp_path / "index.db")
+    yield index
+    index.close()
+
+
+def test_extract_tickers_and_report_names():
+    assert extract_tickers("How is TSLA stock doing", "Apple Inc. (AAPL) rose") == ["AAPL", "TSLA"]
+    assert extract_tickers("Analyze Tesla's stock performance") == ["TSLA"]
+    words, created = parse_report_name("analyze_teslas_stock_report_20250102_030405.md")
+    assert words == "analyze teslas stock"
+    assert created == datetime(2025, 1, 2, 3, 4, 5).timestamp()
+    assert parse_report_name("notes.md") == (None, None)
+
+
+def test_search_by_text_ticker_and_time(index):
+    index.add("tesla_report_20250101_000000.md", "Tesla deliveries beat estimates", query="Analyze Tesla")
+    index.add("apple_report_20250201_000000.md", "Apple (AAPL) services revenue grew", query="Apple stock")
+    index.add("compare_report_20250301_000000.md", "Tesla and Apple margins compared", query="Compare TSLA and AAPL")
+
+    hits = index.search("delivery")  # porter stemming
+    assert [h.filename for h in hits] == ["tesla_report_20250101_000000.md"]
+    assert "[deliveries]" in hits[0].snippet and hits[0].score > 0
+
+    assert {h.filename for h in index.search(ticker="tesla")} == {
+        "tesla_report_20250101_000000.md", "compare_report_20250301_000000.md"}
+    assert [h.filename for h in index.search("margins", ticker="AAPL")] == ["compare_report_20250301_000000.md"]
+    since = datetime(2025, 1, 15).timestamp()
+    assert [h.filename for h in index.search(since=since)] == [
+        "compare_report_20250301_000000.md", "apple_report_20250201_000000.md"]
+    # Query syntax in user input is treated as plain words
+    assert index.search('tesla" OR content:*') == []
+
+
+def test_reindex_replaces_entry(index):
+    index.add("r.md", "first version about Netflix", query="q")
+    index.add("r.md", "second version about Amazon", query="q")
+    assert len(index) == 1
+    assert index.search("netflix") == []
+    assert index.get("r.md").tickers == ["AMZN"]
+    assert index.remove("r.md") and len(index) == 0
+
+
+def test_sync_tracks_directory(index, tmp_path: Path):
+    reports_dir = tmp_path / "out"
+    reports_dir.mkdir()
+    (reports_dir / "a_report_20250101_000000.md").write_text("alpha content")
+    (reports_dir / "b.txt").write_text("beta content")
+    (reports_dir / "ignored.json").write_text("{}")
+    assert index.sync(reports_dir) == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}
+    assert index.get("a_report_20250101_000000.md").query == "a"
+
+    (reports_dir / "b.txt").write_text("beta content, revised with gamma")
+    os.utime(reports_dir / "b.txt", (1, 1))
+    (reports_dir / "a_report_20250101_000000.md").unlink()
+    assert index.sync(reports_dir) == {"added": 0, "updated": 1, "removed": 1, "unchanged": 0}
+    assert [h.filename for h in index.search("gamma")] == ["b.txt"]
+
+
+def test_create_report_is_indexed(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("REPORT_INDEX_PATH", raising=False)
+    FileTool()._run("create_report", "how_is_tsla_report_20250105_120000.md",
+                    "Tesla (TSLA) shares rose 3%", query="How is TSLA stock doing")
+    hit, = index_for(tmp_path.resolve()).search("shares rose")
+    assert hit.query == "How is TSLA stock doing" and hit.tickers == ["TSLA"]
+    # Indexed with the file's real size and mtime, so a sync re-reads nothing
+    assert index_for(tmp_path.resolve()).sync(tmp_path)["unchanged"] == 1
+
+    reports.main(["--output-dir", str(tmp_path), "search", "tesla", "--json"])
+    assert json.loads(capsys.readouterr().out)["filename"] == hit.filename
+
+    monkeypatch.setenv("REPORT_INDEX", "0")
+    assert index_for(tmp_path.resolve()) is None
+
+
+def test_background_report_is_indexed_after_the_write(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("REPORT_INDEX_PATH", raising=False)
+    tool = FileTool(writer=ReportWriter(fsync=False))
+    tool._run("create_report", "apple_report_20250105_120000.md", "Apple (AAPL) beat estimates")
+    (tmp_path / "tesla_report_20250105_120000.md").mkdir()  # makes the background write fail
+    tool._run("create_report", "tesla_report_20250105_120000.md", "Tesla (TSLA) missed")
+    tool.flush()
+    index = index_for(tmp_path.resolve())
+    assert [h.filename for h in index.search("estimates")] == ["apple_report_20250105_120000.md"]
+    assert index.search("missed") == [] and len(index) == 1
+    assert index.sync(tmp_path) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 1}
+    tool.close()
+
+
+def test_api_report_search(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    FileTool()._run("create_report", "r.md", "Netflix subscriber growth", query="Netflix growth")
+    FileTool()._run("create_report", "s.md", "Netflix subscriber churn", query="Netflix churn")
+    server = create_server(workflow=None, host="127.0.0.1", port=0, workers=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/reports?q=subscriber&ticker=NFLX"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            body = json.loads(response.read())
+        assert sorted(r["filename"] for r in body["reports"]) == ["r.md", "s.md"]
+        # A non-positive limit (SQLite's LIMIT -1 means no limit) is clamped to one result
+        with urllib.request.urlopen(url + "&limit=-1", timeout=10) as response:
+            assert len(json.loads(response.read())["reports"]) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.jobs.close(timeout=10)
@@ -0,0 +1,94 @@
+import asyncio
+from pathlib import Path
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from utils.reuse import AnswerStore, answer_store_from_env, query_signature, similarity
+from tests.conftest import CountingLLM
+
+
+def _similar(a: str, b: str) -> float:
+    return similarity(query_signature(a), query_signature(b))
+
+
+def test_paraphrases_match_and_different_questions_do_not():
+    assert _similar("Analyze Tesla's stock performance", "How is TSLA stock doing") == 1.0
+    assert _similar("Compare Apple and Microsoft", "compare MSFT versus AAPL shares") == 1.0
+    assert _similar("Tesla stock price", "Tesla stock performance") == 0.0
+    assert _similar("Analyze Tesla stock", "Analyze Apple stock") == 0.0
+    assert _similar("Calculate 15% of 200", "Calculate 15% of 300") == 0.0
+    # Companies without a known ticker are told apart by name
+    assert _similar("Analyze Ford stock price performance and earnings",
+                    "Analyze Boeing stock price performance and earnings") == 0.0
+    assert _similar("Analyze Ford stock price performance and earnings",
+                    "Ford stock price performance and earnings") == 1.0
+    assert _similar("Compare Tesla and Rivian", "Compare Tesla and Lucid") == 0.0
+
+
+def test_store_freshness_threshold_and_eviction():
+    now = [1000.0]
+    store = AnswerStore(max_size=2, max_age=60, min_similarity=0.8, clock=lambda: now[0])
+    store.store("Analyze Tesla stock performance", {"final_report": "tesla"})
+    hit = store.lookup("How is TSLA doing?")
+    assert hit.query == "Analyze Tesla stock performance" and hit.state == {"final_report": "tesla"}
+    hit.state["final_report"] = "mutated"
+    assert store.lookup("How is TSLA doing?").state["final_report"] == "tesla"
+    assert store.lookup("Tesla earnings") is None
+
+    now[0] += 61
+    assert store.lookup("How is TSLA doing?") is None and len(store) == 0
+
+    store.store("Apple earnings", {})
+    store.store("Microsoft earnings", {})
+    store.store("Netflix earnings", {})
+    assert len(store) == 2 and store.lookup("apple earnings") is None
+
+    store.store("Analyze Ford stock price performance and earnings", {"final_report": "ford"})
+    assert store.lookup("Analyze Boeing stock price performance and earnings") is None
+    assert store.stats["hits"] == 2
+
+
+def test_answer_store_is_opt_in(monkeypatch):
+    monkeypatch.delenv("WORKFLOW_REUSE", raising=False)
+    assert answer_store_from_env() is None
+    monkeypatch.setenv("WORKFLOW_REUSE", "1")
+    monkeypatch.setenv("WORKFLOW_REUSE_MAX_AGE", "120")
+    assert answer_store_from_env().max_age == 120
+
+
+def test_workflow_reuses_equivalent_answer(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    llm = CountingLLM()
+    wf = MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()],
+                            verbose=False, answer_store=AnswerStore())
+
+    first = wf.run("Analyze Tesla's stock performance")
+    calls = llm.calls
+    second = wf.run("How is TSLA stock doing")
+    assert llm.calls == calls
+    assert second["final_report"] == first["final_report"]
+    assert second["user_query"] == "How is TSLA stock doing"
+    assert second["reused_from"]["query"] == "Analyze Tesla's stock performance"
+    assert second["timings"]["cache"]["reuse"] == {"hits": 1, "misses": 0}
+
+    events = list(wf.stream("tesla performance"))
+    assert [e["type"] for e in events] == ["final"] and llm.calls == calls
+
+    # Bypass runs the agents and refreshes the stored answer
+    fresh = asyncio.run(wf.arun("How is TSLA stock doing", reuse=False))
+    assert llm.calls > calls and "reused_from" not in fresh
+    assert wf.run("Tesla performance")["final_report"] == fresh["final_report"]
+
+
+def test_workflow_without_store_always_runs(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("WORKFLOW_REUSE", raising=False)
+    llm = CountingLLM()
+    wf = MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()], verbose=False)
+    assert wf.answer_store is None
+    wf.run("Analyze Tesla stock")
+    calls = llm.calls
+    wf.run("Analyze Tesla stock")
+    assert llm.calls == 2 * calls
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from agents.researcher import ResearcherAgent
+from tools.search_tool import SearchTool
+
+
+def _serper_response(query: str) -> Mock:
+    company = query.split()[0]
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = {
+        "organic": [
+            {"title": f"{company} news", "snippet": f"{company} snippet", "link": f"https://{company}.example"},
+            {"title": "Market wrap", "snippet": "shared result", "link": "https://shared.example"},
+        ]
+    }
+    return response
+
+
+def test_search_many_dedupes_by_url_and_runs_concurrently(monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "test_key")
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_post(url, headers=None, data=None, timeout=None):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= 1
+        import json
+        return _serper_response(json.loads(data)["q"])
+
+    session = Mock()
+    session.post.side_effect = fake_post
+    with patch("tools.search_tool.get_session", return_value=session):
+        result = SearchTool().search_many(["apple stock", "microsoft stock", "tesla stock"])
+
+    assert active["peak"] == 3
+    assert result.count("Market wrap") == 1
+    for company in ("apple", "microsoft", "tesla"):
+        assert f"{company} news" in result
+
+
+def test_asearch_many_merges_and_keeps_errors(monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "test_key")
+
+    async def fake_afetch(self, query, key):
+        if query.startswith("tesla"):
+            return None, f"Search API error (status 500). Using fallback search for: {query}"
+        return _serper_response(query).json(), None
+
+    with patch.object(SearchTool, "_afetch", fake_afetch):
+        result = asyncio.run(SearchTool().asearch_many(["apple stock", "tesla stock"]))
+
+    assert "apple news" in result and result.count("Market wrap") == 1
+    assert "status 500" in result
+
+
+def test_researcher_fans_out_multi_company_queries(monkeypatch):
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+    researcher = ResearcherAgent(llm=None, tools=[SearchTool()], max_searches=2)
+
+    assert researcher._extract_sub_queries("Compare Apple, Microsoft and Tesla") == [
+        "apple stock", "microsoft stock"
+    ]
+    assert researcher._extract_sub_queries("Analyze Apple stock") == ["stock apple"]
+
+    findings = researcher.search("Compare Apple and Microsoft stock performance")
+    assert "AAPL" in findings and "MSFT" in findings
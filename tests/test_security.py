@@ -0,0 +1,95 @@
+import random
+import re
+
+import pytest
+
+from utils.metrics import REDACTIONS
+from utils.security import REDACTED, SENSITIVE_PATTERNS, OutputFilter
+
+
+SAMPLES = {
+    "credit_card": "4111 1111 1111 1111",
+    "api_key": "sk-abcdefghijklmnopqrstuvwxyz123",
+    "email": "john.doe@example.com",
+    "ssn": "123-45-6789",
+    "iban": "DE89 3704 0044 0532 0130 00",
+    "phone": "+1 415-555-0134",
+}
+
+REPORT = (
+    "Apple closed at $185.50 on 2024-01-01, up 2.3% year over year. "
+    "Contact {email} or {phone}. Card {credit_card}, SSN {ssn}, IBAN {iban}, key {api_key}.\n"
+).format(**SAMPLES)
+
+
+def _multi_pass(text: str) -> str:
+    """Reference: one re.sub per pattern, as OutputFilter used to do"""
+    for pattern in SENSITIVE_PATTERNS:
+        text = pattern.sub(REDACTED, text)
+    return text
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_each_pattern_is_redacted(name):
+    f = OutputFilter()
+    out = f.filter_output(f"value: {SAMPLES[name]} end")
+    assert out == f"value: {REDACTED} end"
+    assert f.match_counts()[name] == 1
+
+
+def test_clean_text_is_untouched():
+    text = "Revenue grew 12.5% to $94.9B in Q4 2024; margins 45.2% (2023-12-30)."
+    assert OutputFilter().filter_output(text) == text
+
+
+def test_financial_identifiers_and_amounts_are_kept():
+    text = "ISIN US0378331005, FR7630006000011234567890188 isn't valid, net +2500000 and +3.5% (+12.4 2024)."
+    assert OutputFilter().filter_output(text) == text
+    # Real IBANs and grouped numbers still go
+    assert OutputFilter().filter_output("GB82 WEST 1234 5698 7654 32 / +33 1 23 45 67 89") == f"{REDACTED} / {REDACTED}"
+
+
+def test_compiled_pattern_list_is_still_exported():
+    assert all(isinstance(p, re.Pattern) for p in SENSITIVE_PATTERNS)
+    assert OutputFilter.SENSITIVE_PATTERNS is SENSITIVE_PATTERNS
+
+
+def test_single_pass_matches_multi_pass_reference():
+    # Sequential passes let the card pattern eat the middle of an IBAN, so
+    # compare on values that do not overlap
+    text = REPORT.replace(SAMPLES["iban"], "n/a") * 50
+    assert OutputFilter(max_len=10 ** 9).filter_output(text) == _multi_pass(text)
+
+
+def test_truncation_still_applies():
+    out = OutputFilter(max_len=200).filter_output("x" * 1000)
+    assert len(out) < 200 and out.endswith("[TRUNCATED]")
+
+
+def test_streaming_matches_whole_text_for_any_chunking():
+    rng = random.Random(0)
+    expected = OutputFilter().redact(REPORT * 3)
+    for _ in range(50):
+        redactor = OutputFilter().stream()
+        text, out, i = REPORT * 3, [], 0
+        while i < len(text):
+            step = rng.randint(1, 15)
+            out.append(redactor.feed(text[i:i + step]))
+            i += step
+        out.append(redactor.flush())
+        assert "".join(out) == expected
+
+
+def test_streaming_never_emits_partial_secret():
+    redactor = OutputFilter().stream(holdback=32)
+    emitted = "".join(redactor.feed(ch) for ch in "mail me at john.doe@example.com please " + "." * 40)
+    assert "john" not in emitted and "example" not in emitted
+    assert (emitted + redactor.flush()).count(REDACTED) == 1
+
+
+def test_counters_per_pattern():
+    before = REDACTIONS.value(pattern="email")
+    f = OutputFilter()
+    f.filter_output("a@b.io and c@d.org")
+    assert f.match_counts()["email"] == 2
+    assert REDACTIONS.value(pattern="email") == before + 2
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from agents.researcher import ResearcherAgent
+from tools.search_tool import SearchTool
+from utils.metrics import SINGLEFLIGHT_COALESCED
+from utils.singleflight import SingleFlight
+from utils.tracing import RunTrace, use_trace
+from tests.conftest import Resp
+
+
+def _together(count, fn):
+    """Run fn() from `count` threads released at the same moment"""
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(count) as pool:
+        return [f.result() for f in [pool.submit(call) for _ in range(count)]]
+
+
+def test_threads_share_one_call_and_its_errors():
+    flight, calls = SingleFlight("test"), []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"value": len(calls)}
+
+    before = SINGLEFLIGHT_COALESCED.value(call="test")
+    results = _together(6, lambda: flight.do("key", slow))
+    assert len(calls) == 1 and all(r is results[0] for r in results)
+    assert flight.stats == {"calls": 6, "coalesced": 5}
+    assert SINGLEFLIGHT_COALESCED.value(call="test") == before + 5
+
+    # Finished calls are forgotten; failures reach every waiter
+    def failing():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        _together(3, lambda: flight.do("key", failing))
+    assert flight.do("key", lambda: "fresh") == "fresh"
+
+
+def test_coroutines_share_one_call_and_survive_cancellation():
+    flight, calls = SingleFlight("atest"), []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("key", slow))
+        await asyncio.sleep(0)
+        others = [asyncio.ensure_future(flight.ado("key", slow)) for _ in range(3)]
+        leader.cancel()
+        return await asyncio.gather(*others), await flight.ado("other", slow)
+
+    assert asyncio.run(main()) == (["done"] * 3, "done")
+    assert len(calls) == 2 and flight.stats["coalesced"] == 3
+
+
+def test_disabled_by_env(monkeypatch):
+    monkeypatch.setenv("SINGLEFLIGHT", "0")
+    flight, calls = SingleFlight("off"), []
+    _together(3, lambda: flight.do("key", lambda: (calls.append(1), time.sleep(0.02))))
+    assert len(calls) == 3
+
+
+def test_concurrent_identical_searches_make_one_request(stub_env, monkeypatch):
+    stub = stub_env()
+    monkeypatch.setenv("SEARCH_CACHE", "0")
+    request, arequest = SearchTool._request, SearchTool._arequest
+
+    def slow_request(self, *args):
+        time.sleep(0.05)
+        return request(self, *args)
+
+    async def slow_arequest(self, *args):
+        await asyncio.sleep(0.05)
+        return await arequest(self, *args)
+
+    monkeypatch.setattr(SearchTool, "_request", slow_request)
+    monkeypatch.setattr(SearchTool, "_arequest", slow_arequest)
+    tools = [SearchTool() for _ in range(4)]
+    picks = iter(tools)  # one tool per caller, as with separate workflows
+    results = _together(4, lambda: next(picks)._run("apple stock"))
+    assert stub.requests == 1 and len(set(results)) == 1 and "Result for apple stock" in results[0]
+
+    async def main():
+        return await asyncio.gather(*(tool._arun("Stock apple") for tool in tools), tools[0]._arun("tesla"))
+
+    results = asyncio.run(main())
+    assert stub.requests == 3 and len(set(results[:4])) == 1
+
+
+class SlowLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(0.05)
+        return Resp(f"answer to {messages[-1].content}")
+
+
+def test_identical_llm_prompts_are_coalesced():
+    llm = SlowLLM()
+    agents = [ResearcherAgent(llm, []) for _ in range(4)]
+    results = _together(4, lambda: agents[0]._invoke_llm([HumanMessage(content="apple")]))
+    assert llm.calls == 1 and results == ["answer to apple"] * 4
+
+    async def main():
+        return await asyncio.gather(*(agent._ainvoke_llm([HumanMessage(content=p)])
+                                      for agent, p in zip(agents, ["msft", "msft", "msft", "tsla"])))
+
+    assert asyncio.run(main()) == ["answer to msft"] * 3 + ["answer to tsla"]
+    assert llm.calls == 3
+    # Separate clients without a model name are never mixed up
+    assert ResearcherAgent(SlowLLM(), [])._flight_key([]) != agents[0]._flight_key([])
+
+
+def test_joining_run_records_a_coalesced_llm_event():
+    llm, traces = SlowLLM(), [RunTrace() for _ in range(2)]
+    picks = iter(traces)
+
+    def call():
+        with use_trace(next(picks)):
+            return ResearcherAgent(llm, [])._invoke_llm([HumanMessage(content="nvda")])
+
+    assert _together(2, call) == ["answer to nvda"] * 2 and llm.calls == 1
+    # Both runs show the call; the one that joined is marked and timed over its wait
+    assert [t.summary()["llm"]["calls"] for t in traces] == [1, 1]
+    joined = [e for t in traces for e in t.events if e.get("coalesced")]
+    assert len(joined) == 1 and joined[0]["kind"] == "llm" and joined[0]["duration_ms"] > 0
+    assert sorted(t.summary()["llm"]["by_agent"]["researcher"]["coalesced"] for t in traces) == [0, 1]
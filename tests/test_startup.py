@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup import BUDGET_PATH, forbidden_imports, measure
+
+
+BUDGETS = json.loads(BUDGET_PATH.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS))
+def test_entry_points_do_not_import_heavy_packages(module):
+    _, _, loaded = measure(module)
+    assert forbidden_imports(loaded, BUDGETS[module]["forbidden"]) == []
+
+
+def test_injected_llm_never_loads_gemini_client(tmp_path):
+    code = (
+        "import sys\n"
+        "from workflow import MultiAgentWorkflow\n"
+        "class LLM:\n"
+        "    def invoke(self, messages):\n"
+        "        return type('R', (), {'content': 'ok'})()\n"
+        "MultiAgentWorkflow(llm=LLM(), verbose=False).run('Analyze Apple stock')\n"
+        "print('langchain_google_genai' in sys.modules)\n"
+    )
+    env = {**os.environ, "OUTPUT_DIR": str(tmp_path), "SERPER_API_KEY": ""}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=BUDGET_PATH.parents[1], env=env)
+    assert result.stdout.strip().splitlines()[-1] == "False"
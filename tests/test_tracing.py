@@ -0,0 +1,107 @@
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from structlog.testing import capture_logs
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from utils.cache import MemoryCache, TieredCache
+from utils.tracing import RunTrace, span, use_trace
+from tests.conftest import FakeLLM, Resp
+
+
+class UsageLLM:
+    def invoke(self, messages):
+        return Resp("ok", usage_metadata={"input_tokens": 100, "output_tokens": 7, "total_tokens": 107})
+
+
+def _workflow(llm, verbose=False, **kwargs):
+    tools = [SearchTool(cache=TieredCache(MemoryCache())), CalculatorTool(), FileTool()]
+    return MultiAgentWorkflow(llm=llm, tools=tools, verbose=verbose, **kwargs)
+
+
+def test_run_stores_timing_breakdown(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setenv("SERPER_API_KEY", "test_key")
+    response = Mock(status_code=200)
+    response.json.return_value = {"organic": [{"title": "AAPL", "snippet": "Apple at 185.50, up 2.3%", "link": "https://a"}]}
+    session = Mock()
+    session.post.return_value = response
+
+    with patch("tools.search_tool.get_session", return_value=session):
+        timings = _workflow(FakeLLM("insight " * 10)).run("Analyze Apple stock")["timings"]
+
+    assert set(timings["nodes"]) == {"researcher", "analyst", "reporter"}
+    assert timings["total_ms"] >= sum(n["total_ms"] for n in timings["nodes"].values())
+    assert set(timings["tools"]) == {"search", "search_http", "calculator", "file_write"}
+    assert timings["llm"]["calls"] == 3
+    assert set(timings["llm"]["by_agent"]) == {"researcher", "analyst", "reporter"}
+    assert timings["llm"]["completion_tokens"] == 3 * 20
+    assert timings["cache"]["search"] == {"hits": 0, "misses": 2}
+
+
+def test_reported_token_usage_wins_over_estimate(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    llm = _workflow(UsageLLM(), parallel=True).run("Analyze Tesla stock")["timings"]["llm"]
+
+    assert llm["calls"] == 3
+    assert llm["prompt_tokens"] == 300 and llm["completion_tokens"] == 21
+
+
+def test_llm_cache_hits_are_traced(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+    wf = _workflow(FakeLLM("insight " * 10), llm_cache=TieredCache(MemoryCache()))
+
+    wf.run("Analyze Apple stock")
+    timings = wf.run("Analyze Apple stock")["timings"]
+
+    assert timings["cache"]["llm"] == {"hits": 3, "misses": 0}
+
+
+def test_events_are_logged_only_when_verbose(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    with capture_logs() as quiet:
+        _workflow(FakeLLM("insight " * 10)).run("Analyze Apple stock")
+    assert quiet == []
+
+    with capture_logs() as logs:
+        _workflow(FakeLLM("insight " * 10), verbose=True).run("Analyze Apple stock")
+    events = [(e["event"], e.get("name")) for e in logs]
+    assert events[0] == ("run_start", None) and events[-1] == ("run_end", None)
+    assert ("node", "reporter") in events and ("llm", "analyst") in events
+    assert all("duration_ms" in e for e in logs if e["event"] in ("node", "llm", "tool"))
+    json.dumps(logs)
+
+
+def test_span_is_a_noop_without_trace_and_marks_errors():
+    with span("tool", "calculator") as event:
+        event["ignored"] = True
+
+    trace = RunTrace()
+    with use_trace(trace):
+        try:
+            with span("tool", "calculator"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+    assert trace.events[0]["error"] is True
+    assert trace.summary()["tools"]["calculator"]["calls"] == 1
+
+
+def test_arun_parallel_traces_every_node(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    state = asyncio.run(_workflow(FakeLLM("insight " * 10), parallel=True).arun("Compare Apple and Tesla stock"))
+
+    assert set(state["timings"]["nodes"]) == {"search", "summarize", "analyst", "reporter"}
+    assert state["timings"]["llm"]["calls"] == 3
@@ -0,0 +1,71 @@
+import asyncio
+from pathlib import Path
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from tests.conftest import Resp
+
+
+class AsyncFakeLLM:
+    """Stub exposing both invoke and ainvoke; records which one was used"""
+
+    def __init__(self):
+        self.sync_calls = 0
+        self.async_calls = 0
+
+    def invoke(self, messages):
+        self.sync_calls += 1
+        return Resp("stubbed response")
+
+    async def ainvoke(self, messages):
+        self.async_calls += 1
+        await asyncio.sleep(0.01)
+        return Resp("stubbed async response")
+
+
+def test_arun_uses_async_path(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    llm = AsyncFakeLLM()
+    wf = MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()])
+
+    state = asyncio.run(wf.arun("Analyze Apple stock performance in 2024"))
+
+    assert state.get("completed") is True
+    assert state["final_report"] == "stubbed async response"
+    assert state.get("save_result", "").startswith("Successfully created report:")
+    assert llm.async_calls == 3 and llm.sync_calls == 0
+    assert any(p.suffix == ".md" for p in tmp_path.iterdir())
+
+
+def test_arun_many_queries_concurrently(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    llm = AsyncFakeLLM()
+    wf = MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()])
+
+    async def run_all():
+        queries = [f"Analyze Tesla stock {i}" for i in range(20)]
+        return await asyncio.gather(*(wf.arun(q) for q in queries))
+
+    states = asyncio.run(run_all())
+
+    assert len(states) == 20
+    assert all(s.get("completed") for s in states)
+    assert llm.async_calls == 60
+
+
+def test_tools_arun(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    search_result = asyncio.run(SearchTool()._arun("apple stock"))
+    assert "AAPL" in search_result
+
+    file_result = asyncio.run(FileTool()._arun("write", "notes.txt", "hello"))
+    assert file_result == "Successfully wrote content to notes.txt"
+    assert (tmp_path / "notes.txt").read_text(encoding="utf-8") == "hello"
@@ -7,19 +7,7 @@ from workflow import MultiAgentWorkflow
 from tools.search_tool import SearchTool
 from tools.calc_tool import CalculatorTool
 from tools.file_tool import FileTool
-
-
-class _Resp:
-    def __init__(self, content: str):
-        self.content = content
-
-
-class FakeLLM:
-    """Minimal stub to mimic .invoke(messages)->object with .content"""
-
-    def invoke(self, messages):
-        # Return a short, deterministic response regardless of messages
-        return _Resp("stubbed response")
+from tests.conftest import FakeLLM
 
 
 def test_workflow_happy_path(tmp_path: Path, monkeypatch):
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from tests.conftest import Resp
+
+
+class OverlapLLM:
+    """Stub that records the peak number of overlapping LLM calls"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def _enter(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _exit(self):
+        with self.lock:
+            self.active -= 1
+
+    def invoke(self, messages):
+        self._enter()
+        time.sleep(0.05)
+        self._exit()
+        return Resp("stubbed response")
+
+    async def ainvoke(self, messages):
+        self._enter()
+        await asyncio.sleep(0.05)
+        self._exit()
+        return Resp("stubbed async response")
+
+
+def _workflow(llm):
+    tools = [SearchTool(), CalculatorTool(), FileTool()]
+    return MultiAgentWorkflow(llm=llm, tools=tools, verbose=False, parallel=True)
+
+
+def test_parallel_graph_runs_branches_concurrently(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    llm = OverlapLLM()
+    state = _workflow(llm).run("Analyze Apple stock performance")
+
+    assert state.get("completed") is True
+    assert "AAPL" in state["research_findings"]
+    assert state["research_summary"] == "stubbed response"
+    assert state["analysis_insights"] == "stubbed response"
+    assert state["calculation_results"]
+    assert state["current_agent"] == "reporter"
+    # Summary and analysis LLM calls overlapped
+    assert llm.peak == 2
+
+
+def test_parallel_graph_async(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    llm = OverlapLLM()
+    state = asyncio.run(_workflow(llm).arun("Analyze Tesla stock performance"))
+
+    assert state.get("completed") is True
+    assert state["final_report"] == "stubbed async response"
+    assert state.get("save_result", "").startswith("Successfully created report:")
+    assert llm.peak == 2
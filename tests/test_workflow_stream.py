@@ -0,0 +1,94 @@
+import asyncio
+from pathlib import Path
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from utils.cache import MemoryCache, TieredCache
+from tests.conftest import Resp
+
+
+class StreamingLLM:
+    """Stub with invoke/stream/astream; streams the reply word by word"""
+
+    reply = "streamed reply text"
+
+    def __init__(self):
+        self.stream_calls = 0
+
+    def invoke(self, messages):
+        return Resp(self.reply)
+
+    def stream(self, messages):
+        self.stream_calls += 1
+        for word in self.reply.split(" "):
+            yield Resp(word + " ")
+
+    async def astream(self, messages):
+        self.stream_calls += 1
+        for word in self.reply.split(" "):
+            await asyncio.sleep(0)
+            yield Resp(word + " ")
+
+
+def _workflow(llm, **kwargs):
+    return MultiAgentWorkflow(llm=llm, tools=[SearchTool(), CalculatorTool(), FileTool()], verbose=False, **kwargs)
+
+
+def test_stream_yields_node_and_token_events(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    events = list(_workflow(StreamingLLM()).stream("Analyze Apple stock performance"))
+
+    kinds = [(e["type"], e.get("node")) for e in events if e["type"] != "token"]
+    assert kinds == [
+        ("node_start", "researcher"), ("node_end", "researcher"),
+        ("node_start", "analyst"), ("node_end", "analyst"),
+        ("node_start", "reporter"), ("node_end", "reporter"),
+        ("final", None),
+    ]
+    reporter_tokens = [e["content"] for e in events if e["type"] == "token" and e["node"] == "reporter"]
+    # The redactor holds back a short tail, so chunks may be merged but the text is unchanged
+    assert "".join(reporter_tokens) == "streamed reply text "
+
+    final = events[-1]["state"]
+    assert final["completed"] is True
+    assert final["final_report"] == "streamed reply text "
+
+
+def test_plain_run_does_not_stream(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    llm = StreamingLLM()
+    state = _workflow(llm).run("Analyze Apple stock")
+    assert llm.stream_calls == 0
+    assert state["final_report"] == "streamed reply text"
+
+
+def test_astream_parallel_graph(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    async def collect():
+        return [e async for e in _workflow(StreamingLLM(), parallel=True).astream("Analyze Tesla stock")]
+
+    events = asyncio.run(collect())
+
+    token_nodes = {e["node"] for e in events if e["type"] == "token"}
+    assert token_nodes == {"summarize", "analyst", "reporter"}
+    assert events[-1]["type"] == "final" and events[-1]["state"]["completed"] is True
+
+
+def test_stream_with_llm_cache_replays_hits(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.delenv("SERPER_API_KEY", raising=False)
+
+    llm = StreamingLLM()
+    wf = _workflow(llm, llm_cache=TieredCache(MemoryCache()))
+    list(wf.stream("Analyze Apple stock"))
+    events = list(wf.stream("Analyze Apple stock"))
+
+    assert llm.stream_calls == 3
+    reporter_tokens = [e["content"] for e in events if e["type"] == "token" and e["node"] == "reporter"]
+    assert reporter_tokens == ["streamed reply text "]
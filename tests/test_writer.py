@@ -0,0 +1,100 @@
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+from workflow import MultiAgentWorkflow
+from tools.search_tool import SearchTool
+from tools.calc_tool import CalculatorTool
+from tools.file_tool import FileTool
+from utils.writer import ReportWriter, atomic_write
+from tests.conftest import FakeLLM
+
+
+def _op(mode, path, text):
+    return (mode, path, text.encode("utf-8"), mode, Future())
+
+
+def test_atomic_write_replaces_without_leftovers(tmp_path: Path):
+    target = tmp_path / "report.md"
+    target.write_text("old")
+    atomic_write(target, b"new content")
+    assert target.read_text() == "new content"
+    assert [p.name for p in tmp_path.iterdir()] == ["report.md"]
+
+
+def test_batch_coalesces_operations_per_file(tmp_path: Path):
+    writer = ReportWriter()
+    a, b = tmp_path / "a.md", tmp_path / "b.md"
+    b.write_text("existing")
+    batch = [
+        _op("write", a, "header"), _op("append", a, " one"), _op("append", b, " more"),
+        _op("append", a, " two"), _op("append", b, " again"),
+    ]
+    writer._write_batch(batch)
+    assert a.read_text() == "header one two"
+    assert b.read_text() == "existing more again"
+    assert all(op[-1].result() > 0 for op in batch)
+    assert writer.stats["files_written"] == 2
+
+
+def test_later_write_supersedes_earlier_operations(tmp_path: Path):
+    writer = ReportWriter()
+    target = tmp_path / "a.md"
+    writer._write_batch([_op("write", target, "first"), _op("append", target, "x"), _op("write", target, "final")])
+    assert target.read_text() == "final"
+
+
+def test_background_writes_flush_and_close(tmp_path: Path):
+    writer = ReportWriter(fsync=False)
+    futures = [writer.append(tmp_path / "log.txt", f"{i}\n") for i in range(200)]
+    assert writer.flush(timeout=10)
+    assert all(f.done() for f in futures)
+    assert (tmp_path / "log.txt").read_text() == "".join(f"{i}\n" for i in range(200))
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.write(tmp_path / "late.txt", "x")
+    # Reads after close (e.g. at exit) must not wait on the stopped worker
+    assert writer.flush(timeout=1)
+
+
+def test_failed_write_surfaces_on_future(tmp_path: Path):
+    writer = ReportWriter()
+    future = writer.write(tmp_path / "missing" / "report.md", "x")
+    writer.flush(timeout=10)
+    with pytest.raises(OSError):
+        future.result()
+    assert writer.stats["errors"] == 1
+    writer.close()
+
+
+def test_file_tool_queues_writes_and_reads_back(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    tool = FileTool(writer=ReportWriter(fsync=False))
+    assert "background" in tool._run("create_report", "summary", "Body")
+    tool._run("append", "summary.md", "Appendix")
+    content = tool._run("read", "summary.md")
+    assert "Body" in content and content.rstrip().endswith("Appendix")
+    tool.close()
+    assert "Body" in tool._run("read", "summary.md")
+
+
+def test_file_tool_is_opt_in(monkeypatch):
+    monkeypatch.delenv("FILE_ASYNC_WRITES", raising=False)
+    assert FileTool().writer is None
+    monkeypatch.setenv("FILE_ASYNC_WRITES", "1")
+    tool = FileTool()
+    assert isinstance(tool.writer, ReportWriter)
+    tool.close()
+
+
+def test_workflow_close_flushes_reports(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    writer = ReportWriter()
+    wf = MultiAgentWorkflow(llm=FakeLLM(), tools=[SearchTool(), CalculatorTool(), FileTool(writer=writer)],
+                            verbose=False)
+    state = wf.run("Analyze Apple stock performance in 2024")
+    wf.close()
+    assert state["save_result"].startswith("Successfully created report:")
+    assert any(p.suffix == ".md" for p in tmp_path.iterdir())
+    assert writer.stats["errors"] == 0
@@ -1,9 +1,22 @@
-from langchain.tools import BaseTool
-from typing import Optional, Type
+from langchain_core.tools import BaseTool
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Type
 from pydantic import BaseModel, Field
-import math
 import re
 
+from utils.expression import ExpressionError, evaluate
+
+if TYPE_CHECKING:
+    from utils.facts import FactSet
+
+_NUMBER = re.compile(r'\d+\.?\d*')
+# A formula has an operator or a call; two words in a row mean free text
+_OPERATOR = re.compile(r'[-+*/%^()]')
+_PROSE = re.compile(r'[A-Za-z_]\w*\s+[A-Za-z_]')
+_SERIES_REQUEST = re.compile(r'\b(?:series|prices|price history|returns|drawdown|volatility|cagr)\b')
+# "NAME: 1, 2, 3" groups in correlation requests
+_SERIES_GROUP = re.compile(r'([A-Za-z][\w.\-]*)\s*:\s*([\d.,\s]+)')
+_PERIODS_PER_YEAR = {"daily": 252, "weekly": 52, "monthly": 12, "quarterly": 4, "annual": 1, "yearly": 1}
+
 
 class CalculatorInput(BaseModel):
     expression: str = Field(description="Mathematical expression or calculation request")
@@ -11,7 +24,7 @@ class CalculatorInput(BaseModel):
 
 class CalculatorTool(BaseTool):
     name = "calculator"
-    description = "Perform mathematical calculations and analysis"
+    description = "Calculate arithmetic expressions (with math functions) and financial metrics such as P/E, market cap and percentage change"
     args_schema: Type[BaseModel] = CalculatorInput
 
     def _run(
@@ -20,81 +33,156 @@ class CalculatorTool(BaseTool):
         run_manager: Optional[any] = None,
     ) -> str:
         try:
+            lower = expression.lower()
+            # Extracted once; each handler below works on the leading numbers
+            numbers = _NUMBER.findall(expression)
+
             # Handle common financial calculations first
-            if "p/e" in expression.lower() or "pe ratio" in expression.lower():
-                # Extract numbers for P/E calculation
-                numbers = re.findall(r'\d+\.?\d*', expression)
+            if "p/e" in lower or "pe ratio" in lower:
                 if len(numbers) >= 2:
                     price = float(numbers[0])
                     earnings = float(numbers[1])
                     pe_ratio = price / earnings if earnings != 0 else 0
                     return f"P/E Ratio calculation: {price} / {earnings} = {pe_ratio:.2f}"
-            
-            if "market cap" in expression.lower():
-                # Extract numbers for market cap calculation
-                numbers = re.findall(r'\d+\.?\d*', expression)
+
+            if "market cap" in lower:
                 if len(numbers) >= 2:
                     price = float(numbers[0])
                     shares = float(numbers[1])
                     market_cap = price * shares
                     return f"Market Cap calculation: {price} * {shares} = ${market_cap:.2f}B"
-            
-            if "percentage change" in expression.lower() or "%" in expression:
-                numbers = re.findall(r'\d+\.?\d*', expression)
+
+            if "percentage change" in lower or "%" in expression:
                 if len(numbers) >= 2:
                     old_value = float(numbers[0])
                     new_value = float(numbers[1])
                     change = ((new_value - old_value) / old_value) * 100
                     return f"Percentage change: ({new_value} - {old_value}) / {old_value} * 100 = {change:.2f}%"
-            
+
+            # Correlation across named series: "correlation AAPL: 1, 2, 3; MSFT: 4, 5, 6"
+            if "correlation" in lower:
+                series = {name: [float(n) for n in _NUMBER.findall(values)]
+                          for name, values in _SERIES_GROUP.findall(expression)}
+                if len(series) >= 2:
+                    return self._correlation(series)
+
+            # Price histories / value series of any length
+            if _SERIES_REQUEST.search(lower) and len(numbers) >= 2:
+                return self._series_summary([float(n) for n in numbers], lower)
+
             # Handle analysis requests with numbers
-            if "analysis" in expression.lower():
-                numbers = re.findall(r'\d+\.?\d*', expression)
+            if "analysis" in lower:
                 if numbers:
-                    nums = [float(n) for n in numbers[:5]]  # Take first 5 numbers
-                    results = []
-                    
-                    if len(nums) >= 1:
-                        results.append(f"Values found: {nums}")
-                    
+                    nums = [float(n) for n in numbers]
+                    results = [f"Values found: {nums[:5]}" + (f" ({len(nums)} values)" if len(nums) > 5 else "")]
+
                     if len(nums) >= 2:
-                        # Calculate basic statistics
-                        avg = sum(nums) / len(nums)
-                        max_val = max(nums)
-                        min_val = min(nums)
-                        results.append(f"Average: {avg:.2f}")
-                        results.append(f"Range: {min_val:.2f} to {max_val:.2f}")
-                        
-                        # Calculate percentage changes if we have enough numbers
-                        if len(nums) >= 2:
-                            change = ((nums[1] - nums[0]) / nums[0]) * 100
-                            results.append(f"Change from first to second value: {change:.2f}%")
-                    
+                        from utils.analytics import summarize
+
+                        stats = summarize(nums)
+                        results.append(f"Average: {stats['mean']:.2f}")
+                        results.append(f"Range: {stats['min']:.2f} to {stats['max']:.2f}")
+                        change = ((nums[1] - nums[0]) / nums[0]) * 100
+                        results.append(f"Change from first to second value: {change:.2f}%")
+                        if len(nums) >= 3:
+                            results.append(f"Change from first to last value: {stats['total_return'] * 100:.2f}%")
+                            results.append(f"Largest decline from a peak: {stats['max_drawdown'] * 100:.2f}%")
+
                     return "Financial Analysis:\n" + "\n".join(results)
-            
-            # Basic mathematical expression evaluation
-            # Only allow safe mathematical operations
-            safe_chars = set('0123456789+-*/.() ')
-            if all(c in safe_chars for c in expression):
-                # Additional safety check - no consecutive operators
-                if not re.search(r'[+\-*/]{2,}', expression):
-                    try:
-                        result = eval(expression)
-                        return f"Calculation result: {expression} = {result}"
-                    except:
-                        pass
-            
+
+            # Mathematical expressions go through the safe expression engine
+            # (no eval); free text is left to the number extraction below
+            if _OPERATOR.search(expression) and not _PROSE.search(expression):
+                try:
+                    result = evaluate(expression)
+                except ExpressionError as e:
+                    return f"Calculation error: {e}. Please provide a simpler mathematical expression."
+                return f"Calculation result: {expression.strip()} = {result}"
+
             # If no specific calculation can be performed, try to extract and analyze numbers
-            numbers = re.findall(r'\d+\.?\d*', expression)
             if numbers:
                 nums = [float(n) for n in numbers[:3]]
                 return f"Numbers extracted from '{expression}': {nums}. For specific calculations, please provide clear mathematical operations."
-            
+
             return f"Unable to perform calculation on: '{expression}'. Please provide a clear mathematical expression or specify the type of financial analysis needed."
-            
+
         except Exception as e:
             return f"Calculation error: {str(e)}. Please provide a simpler mathematical expression."
 
+    def calculate_facts(self, facts: "FactSet", calculations: Iterable[str] = ("analysis",)) -> str:
+        """Run calculations on typed facts (see utils.facts) without parsing text.
+
+        `calculations` names the metrics wanted: pe_ratio, percent_change,
+        market_cap or analysis (everything available). Facts are grouped by
+        label, so figures of different companies are never mixed.
+        """
+        from utils.facts import MARKET_CAP, PE_RATIO, PERCENT_CHANGE, PRICE
+
+        wanted = set(calculations)
+        if "analysis" in wanted:
+            wanted |= {PE_RATIO, PERCENT_CHANGE, MARKET_CAP}
+        lines = []
+        for label in facts.labels():
+            name = label or "unlabelled"
+            price = facts.first(PRICE, label)
+            pe = facts.first(PE_RATIO, label)
+            change = facts.first(PERCENT_CHANGE, label)
+            cap = facts.first(MARKET_CAP, label)
+            if price:
+                lines.append(f"Price ({name}): ${price.value:,.2f}")
+            if PE_RATIO in wanted and pe:
+                lines.append(f"P/E ratio ({name}): {pe.value:.2f}")
+                if price and pe.value:
+                    lines.append(f"  Implied earnings per share: {price.value:.2f} / {pe.value:.2f} = {price.value / pe.value:.2f}")
+            if PERCENT_CHANGE in wanted and change:
+                lines.append(f"Percentage change ({name}): {change.value:+.2f}%")
+                if price and change.value != -100:
+                    previous = price.value / (1 + change.value / 100)
+                    lines.append(f"  Implied previous price: {previous:.2f} -> {price.value:.2f}")
+            if MARKET_CAP in wanted and cap:
+                lines.append(f"Market cap ({name}): ${cap.value / 1e9:,.2f}B")
+                if price and price.value:
+                    lines.append(f"  Implied shares outstanding: {cap.value / price.value / 1e9:.2f}B")
+        if not lines:
+            return "No structured figures found for the requested calculations"
+        return "Structured Calculations:\n" + "\n".join(lines)
+
+    @staticmethod
+    def _series_summary(values: List[float], lower: str) -> str:
+        from utils.analytics import summarize
+
+        periods = next((count for word, count in _PERIODS_PER_YEAR.items() if word in lower), None)
+        stats = summarize(values, window=min(20, len(values)), periods_per_year=periods)
+        lines = [
+            f"Series of {stats['count']} values: {stats['first']:g} -> {stats['last']:g}",
+            f"Mean: {stats['mean']:.2f} (range {stats['min']:.2f} to {stats['max']:.2f})",
+            f"Total return: {stats['total_return'] * 100:.2f}%",
+            f"Mean return per period: {stats['mean_return'] * 100:.2f}%",
+            f"Compound growth per period: {stats['period_growth'] * 100:.2f}%",
+            f"Volatility per period: {stats['volatility'] * 100:.2f}%",
+            f"Max drawdown: {stats['max_drawdown'] * 100:.2f}%",
+            f"Mean of last {min(20, len(values))} values: {stats['rolling_mean']:.2f}",
+        ]
+        if periods:
+            lines.append(f"CAGR: {stats['cagr'] * 100:.2f}%")
+            lines.append(f"Annualized volatility: {stats['annualized_volatility'] * 100:.2f}%")
+        elif "cagr" in lower or "annualized" in lower:
+            lines.append("CAGR: not computed; say how often the values were sampled "
+                         f"({', '.join(_PERIODS_PER_YEAR)}) to annualize")
+        return "Series Analysis:\n" + "\n".join(lines)
+
+    @staticmethod
+    def _correlation(series: Dict[str, List[float]]) -> str:
+        from utils.analytics import correlation
+
+        try:
+            names, matrix = correlation(series)
+        except ValueError as e:
+            return f"Calculation error: {e}. Please provide at least three values per series."
+        lines = [f"{a} vs {b}: {matrix[i, j]:.3f}"
+                 for i, a in enumerate(names) for j, b in enumerate(names) if i < j]
+        return "Return Correlation:\n" + "\n".join(lines)
+
     async def _arun(
         self,
         expression: str,
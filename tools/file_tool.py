@@ -1,21 +1,67 @@
-from langchain.tools import BaseTool
-from typing import Optional, Type
+from langchain_core.tools import BaseTool
+from typing import Any, Iterator, Optional, Type
 from pydantic import BaseModel, Field
+import asyncio
+import codecs
+import mmap
 import os
+from concurrent.futures import Future
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
+from utils.metrics import FILE_BYTES_WRITTEN
+from utils.report_index import index_for
+from utils.tracing import get_logger
+from utils.writer import atomic_write, writer_from_env
+
+
+# Largest slice a single `read` returns (ask for further ranges with offset)
+MAX_READ_BYTES = int(os.getenv("FILE_READ_MAX_BYTES", str(1024 * 1024)))
+# Files at least this large are read through mmap instead of read() calls
+MMAP_THRESHOLD = 4 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=16)
+def _output_root(configured: str) -> Path:
+    """Resolved and created output directory (once per OUTPUT_DIR value)"""
+    root = Path(configured).resolve()
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
 
 class FileInput(BaseModel):
     action: str = Field(description="Action to perform: 'read', 'write', or 'append'")
     filename: str = Field(description="Name of the file to operate on")
     content: Optional[str] = Field(default="", description="Content to write (for write/append actions)")
+    offset: Optional[int] = Field(default=None, description="Byte offset to start reading from (read)")
+    length: Optional[int] = Field(default=None, description="Number of bytes to read (read)")
+    start_line: Optional[int] = Field(default=None, description="First line to read, 1-based (read)")
+    end_line: Optional[int] = Field(default=None, description="Last line to read, inclusive (read)")
+    query: Optional[str] = Field(default=None, description="User query the report answers (create_report)")
 
 
 class FileTool(BaseTool):
     name = "file_processor"
     description = "Read from and write to files for report generation and data storage"
     args_schema: Type[BaseModel] = FileInput
+    # Background ReportWriter (FILE_ASYNC_WRITES=1); None writes synchronously
+    writer: Optional[Any] = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.writer is None:
+            self.writer = writer_from_env()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued background writes (no-op without a writer)"""
+        return self.writer.flush(timeout) if self.writer is not None else True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush and stop the background writer"""
+        if self.writer is not None:
+            self.writer.close(timeout)
 
     def _run(
         self,
@@ -23,48 +69,56 @@ class FileTool(BaseTool):
         filename: str,
         content: str = "",
         run_manager: Optional[any] = None,
+        offset: Optional[int] = None,
+        length: Optional[int] = None,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        query: Optional[str] = None,
     ) -> str:
         try:
-            # Ensure operations are confined to a safe output directory
-            output_root = Path(os.getenv("OUTPUT_DIR", "./outputs")).resolve()
-            output_root.mkdir(parents=True, exist_ok=True)
-
-            # Normalize and sanitize the filename
-            # Disallow absolute paths and parent traversal
-            if filename.startswith("/") or ".." in filename:
-                return "File operation error: Unsafe filename/path"
-
-            # Replace path separators to avoid nesting
-            sanitized = filename.replace("\\", "_").replace("/", "_")
+            target_path = self._target_path(filename)
 
             # Enforce allowed extensions for write-like operations
             allowed_exts = {".md", ".txt"}
-            target_path = (output_root / sanitized).resolve()
-
-            # Ensure the final path is still under output_root
-            if not str(target_path).startswith(str(output_root)):
-                return "File operation error: Path escapes output directory"
 
             if action.lower() == "read":
-                if target_path.exists():
+                # Queued writes must land before the file is read back
+                self.flush()
+                if not target_path.exists():
+                    return f"File {target_path.name} not found."
+                if start_line is not None or end_line is not None:
+                    first = start_line or 1
+                    lines = "".join(self._iter_lines(target_path, first, end_line, MAX_READ_BYTES))
+                    return f"File content of {target_path.name} (lines {first}-{end_line or 'end'}):\n{lines}"
+                size = target_path.stat().st_size
+                if offset is None and length is None and size <= MAX_READ_BYTES:
                     with target_path.open('r', encoding='utf-8') as f:
                         file_content = f.read()
                     return f"File content of {target_path.name}:\n{file_content}"
-                else:
-                    return f"File {target_path.name} not found."
+                # Ranged read, capped so one call cannot flood a prompt
+                start = min(offset or 0, size)
+                count = min(length if length is not None else MAX_READ_BYTES, MAX_READ_BYTES)
+                file_content = "".join(self._iter_chunks(target_path, start, count))
+                end = min(start + count, size)
+                more = f"; next offset {end}" if end < size else ""
+                return f"File content of {target_path.name} (bytes {start}-{end} of {size}{more}):\n{file_content}"
 
             elif action.lower() == "write":
                 if target_path.suffix.lower() not in allowed_exts:
                     return "File operation error: Only .md and .txt are allowed"
-                with target_path.open('w', encoding='utf-8') as f:
-                    f.write(content)
+                if self._write(target_path, content, "write"):
+                    return f"Successfully queued content for {target_path.name}"
                 return f"Successfully wrote content to {target_path.name}"
 
             elif action.lower() == "append":
                 if target_path.suffix.lower() not in allowed_exts:
                     return "File operation error: Only .md and .txt are allowed"
+                if self.writer is not None:
+                    self.writer.append(target_path, f"\n\n{content}")
+                    return f"Successfully queued append to {target_path.name}"
                 with target_path.open('a', encoding='utf-8') as f:
                     f.write(f"\n\n{content}")
+                FILE_BYTES_WRITTEN.inc(len(content.encode('utf-8')) + 2, action="append")
                 return f"Successfully appended content to {target_path.name}"
 
             elif action.lower() == "create_report":
@@ -84,8 +138,18 @@ Report generated by Multi-Agent System
                     target_path = target_path.with_suffix(".md")
                 if target_path.suffix.lower() not in allowed_exts:
                     return "File operation error: Only .md and .txt are allowed"
-                with target_path.open('w', encoding='utf-8') as f:
-                    f.write(report_content)
+                queued = self._write(target_path, report_content, "create_report")
+                if queued is None:
+                    self._index_report(target_path, report_content, query)
+                else:
+                    # Indexed once the file is on disk; a failed write leaves no entry
+                    def index_written(done: Future) -> None:
+                        if done.exception() is None:
+                            self._index_report(target_path, report_content, query)
+
+                    queued.add_done_callback(index_written)
+                if queued:
+                    return f"Successfully created report: {target_path.name} (writing in background)"
                 return f"Successfully created report: {target_path.name}"
 
             else:
@@ -94,11 +158,150 @@ Report generated by Multi-Agent System
         except Exception as e:
             return f"File operation error: {str(e)}"
 
+    def iter_chunks(self, filename: str, chunk_size: int = CHUNK_SIZE, offset: int = 0,
+                    length: Optional[int] = None) -> Iterator[str]:
+        """Stream a file under OUTPUT_DIR as text chunks without loading it whole.
+
+        `offset`/`length` select a byte range; multi-byte characters split
+        by chunk boundaries are kept intact (a range starting or ending
+        inside one drops that character).
+        """
+        target_path = self._target_path(filename)
+        self.flush()
+        return self._iter_chunks(target_path, offset, length, chunk_size)
+
+    def iter_lines(self, filename: str, start_line: int = 1, end_line: Optional[int] = None) -> Iterator[str]:
+        """Stream lines `start_line`..`end_line` (1-based, inclusive) of a file"""
+        target_path = self._target_path(filename)
+        self.flush()
+        return self._iter_lines(target_path, start_line, end_line)
+
+    @staticmethod
+    def _target_path(filename: str) -> Path:
+        """Resolve `filename` inside OUTPUT_DIR, rejecting anything outside it"""
+        # Ensure operations are confined to a safe output directory
+        output_root = _output_root(os.getenv("OUTPUT_DIR", "./outputs"))
+
+        # Normalize and sanitize the filename
+        # Disallow absolute paths and parent traversal
+        if filename.startswith("/") or ".." in filename:
+            raise ValueError("Unsafe filename/path")
+
+        # Replace path separators to avoid nesting
+        sanitized = filename.replace("\\", "_").replace("/", "_")
+        target_path = (output_root / sanitized).resolve()
+
+        # Ensure the final path is still under output_root
+        if not str(target_path).startswith(str(output_root)):
+            raise ValueError("Path escapes output directory")
+        return target_path
+
+    @staticmethod
+    def _iter_chunks(path: Path, offset: int = 0, length: Optional[int] = None,
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        with path.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            end = size if length is None else min(size, offset + length)
+            if offset >= end:
+                return
+            if size >= MMAP_THRESHOLD:
+                # Slices of the mapping go straight from the page cache
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    for position in range(offset, end, chunk_size):
+                        text = decoder.decode(view[position:min(position + chunk_size, end)])
+                        if text:
+                            yield text
+            else:
+                f.seek(offset)
+                remaining = end - offset
+                while remaining > 0:
+                    data = f.read(min(chunk_size, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                    text = decoder.decode(data)
+                    if text:
+                        yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    @staticmethod
+    def _line_offset(f, size: int, line: int) -> int:
+        """Byte offset where 1-based `line` starts (`size` if past the end)"""
+        if line <= 1:
+            return 0
+        newlines_needed, position = line - 1, 0
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                # Count newlines a chunk at a time, then locate the exact one
+                while position < size:
+                    chunk_end = min(position + CHUNK_SIZE * 16, size)
+                    count = view[position:chunk_end].count(b"\n")
+                    if count >= newlines_needed:
+                        break
+                    newlines_needed -= count
+                    position = chunk_end
+                for _ in range(newlines_needed):
+                    found = view.find(b"\n", position)
+                    if found < 0:
+                        return size
+                    position = found + 1
+                return position
+        f.seek(0)
+        for number, raw in enumerate(f, 1):
+            position += len(raw)
+            if number == newlines_needed:
+                return position
+        return size
+
+    def _iter_lines(self, path: Path, start_line: int = 1, end_line: Optional[int] = None,
+                    max_bytes: Optional[int] = None) -> Iterator[str]:
+        with path.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(self._line_offset(f, size, start_line))
+            budget = max_bytes
+            for number, raw in enumerate(f, max(start_line, 1)):
+                if end_line is not None and number > end_line:
+                    return
+                if budget is not None:
+                    if len(raw) > budget:
+                        return
+                    budget -= len(raw)
+                yield raw.decode("utf-8", errors="ignore")
+
+    @staticmethod
+    def _index_report(target_path: Path, content: str, query: Optional[str]) -> None:
+        """Add a newly written report to the output directory's search index"""
+        try:
+            index = index_for(target_path.parent)
+            if index is not None:
+                # The file's own size and mtime, so `sync` sees it as unchanged
+                stat = target_path.stat()
+                index.add(target_path.name, content, query=query, size=stat.st_size, mtime=stat.st_mtime)
+        except Exception as e:
+            # The report itself is saved; `python reports.py sync` repairs the index
+            get_logger().warning("report_index_failed", path=str(target_path), error=str(e))
+
+    def _write(self, target_path: Path, content: str, action: str) -> Optional[Future]:
+        """Replace the file atomically; returns the writer's Future if queued"""
+        if self.writer is not None:
+            return self.writer.write(target_path, content, action=action)
+        atomic_write(target_path, content.encode('utf-8'))
+        FILE_BYTES_WRITTEN.inc(len(content.encode('utf-8')), action=action)
+        return None
+
     async def _arun(
         self,
         action: str,
         filename: str,
         content: str = "",
         run_manager: Optional[any] = None,
+        **options: Any,
     ) -> str:
-        return self._run(action, filename, content, run_manager)
+        if self.writer is not None and action.lower() != "read":
+            # Writes only queue work for the background writer; no thread hop needed
+            return self._run(action, filename, content, run_manager, **options)
+        # Offload blocking file I/O so the event loop stays free
+        return await asyncio.to_thread(self._run, action, filename, content, run_manager, **options)
@@ -1,10 +1,33 @@
-from langchain.tools import BaseTool
-from typing import Optional, Type
+from langchain_core.tools import BaseTool
+from typing import Any, Dict, List, Optional, Tuple, Type
 from pydantic import BaseModel, Field
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+import asyncio
 import json
 import os
-import bleach
+
+from utils.cache import cache_from_env
+from utils.http import aretrying, get_async_client, get_session, retrying
+from utils.metrics import SEARCH_FALLBACKS, SEARCH_HTTP_ERRORS
+from utils.ratelimit import OVERLOAD_STATUSES, alimited, limited
+from utils.singleflight import SingleFlight
+from utils.tracing import record, span
+
+
+SERPER_URL = "https://google.serper.dev/search"
+RESULTS_PER_QUERY = 5
+
+# Simulated results used when SERPER_API_KEY is not configured
+FALLBACK_RESULTS = {
+    "apple stock": "Apple Inc. (AAPL) stock price is $185.50, up 2.3% today. Market cap: $2.9T. P/E ratio: 28.5. Recent quarterly earnings showed strong iPhone sales and services revenue growth.",
+    "microsoft stock": "Microsoft Corp. (MSFT) stock price is $412.30, up 1.8% today. Market cap: $3.1T. P/E ratio: 32.1. Cloud computing and AI initiatives driving growth.",
+    "google stock": "Alphabet Inc. (GOOGL) stock price is $142.80, down 0.5% today. Market cap: $1.8T. P/E ratio: 25.2. Search revenue remains strong despite AI competition concerns.",
+    "tesla stock": "Tesla Inc. (TSLA) stock price is $248.50, up 3.2% today. Market cap: $790B. P/E ratio: 65.4. Electric vehicle delivery numbers exceeded expectations.",
+    "amazon stock": "Amazon.com Inc. (AMZN) stock price is $155.20, up 1.5% today. Market cap: $1.6T. P/E ratio: 45.8. AWS cloud services and retail growth driving performance."
+}
+
+_SEARCH_FLIGHTS = SingleFlight("search")
 
 
 class SearchInput(BaseModel):
@@ -15,47 +38,187 @@ class SearchTool(BaseTool):
     name = "search"
     description = "Search for information on the web using Serper.dev Google Search API"
     args_schema: Type[BaseModel] = SearchInput
+    # Result cache (memory LRU + optional SQLite tier) built from SEARCH_CACHE* env vars
+    cache: Optional[Any] = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.cache is None:
+            self.cache = cache_from_env("SEARCH")
 
     def _run(
         self,
         query: str,
         run_manager: Optional[any] = None,
     ) -> str:
+        # Get Serper API key from environment
+        serper_api_key = os.getenv("SERPER_API_KEY")
+        
+        if not serper_api_key:
+            return self._fallback_search(query)
+        
+        # Formatted output is cached too, so hits skip the bleach sanitizing
+        cache_key = self._cache_key("text", query)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        data, error = self._fetch(query, serper_api_key)
+        if error:
+            return error
+        result = self._format_search_results(data, query)
+        self._cache_set(cache_key, result)
+        return result
+    
+    def _fetch(self, query: str, serper_api_key: str) -> Tuple[Optional[dict], Optional[str]]:
+        """Call Serper.dev; returns (data, None) on success or (None, error message)"""
+        cache_key = self._cache_key("data", query)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached, None
+        
+        # Concurrent identical searches (e.g. several runs on one ticker) share one request
+        return _SEARCH_FLIGHTS.do(cache_key, lambda: self._request(query, serper_api_key, cache_key))
+    
+    def _request(self, query: str, serper_api_key: str, cache_key: str) -> Tuple[Optional[dict], Optional[str]]:
+        import requests
+
         try:
-            # Get Serper API key from environment
-            serper_api_key = os.getenv("SERPER_API_KEY")
-            
-            if not serper_api_key:
-                return self._fallback_search(query)
-            
-            # Serper.dev API endpoint
-            url = "https://google.serper.dev/search"
+            url, headers, payload = self._build_request(query, serper_api_key)
             
-            payload = json.dumps({
-                "q": query,
-                "num": 5  # Number of results
-            })
+            def attempt():
+                # Every attempt takes its own rate budget and reports its own 429s
+                with limited("search") as call, span("tool", "search_http") as event:
+                    response = get_session().post(url, headers=headers, data=payload, timeout=10)
+                    event["status"] = response.status_code
+                    call.overloaded = response.status_code in OVERLOAD_STATUSES
+                return response
             
-            headers = {
-                'X-API-KEY': serper_api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.post(url, headers=headers, data=payload, timeout=10)
+            response = retrying(attempt)
             
             if response.status_code == 200:
                 data = response.json()
-                return self._format_search_results(data, query)
+                self._cache_set(cache_key, data)
+                return data, None
             else:
-                return f"Search API error (status {response.status_code}). Using fallback search for: {query}"
+                SEARCH_HTTP_ERRORS.inc(reason="status")
+                return None, f"Search API error (status {response.status_code}). Using fallback search for: {query}"
                 
         except requests.exceptions.RequestException as e:
-            return f"Network error: {str(e)}. Using fallback search for: {query}"
+            SEARCH_HTTP_ERRORS.inc(reason="network")
+            return None, f"Network error: {str(e)}. Using fallback search for: {query}"
         except Exception as e:
-            return f"Search error: {str(e)}. Using fallback search for: {query}"
+            SEARCH_HTTP_ERRORS.inc(reason="other")
+            return None, f"Search error: {str(e)}. Using fallback search for: {query}"
+    
+    def search_many(self, queries: List[str], max_workers: Optional[int] = None) -> str:
+        """Run several searches concurrently and merge them into one result.
+
+        Organic results are deduplicated by URL across queries.
+        """
+        if len(queries) == 1:
+            return self._run(queries[0])
+        
+        serper_api_key = os.getenv("SERPER_API_KEY")
+        if not serper_api_key:
+            return self._merge_fallback(queries)
+        
+        with ThreadPoolExecutor(max_workers=max_workers or len(queries)) as pool:
+            # Each worker runs in a copy of the caller's context so timings reach its run trace
+            futures = [pool.submit(copy_context().run, self._fetch, q, serper_api_key) for q in queries]
+            outcomes = [future.result() for future in futures]
+        return self._merge_outcomes(queries, outcomes)
+    
+    async def asearch_many(self, queries: List[str]) -> str:
+        """Async variant of search_many() using concurrent HTTP requests"""
+        if len(queries) == 1:
+            return await self._arun(queries[0])
+        
+        serper_api_key = os.getenv("SERPER_API_KEY")
+        if not serper_api_key:
+            return self._merge_fallback(queries)
+        
+        outcomes = await asyncio.gather(*(self._afetch(q, serper_api_key) for q in queries))
+        return self._merge_outcomes(queries, outcomes)
+    
+    def _merge_outcomes(self, queries: List[str], outcomes: List[Tuple[Optional[dict], Optional[str]]]) -> str:
+        """Merge per-query API responses, deduplicating organic results by URL"""
+        merged = {"organic": []}
+        seen_links = set()
+        errors = []
+        
+        for data, error in outcomes:
+            if error:
+                errors.append(error)
+                continue
+            if "knowledgeGraph" in data and "knowledgeGraph" not in merged:
+                merged["knowledgeGraph"] = data["knowledgeGraph"]
+            for result in data.get("organic", []):
+                key = result.get("link") or result.get("title")
+                if key in seen_links:
+                    continue
+                seen_links.add(key)
+                merged["organic"].append(result)
+        
+        label = "; ".join(queries)
+        formatted = self._format_search_results(merged, label, max_organic=3 * len(queries))
+        return "\n\n".join([formatted] + errors)
+    
+    def _merge_fallback(self, queries: List[str]) -> str:
+        """Merge simulated results for several queries, dropping duplicates"""
+        snippets = []
+        for query in queries:
+            snippet = self._fallback_snippet(query)
+            if snippet and snippet not in snippets:
+                snippets.append(snippet)
+        
+        label = "; ".join(queries)
+        if not snippets:
+            return self._fallback_search(label)
+        SEARCH_FALLBACKS.inc()
+        return f"Search results for '{label}':\n\n" + "\n\n".join(snippets)
+    
+    def _build_request(self, query: str, serper_api_key: str) -> Tuple[str, dict, str]:
+        """Build the Serper.dev request (shared by the sync and async paths)"""
+        # Serper.dev API endpoint (overridable, e.g. for a local stub server)
+        url = os.getenv("SERPER_URL", SERPER_URL)
+        
+        payload = json.dumps({
+            "q": query,
+            "num": RESULTS_PER_QUERY  # Number of results
+        })
+        
+        headers = {
+            'X-API-KEY': serper_api_key,
+            'Content-Type': 'application/json'
+        }
+        
+        return url, headers, payload
+    
+    def _cache_key(self, kind: str, query: str) -> str:
+        """Cache key: normalized query (lowercase, word order ignored) + endpoint + num"""
+        normalized = " ".join(sorted(set(query.lower().split())))
+        return f"{kind}|{os.getenv('SERPER_URL', SERPER_URL)}|{RESULTS_PER_QUERY}|{normalized}"
+    
+    def _cache_get(self, key: str) -> Optional[Any]:
+        if self.cache is None:
+            return None
+        value = self.cache.get(key)
+        record("cache", "search", hit=value is not None, entry=key.split("|", 1)[0])
+        return value
+    
+    def _cache_set(self, key: str, value: Any) -> None:
+        if self.cache is not None:
+            self.cache.set(key, value)
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss/eviction counters per cache tier (empty when disabled)"""
+        return self.cache.stats() if self.cache is not None else {}
     
-    def _format_search_results(self, data: dict, query: str) -> str:
+    def _format_search_results(self, data: dict, query: str, max_organic: int = 3) -> str:
         """Format the search results from Serper API"""
+        import bleach
+
         results = []
         
         # Add knowledge graph info if available
@@ -68,7 +231,7 @@ class SearchTool(BaseTool):
         
         # Add organic search results
         if 'organic' in data:
-            for i, result in enumerate(data['organic'][:3]):  # Top 3 results
+            for i, result in enumerate(data['organic'][:max_organic]):  # Top results (3 by default)
                 title = bleach.clean(str(result.get('title', 'No title')), tags=[], strip=True)
                 snippet = bleach.clean(str(result.get('snippet', 'No description')), tags=[], strip=True)
                 results.append(f"{i+1}. **{title}**: {snippet}")
@@ -80,32 +243,88 @@ class SearchTool(BaseTool):
     
     def _fallback_search(self, query: str) -> str:
         """Fallback search with simulated results when API is not available"""
-        search_results = {
-            "apple stock": "Apple Inc. (AAPL) stock price is $185.50, up 2.3% today. Market cap: $2.9T. P/E ratio: 28.5. Recent quarterly earnings showed strong iPhone sales and services revenue growth.",
-            "microsoft stock": "Microsoft Corp. (MSFT) stock price is $412.30, up 1.8% today. Market cap: $3.1T. P/E ratio: 32.1. Cloud computing and AI initiatives driving growth.",
-            "google stock": "Alphabet Inc. (GOOGL) stock price is $142.80, down 0.5% today. Market cap: $1.8T. P/E ratio: 25.2. Search revenue remains strong despite AI competition concerns.",
-            "tesla stock": "Tesla Inc. (TSLA) stock price is $248.50, up 3.2% today. Market cap: $790B. P/E ratio: 65.4. Electric vehicle delivery numbers exceeded expectations.",
-            "amazon stock": "Amazon.com Inc. (AMZN) stock price is $155.20, up 1.5% today. Market cap: $1.6T. P/E ratio: 45.8. AWS cloud services and retail growth driving performance."
-        }
+        SEARCH_FALLBACKS.inc()
+        result = self._fallback_snippet(query)
+        if result:
+            return f"Search results for '{query}':\n\n{result}"
         
+        return f"Search results for '{query}': No specific information found, but here's general market info: Markets are showing mixed signals today with tech stocks performing variably. Consider checking financial news sources for the latest updates."
+    
+    def _fallback_snippet(self, query: str) -> Optional[str]:
+        """Look up the simulated result for a query (None when nothing matches)"""
         query_lower = query.lower()
         
         # Check for exact matches
-        for key, result in search_results.items():
+        for key, result in FALLBACK_RESULTS.items():
             if key.lower() in query_lower:
-                return f"Search results for '{query}':\n\n{result}"
+                return result
         
         # Check for partial matches
-        for key, result in search_results.items():
+        for key, result in FALLBACK_RESULTS.items():
             key_words = key.split()
             if any(word in query_lower for word in key_words):
-                return f"Search results for '{query}':\n\n{result}"
+                return result
         
-        return f"Search results for '{query}': No specific information found, but here's general market info: Markets are showing mixed signals today with tech stocks performing variably. Consider checking financial news sources for the latest updates."
+        return None
 
     async def _arun(
         self,
         query: str,
         run_manager: Optional[any] = None,
     ) -> str:
-        return self._run(query, run_manager)
+        serper_api_key = os.getenv("SERPER_API_KEY")
+        
+        if not serper_api_key:
+            return self._fallback_search(query)
+        
+        cache_key = self._cache_key("text", query)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        data, error = await self._afetch(query, serper_api_key)
+        if error:
+            return error
+        result = self._format_search_results(data, query)
+        self._cache_set(cache_key, result)
+        return result
+    
+    async def _afetch(self, query: str, serper_api_key: str) -> Tuple[Optional[dict], Optional[str]]:
+        """Async variant of _fetch() using the pooled httpx client"""
+        cache_key = self._cache_key("data", query)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached, None
+        
+        return await _SEARCH_FLIGHTS.ado(cache_key, lambda: self._arequest(query, serper_api_key, cache_key))
+    
+    async def _arequest(self, query: str, serper_api_key: str, cache_key: str) -> Tuple[Optional[dict], Optional[str]]:
+        import httpx
+
+        try:
+            url, headers, payload = self._build_request(query, serper_api_key)
+            
+            async def attempt():
+                async with alimited("search") as call:
+                    with span("tool", "search_http") as event:
+                        response = await get_async_client().post(url, headers=headers, content=payload, timeout=10)
+                        event["status"] = response.status_code
+                        call.overloaded = response.status_code in OVERLOAD_STATUSES
+                return response
+            
+            response = await aretrying(attempt)
+            
+            if response.status_code == 200:
+                data = response.json()
+                self._cache_set(cache_key, data)
+                return data, None
+            else:
+                SEARCH_HTTP_ERRORS.inc(reason="status")
+                return None, f"Search API error (status {response.status_code}). Using fallback search for: {query}"
+                
+        except httpx.HTTPError as e:
+            SEARCH_HTTP_ERRORS.inc(reason="network")
+            return None, f"Network error: {str(e)}. Using fallback search for: {query}"
+        except Exception as e:
+            SEARCH_HTTP_ERRORS.inc(reason="other")
+            return None, f"Search error: {str(e)}. Using fallback search for: {query}"
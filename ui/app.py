@@ -1,6 +1,6 @@
 import os
 import sys
-import time
+import threading
 from pathlib import Path
 
 import streamlit as st
@@ -12,6 +12,32 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from workflow import MultiAgentWorkflow
+from utils.health import start_health_server
+
+# Completed results kept per browser session (oldest dropped first)
+SESSION_RESULTS = 20
+
+
+@st.cache_resource
+def get_workflow() -> MultiAgentWorkflow:
+    """One warm workflow per process, shared by every browser session.
+
+    Runs keep their state inside their own graph invocation, and the shared
+    pieces (LLM client, HTTP pools, caches) are thread-safe, so concurrent
+    sessions can stream through it at the same time.
+    """
+    return MultiAgentWorkflow()
+
+
+@st.cache_resource
+def run_slots() -> threading.BoundedSemaphore:
+    """Process-wide cap on concurrent runs (UI_MAX_CONCURRENT_RUNS, default 4)"""
+    return threading.BoundedSemaphore(int(os.getenv("UI_MAX_CONCURRENT_RUNS", "4")))
+
+
+def result_key(query: str) -> str:
+    """Session cache key: whitespace- and case-insensitive query"""
+    return " ".join(query.split()).casefold()
 
 
 def ensure_output_dir():
@@ -22,6 +48,8 @@ def ensure_output_dir():
 
 def main():
     load_dotenv()
+    # Metrics and health probes on METRICS_PORT (started once per process)
+    start_health_server()
     st.set_page_config(page_title="Multi-Agent Research & Analysis", page_icon="🤖", layout="wide")
 
     st.title("🤖 Multi-Agent Research & Analysis")
@@ -45,6 +73,18 @@ def main():
         max_chars=1000,
     )
     run = st.button("🚀 Run Analysis", type="primary", disabled=not bool(query))
+    rerun = st.checkbox("Ignore cached result for this query", value=False)
+
+    # Completed runs of this session, keyed by normalized query
+    results = st.session_state.setdefault("results", {})
+    key = result_key(query) if query else None
+
+    if key in results and not (run and rerun):
+        # Re-render (tab switch, widget change, repeated click) without re-running the pipeline
+        if run:
+            st.info("Showing the cached result for this query.")
+        render_results(results[key])
+        return
 
     # Progress widgets
     overall = st.progress(0, text="Waiting to start…")
@@ -53,14 +93,17 @@ def main():
         st.subheader("🔍 Researcher")
         r_stat = st.empty()
         r_prog = st.progress(0)
+        r_text = st.empty()
     with c2:
         st.subheader("📊 Analyst")
         a_stat = st.empty()
         a_prog = st.progress(0)
+        a_text = st.empty()
     with c3:
         st.subheader("📝 Reporter")
         p_stat = st.empty()
         p_prog = st.progress(0)
+        p_text = st.empty()
 
     if run:
         if not os.getenv("GOOGLE_API_KEY"):
@@ -72,55 +115,79 @@ def main():
         a_stat.info("Waiting…")
         p_stat.info("Waiting…")
 
-        wf = MultiAgentWorkflow()
-
-        # Simulate staged progress around the blocking run
-        r_prog.progress(25)
-        overall.progress(25, text="Researcher running…")
-        time.sleep(0.2)
-
-        a_prog.progress(15)
-        overall.progress(40, text="Analyst preparing…")
-        time.sleep(0.2)
-
-        p_prog.progress(10)
-        overall.progress(50, text="Reporter preparing…")
-        time.sleep(0.2)
-
-        with st.spinner("Running multi-agent workflow…"):
-            state = wf.run(query)
+        wf = get_workflow()
+        slots = run_slots()
+        if not slots.acquire(blocking=False):
+            overall.progress(5, text="Waiting for a free slot (other sessions are running)…")
+            slots.acquire()
+
+        # Graph nodes -> (status, progress bar, live text, done message)
+        panels = {
+            "researcher": (r_stat, r_prog, r_text, "Search complete"),
+            "analyst": (a_stat, a_prog, a_text, "Analysis complete"),
+            "reporter": (p_stat, p_prog, p_text, "Report generated"),
+        }
+        streamed = {node: "" for node in panels}
+        finished = 0
+        state = {}
+
+        try:
+            # Ignoring the cached result also skips the workflow's answer reuse
+            for event in wf.stream(query, reuse=not rerun):
+                node = event.get("node")
+                if event["type"] == "node_start" and node in panels:
+                    stat, prog, _, _ = panels[node]
+                    stat.info("Running…")
+                    prog.progress(10)
+                    overall.progress(10 + finished * 30, text=f"{node.capitalize()} running…")
+                elif event["type"] == "token" and node in panels:
+                    _, prog, text, _ = panels[node]
+                    streamed[node] += event["content"]
+                    # Tokens arrive already redacted (see BaseAgent._invoke_llm)
+                    text.markdown(streamed[node])
+                    # Progress within a node is approximate: grows with streamed output
+                    prog.progress(min(90, 10 + len(streamed[node]) // 40))
+                elif event["type"] == "node_end" and node in panels:
+                    stat, prog, _, done = panels[node]
+                    finished += 1
+                    prog.progress(100)
+                    stat.success(done)
+                    overall.progress(10 + finished * 30, text=f"{finished}/{len(panels)} agents done")
+                elif event["type"] == "final":
+                    state = event["state"] or {}
+        finally:
+            slots.release()
 
-        # Fill progress after completion
-        r_prog.progress(100)
-        a_prog.progress(100)
-        p_prog.progress(100)
         overall.progress(100, text="Completed")
-        r_stat.success("Search complete")
-        a_stat.success("Analysis complete")
-        p_stat.success("Report generated")
-
-        # Display results
-        st.subheader("📊 Results")
-        tab1, tab2, tab3, tab4 = st.tabs(["Executive Summary", "Research", "Analysis", "Final Report"])
-
-        with tab1:
-            st.markdown("#### Summary")
-            st.write(state.get("analysis_insights") or state.get("research_summary") or "N/A")
-
-        with tab2:
-            st.markdown("#### Research Findings")
-            st.write(state.get("research_findings", "N/A"))
-
-        with tab3:
-            st.markdown("#### Analysis Insights")
-            st.write(state.get("analysis_insights", "N/A"))
-            st.markdown("#### Calculation Results")
-            st.code(state.get("calculation_results", "N/A"))
-
-        with tab4:
-            st.markdown("#### Final Report")
-            st.write(state.get("final_report", "N/A"))
-            st.info(state.get("save_result", ""))
+        results[key] = state
+        while len(results) > SESSION_RESULTS:
+            results.pop(next(iter(results)))
+        render_results(state)
+
+
+def render_results(state: dict) -> None:
+    """Result tabs for a completed run"""
+    st.subheader("📊 Results")
+    tab1, tab2, tab3, tab4 = st.tabs(["Executive Summary", "Research", "Analysis", "Final Report"])
+
+    with tab1:
+        st.markdown("#### Summary")
+        st.write(state.get("analysis_insights") or state.get("research_summary") or "N/A")
+
+    with tab2:
+        st.markdown("#### Research Findings")
+        st.write(state.get("research_findings", "N/A"))
+
+    with tab3:
+        st.markdown("#### Analysis Insights")
+        st.write(state.get("analysis_insights", "N/A"))
+        st.markdown("#### Calculation Results")
+        st.code(state.get("calculation_results", "N/A"))
+
+    with tab4:
+        st.markdown("#### Final Report")
+        st.write(state.get("final_report", "N/A"))
+        st.info(state.get("save_result", ""))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Container entrypoint for the Streamlit UI.
+
+Starts the metrics/health server (utils/health.py, on METRICS_PORT) and then
+hands over to the Streamlit CLI in the same process, so probes answer before
+the first browser session and /metrics reflects the UI's workflow runs.
+
+    python ui/serve.py --server.port=8501 --server.address=0.0.0.0
+"""
+
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.health import start_health_server
+
+
+def main():
+    load_dotenv()
+    start_health_server()
+
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", str(PROJECT_ROOT / "ui" / "app.py"), *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Every function accepts a 1-D series or a 2-D array with one series per row
+# and works along the last axis, so equal-length series are processed in one
+# NumPy pass. summarize_many() does that stacking for series of any lengths.
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+TRADING_DAYS = 252
+
+
+def _array(values: ArrayLike, min_length: int = 2) -> np.ndarray:
+    array = np.asarray(values, dtype=float)
+    if array.ndim not in (1, 2):
+        raise ValueError(f"expected a 1-D series or 2-D array of series, got {array.ndim} dimensions")
+    if array.shape[-1] < min_length:
+        raise ValueError(f"need at least {min_length} values, got {array.shape[-1]}")
+    return array
+
+
+def _window(array: np.ndarray, window: int) -> int:
+    if not 1 <= window <= array.shape[-1]:
+        raise ValueError(f"window must be between 1 and {array.shape[-1]}, got {window}")
+    return window
+
+
+def simple_returns(prices: ArrayLike) -> np.ndarray:
+    """Period-over-period returns: p[t] / p[t-1] - 1"""
+    prices = _array(prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return prices[..., 1:] / prices[..., :-1] - 1
+
+
+def log_returns(prices: ArrayLike) -> np.ndarray:
+    """Period-over-period log returns: ln(p[t] / p[t-1])"""
+    prices = _array(prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.diff(np.log(prices), axis=-1)
+
+
+def rolling_mean(values: ArrayLike, window: int) -> np.ndarray:
+    """Mean of each full window (n - window + 1 values per series)"""
+    values = _array(values, 1)
+    window = _window(values, window)
+    cumsum = np.cumsum(np.insert(values, 0, 0.0, axis=-1), axis=-1)
+    return (cumsum[..., window:] - cumsum[..., :-window]) / window
+
+
+def rolling_volatility(returns: ArrayLike, window: int, periods_per_year: Optional[int] = None) -> np.ndarray:
+    """Sample standard deviation of each full window of returns, annualized
+    with sqrt(periods_per_year) when given"""
+    returns = _array(returns)
+    window = _window(returns, window)
+    if window < 2:
+        raise ValueError("window must be at least 2 for a standard deviation")
+    padded = np.insert(returns, 0, 0.0, axis=-1)
+    sums = np.cumsum(padded, axis=-1)
+    squares = np.cumsum(padded ** 2, axis=-1)
+    window_sum = sums[..., window:] - sums[..., :-window]
+    window_squares = squares[..., window:] - squares[..., :-window]
+    variance = (window_squares - window_sum ** 2 / window) / (window - 1)
+    # Cancellation can leave tiny negative variances for flat windows
+    volatility = np.sqrt(np.clip(variance, 0.0, None))
+    return volatility * np.sqrt(periods_per_year) if periods_per_year else volatility
+
+
+def drawdown(prices: ArrayLike) -> np.ndarray:
+    """Decline from the running peak at each point (0 at new highs, negative below)"""
+    prices = _array(prices, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return prices / np.maximum.accumulate(prices, axis=-1) - 1
+
+
+def max_drawdown(prices: ArrayLike) -> Union[float, np.ndarray]:
+    """Largest peak-to-trough decline (a negative fraction, 0 if none)"""
+    return drawdown(prices).min(axis=-1)
+
+
+def cagr(prices: ArrayLike, periods_per_year: int = TRADING_DAYS) -> Union[float, np.ndarray]:
+    """Compound annual growth rate from first to last value, assuming
+    consecutive values are 1 / periods_per_year apart"""
+    prices = _array(prices)
+    years = (prices.shape[-1] - 1) / periods_per_year
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (prices[..., -1] / prices[..., 0]) ** (1 / years) - 1
+
+
+def correlation(series: Mapping[str, ArrayLike]) -> Tuple[List[str], np.ndarray]:
+    """Correlation matrix of the series' returns.
+
+    Series are aligned on their most recent values (the shortest length);
+    returns (names, matrix) with rows/columns in `names` order.
+    """
+    if len(series) < 2:
+        raise ValueError("need at least two series to correlate")
+    names = list(series)
+    arrays = [_array(series[name], 3) for name in names]
+    length = min(array.shape[-1] for array in arrays)
+    returns = simple_returns(np.vstack([array[-length:] for array in arrays]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return names, np.corrcoef(returns)
+
+
+def _summarize_matrix(prices: np.ndarray, window: int,
+                      periods_per_year: Optional[int]) -> Dict[str, np.ndarray]:
+    """All summary statistics for equal-length series (one per row)"""
+    count = prices.shape[-1]
+    returns = simple_returns(prices)
+    window = min(window, count)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stats = {
+            "count": np.full(prices.shape[0], count),
+            "first": prices[:, 0],
+            "last": prices[:, -1],
+            "mean": prices.mean(axis=-1),
+            "min": prices.min(axis=-1),
+            "max": prices.max(axis=-1),
+            "total_return": prices[:, -1] / prices[:, 0] - 1,
+            "mean_return": returns.mean(axis=-1),
+            "period_growth": (prices[:, -1] / prices[:, 0]) ** (1 / (count - 1)) - 1,
+            "volatility": returns.std(axis=-1, ddof=1) if count > 2 else np.full(prices.shape[0], np.nan),
+            "max_drawdown": max_drawdown(prices),
+            "rolling_mean": rolling_mean(prices, window)[:, -1],
+        }
+        if window > 2:
+            stats["rolling_volatility"] = rolling_volatility(returns, min(window, count - 1))[:, -1]
+        if periods_per_year:
+            stats["cagr"] = cagr(prices, periods_per_year)
+            stats["annualized_volatility"] = stats["volatility"] * np.sqrt(periods_per_year)
+    return stats
+
+
+def summarize_many(series: Mapping[str, ArrayLike], window: int = 20,
+                   periods_per_year: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """Summary statistics for many series at once.
+
+    Series of the same length are stacked and computed together; the result
+    maps each name to {count, first, last, mean, min, max, total_return,
+    mean_return, period_growth, volatility, max_drawdown, rolling_mean
+    (mean of the last `window` values), rolling_volatility} plus cagr and
+    annualized_volatility when `periods_per_year` is given. Undefined values
+    (e.g. returns from a zero price) are NaN.
+    """
+    by_length: Dict[int, List[str]] = {}
+    arrays = {}
+    for name, values in series.items():
+        arrays[name] = _array(values)
+        if arrays[name].ndim != 1:
+            raise ValueError(f"series {name!r} must be 1-D")
+        by_length.setdefault(arrays[name].shape[-1], []).append(name)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for names in by_length.values():
+        stats = _summarize_matrix(np.vstack([arrays[name] for name in names]), window, periods_per_year)
+        for row, name in enumerate(names):
+            results[name] = {key: values[row].item() for key, values in stats.items()}
+    return {name: results[name] for name in series}
+
+
+def summarize(prices: ArrayLike, window: int = 20, periods_per_year: Optional[int] = None) -> Dict[str, float]:
+    """Summary statistics for one series (see summarize_many)"""
+    return summarize_many({"series": prices}, window, periods_per_year)["series"]
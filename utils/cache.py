@@ -0,0 +1,180 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class MemoryCache:
+    """Thread-safe in-memory LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_size: int = 256, ttl: float = 900, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = self.clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk cache tier that survives restarts.
+
+    Values are stored as JSON. Expired rows are dropped on read and the
+    least recently used rows are evicted once `max_size` is exceeded.
+    """
+
+    def __init__(self, path: str, max_size: int = 10000, ttl: float = 86400,
+                 clock: Callable[[], float] = time.time):
+        self.path = str(path)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed_at)")
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(value, expires_at) of a live entry, or None"""
+        now = self.clock()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+            return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = self.clock()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_size
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats["evictions"] += overflow
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """Memory LRU in front of an optional disk tier; disk hits are promoted
+    for no longer than the disk entry has left to live"""
+
+    def __init__(self, memory: MemoryCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            remaining = expires_at - self.disk.clock()
+            self.memory.set(key, value, min(self.memory.ttl, remaining))
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        stats = {"memory": dict(self.memory.stats)}
+        if self.disk is not None:
+            stats["disk"] = dict(self.disk.stats)
+        return stats
+
+
+def cache_from_env(prefix: str, default_size: int = 256, default_ttl: float = 900,
+                   enabled_by_default: bool = True) -> Optional[TieredCache]:
+    """Build a TieredCache from <PREFIX>_CACHE* environment variables.
+
+    <PREFIX>_CACHE=0/1 disables or enables caching, <PREFIX>_CACHE_SIZE and
+    <PREFIX>_CACHE_TTL size the memory tier and <PREFIX>_CACHE_PATH enables
+    the SQLite tier at that path (bounded by <PREFIX>_CACHE_DISK_SIZE).
+    """
+    default = "1" if enabled_by_default else "0"
+    if os.getenv(f"{prefix}_CACHE", default).lower() in ("0", "false", "no", "off"):
+        return None
+    size = int(os.getenv(f"{prefix}_CACHE_SIZE", str(default_size)))
+    ttl = float(os.getenv(f"{prefix}_CACHE_TTL", str(default_ttl)))
+    path = os.getenv(f"{prefix}_CACHE_PATH")
+    disk_size = int(os.getenv(f"{prefix}_CACHE_DISK_SIZE", "10000"))
+    disk = SQLiteCache(path, max_size=disk_size, ttl=ttl) if path else None
+    return TieredCache(MemoryCache(max_size=size, ttl=ttl), disk)
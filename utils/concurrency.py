@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+
+class StageLimiter:
+    """Per-stage concurrency caps (e.g. "search", "llm") shared by all agents.
+
+    Sync callers are bounded by threading semaphores and async callers by
+    asyncio semaphores (one set per event loop). Stages without a configured
+    limit are not throttled.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = {stage: int(n) for stage, n in (limits or {}).items() if n}
+        self._thread_sems = {stage: threading.BoundedSemaphore(n) for stage, n in self.limits.items()}
+        self._loop_sems = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, stage: str):
+        """Hold a slot for `stage` in the calling thread"""
+        sem = self._thread_sems.get(stage)
+        if sem is None:
+            yield
+            return
+        with sem:
+            yield
+
+    @asynccontextmanager
+    async def alimit(self, stage: str):
+        """Hold a slot for `stage` in the running event loop"""
+        sem = self._async_semaphore(stage)
+        if sem is None:
+            yield
+            return
+        async with sem:
+            yield
+
+    def _async_semaphore(self, stage: str) -> Optional[asyncio.Semaphore]:
+        if stage not in self.limits:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sems = self._loop_sems.setdefault(loop, {})
+            if stage not in sems:
+                sems[stage] = asyncio.Semaphore(self.limits[stage])
+            return sems[stage]
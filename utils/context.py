@@ -0,0 +1,148 @@
+import os
+import re
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from utils.tracing import estimate_tokens, record
+
+# Token budget for the upstream content each agent puts into its prompt
+# (the system prompt and instructions come on top)
+DEFAULT_BUDGETS = {"researcher": 6000, "analyst": 4000, "reporter": 4000}
+
+# Blocks shorter than this are dropped rather than cut down to a stub
+MIN_BLOCK_CHARS = 160
+ELLIPSIS = " …"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_BLANK_LINES = re.compile(r"\n\s*\n")
+
+
+def budget_for(agent: str) -> Optional[int]:
+    """Prompt budget in tokens for `agent`: CONTEXT_BUDGET_<AGENT>, then the
+    default; None when CONTEXT_BUDGET=0 turns budgeting off"""
+    if os.getenv("CONTEXT_BUDGET", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    configured = os.getenv(f"CONTEXT_BUDGET_{agent.upper()}")
+    return int(configured) if configured else DEFAULT_BUDGETS.get(agent)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def dedupe_lines(text: str) -> str:
+    """Drop repeated non-blank lines (e.g. the same result returned by
+    several sub-searches), keeping the first occurrence"""
+    seen, kept = set(), []
+    for line in text.split("\n"):
+        key = _normalize(line)
+        if key and key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def remove_covered(text: str, references: Iterable[str]) -> str:
+    """Drop sentences of `text` that appear verbatim (modulo whitespace and
+    case) in any reference, i.e. content an upstream step already carried"""
+    covered = {_normalize(s) for reference in references if reference
+               for s in _SENTENCE_END.split(reference) if len(s) > 20}
+    if not covered:
+        return text
+    lines = []
+    for line in text.split("\n"):
+        sentences = [s for s in _SENTENCE_END.split(line) if _normalize(s) not in covered]
+        if sentences or not line.strip():
+            lines.append(" ".join(sentences))
+    return "\n".join(lines)
+
+
+def _truncate(block: str, chars: int) -> str:
+    """Cut `block` to at most `chars`, at a sentence end when one falls in
+    the second half, else at a word boundary"""
+    if len(block) <= chars:
+        return block
+    limit = max(chars - len(ELLIPSIS), 0)
+    head = block[:limit]
+    sentence = max(head.rfind(". "), head.rfind(".\n"))
+    if sentence >= limit // 2:
+        return head[:sentence + 1] + ELLIPSIS
+    space = head.rfind(" ")
+    return (head[:space] if space > 0 else head).rstrip() + ELLIPSIS
+
+
+def _allocate(sizes: List[int], weights: List[float], total: int) -> List[int]:
+    """Water-filling: sizes that fit their weighted share keep everything and
+    pass the rest on; the others split what remains by weight"""
+    shares = [0] * len(sizes)
+    pending = sorted(range(len(sizes)), key=lambda i: sizes[i] / weights[i])
+    remaining = total
+    while pending:
+        weight = sum(weights[i] for i in pending)
+        index = pending[0]
+        share = int(remaining * weights[index] / weight)
+        if sizes[index] > share:
+            for i in pending:
+                shares[i] = int(remaining * weights[i] / weight)
+            break
+        shares[index] = sizes[index]
+        remaining -= sizes[index]
+        pending.pop(0)
+    return shares
+
+
+def compact(text: str, max_tokens: int) -> str:
+    """Deterministically shrink `text` to about `max_tokens`.
+
+    Repeated lines go first. If that is not enough, the blank-line separated
+    blocks (search results, report sections) share the budget: short blocks
+    stay whole, long ones are cut at sentence boundaries, and blocks that
+    would be left too short are dropped from the end with a note.
+    """
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    text = dedupe_lines(text)
+    if len(text) <= max_chars:
+        return text
+    blocks = [b.strip() for b in _BLANK_LINES.split(text) if b.strip()]
+    dropped = 0
+    while len(blocks) > 1 and max_chars // len(blocks) < MIN_BLOCK_CHARS:
+        blocks.pop()
+        dropped += 1
+    note = f"\n\n[{dropped} more sections omitted]" if dropped else ""
+    available = max(max_chars - len(note) - 2 * (len(blocks) - 1), 0)
+    shares = _allocate([len(b) for b in blocks], [1.0] * len(blocks), available)
+    return "\n\n".join(_truncate(b, share) for b, share in zip(blocks, shares)) + note
+
+
+def fit_context(agent: str, fields: Mapping[str, str], weights: Optional[Mapping[str, float]] = None,
+                covered_by: Optional[Mapping[str, Iterable[str]]] = None) -> Dict[str, str]:
+    """Fit the upstream `fields` of one agent's prompt into its budget.
+
+    `covered_by` maps a field to the fields whose content makes parts of it
+    redundant (e.g. raw findings already condensed into the summary); those
+    sentences are removed first. The budget is then shared by weight, with
+    fields smaller than their share kept whole, and each field is compacted
+    to its share. Token counts before and after are recorded on the run
+    trace as a "context" event.
+    """
+    budget = budget_for(agent)
+    if budget is None:
+        return dict(fields)
+    before = sum(estimate_tokens(text) for text in fields.values())
+    result = dict(fields)
+    for name, others in (covered_by or {}).items():
+        if result.get(name):
+            result[name] = remove_covered(result[name], [fields[other] for other in others if other in fields])
+
+    names = list(result)
+    sizes = [estimate_tokens(result[name]) for name in names]
+    if sum(sizes) > budget:
+        shares = _allocate(sizes, [(weights or {}).get(name, 1.0) for name in names], budget)
+        for name, share in zip(names, shares):
+            result[name] = compact(result[name], share)
+
+    after = sum(estimate_tokens(text) for text in result.values())
+    record("context", agent, tokens_before=before, tokens_after=after)
+    return result
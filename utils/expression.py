@@ -0,0 +1,302 @@
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+Number = Union[int, float]
+
+# Termination limits: input size, nesting depth and the size of powers
+MAX_LENGTH = 1000
+MAX_DEPTH = 64
+MAX_EXPONENT = 10_000
+MAX_INT_BITS = 1 << 16
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that cannot be parsed or evaluated"""
+
+
+def _pow(base: Number, exponent: Number) -> Number:
+    if abs(exponent) > MAX_EXPONENT:
+        raise ExpressionError(f"exponent {exponent} exceeds the limit of {MAX_EXPONENT}")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 \
+            and base.bit_length() * exponent > MAX_INT_BITS:
+        raise ExpressionError("result too large")
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise ExpressionError("result is not a real number")
+    return result
+
+
+def _log(x: Number, base: Optional[Number] = None) -> float:
+    return math.log(x) if base is None else math.log(x, base)
+
+
+# name -> (function, min args, max args)
+FUNCTIONS: Dict[str, Tuple[Callable[..., Number], int, int]] = {
+    "abs": (abs, 1, 1),
+    "round": (round, 1, 2),
+    "min": (min, 1, 64),
+    "max": (max, 1, 64),
+    "sqrt": (math.sqrt, 1, 1),
+    "exp": (math.exp, 1, 1),
+    "log": (_log, 1, 2),
+    "ln": (math.log, 1, 1),
+    "log10": (math.log10, 1, 1),
+    "log2": (math.log2, 1, 1),
+    "sin": (math.sin, 1, 1),
+    "cos": (math.cos, 1, 1),
+    "tan": (math.tan, 1, 1),
+    "asin": (math.asin, 1, 1),
+    "acos": (math.acos, 1, 1),
+    "atan": (math.atan, 1, 1),
+    "floor": (math.floor, 1, 1),
+    "ceil": (math.ceil, 1, 1),
+    "pow": (_pow, 2, 2),
+}
+
+CONSTANTS: Dict[str, float] = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+# Left-associative binary operators by precedence level; `**` (or `^`) binds
+# tighter than unary minus on its left, as in Python: -2**2 == -4
+_LEVELS = {
+    "+": 10, "-": 10,
+    "*": 20, "/": 20, "//": 20, "%": 20,
+}
+_UNARY = 30
+_POWER = 40
+_BINARY = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "//": operator.floordiv,
+    "%": operator.mod,
+}
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<name>[A-Za-z_]\w*)"
+    r"|(?P<op>\*\*|//|[-+*/%^(),]))"
+)
+
+Token = Tuple[str, str, int]  # (kind, text, position)
+
+
+def _tokenize(text: str) -> List[Token]:
+    tokens, position, end = [], 0, len(text.rstrip())
+    while position < end:
+        match = _TOKEN.match(text, position)
+        if match is None:
+            offset = len(text) - len(text[position:].lstrip())
+            raise ExpressionError(f"unexpected character {text[offset]!r} at position {offset}")
+        tokens.append((match.lastgroup, match.group(match.lastgroup), match.start(match.lastgroup)))
+        position = match.end()
+    tokens.append(("end", "", end))
+    return tokens
+
+
+class _Parser:
+    """Pratt parser producing a small tuple AST.
+
+    Nodes: ("num", value), ("name", name), ("neg", node), ("pow", base,
+    exponent), ("call", name, [args]) and ("chain", first, [(op, node)]) for
+    runs of same-precedence left-associative operators, which keeps long sums
+    flat instead of nesting one level per term.
+    """
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def parse(self):
+        node = self.expression(0, 0)
+        kind, text, position = self.tokens[self.index]
+        if kind != "end":
+            raise ExpressionError(f"unexpected {text!r} at position {position}")
+        return node
+
+    def next(self) -> Token:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, text: str) -> None:
+        kind, found, position = self.next()
+        if found != text:
+            raise ExpressionError(f"expected {text!r} at position {position}" if kind != "end"
+                                  else f"expected {text!r} before end of expression")
+
+    def expression(self, rbp: int, depth: int):
+        if depth > MAX_DEPTH:
+            raise ExpressionError(f"expression nested deeper than {MAX_DEPTH} levels")
+        left = self.prefix(depth)
+        while True:
+            kind, op, _ = self.tokens[self.index]
+            if kind != "op":
+                return left
+            if op in ("**", "^"):
+                if _POWER <= rbp:
+                    return left
+                self.index += 1
+                # Right-associative: 2**3**2 == 2**(3**2)
+                left = ("pow", left, self.expression(_POWER - 1, depth + 1))
+            elif op in _LEVELS:
+                level = _LEVELS[op]
+                if level <= rbp:
+                    return left
+                self.index += 1
+                right = self.expression(level, depth + 1)
+                if left[0] == "chain" and _LEVELS[left[2][0][0]] == level:
+                    left[2].append((op, right))
+                else:
+                    left = ("chain", left, [(op, right)])
+            else:
+                return left
+
+    def prefix(self, depth: int):
+        kind, text, position = self.next()
+        if kind == "number":
+            value = float(text) if any(c in text for c in ".eE") else int(text)
+            return ("num", value)
+        if kind == "name":
+            if self.tokens[self.index][1] == "(":
+                return self.call(text, position, depth)
+            return ("name", text)
+        if text in ("-", "+"):
+            operand = self.expression(_UNARY, depth + 1)
+            return ("neg", operand) if text == "-" else operand
+        if text == "(":
+            node = self.expression(0, depth + 1)
+            self.expect(")")
+            return node
+        if kind == "end":
+            raise ExpressionError("unexpected end of expression")
+        raise ExpressionError(f"unexpected {text!r} at position {position}")
+
+    def call(self, name: str, position: int, depth: int):
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"unknown function {name!r} at position {position}")
+        self.expect("(")
+        args = []
+        if self.tokens[self.index][1] != ")":
+            args.append(self.expression(0, depth + 1))
+            while self.tokens[self.index][1] == ",":
+                self.index += 1
+                args.append(self.expression(0, depth + 1))
+        self.expect(")")
+        _, low, high = FUNCTIONS[name]
+        if not low <= len(args) <= high:
+            raise ExpressionError(f"{name}() takes {low if low == high else f'{low} to {high}'} "
+                                  f"argument(s), got {len(args)}")
+        return ("call", name, args)
+
+
+Evaluator = Callable[[Mapping[str, Number]], Number]
+
+
+def _compile(node) -> Evaluator:
+    """Turn an AST node into nested closures taking the variable mapping"""
+    kind = node[0]
+    if kind == "num":
+        value = node[1]
+        return lambda env: value
+    if kind == "name":
+        name = node[1]
+        if name in CONSTANTS:
+            value = CONSTANTS[name]
+            return lambda env: value
+
+        def lookup(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise ExpressionError(f"unknown name {name!r}") from None
+        return lookup
+    if kind == "neg":
+        operand = _compile(node[1])
+        return lambda env: -operand(env)
+    if kind == "pow":
+        base, exponent = _compile(node[1]), _compile(node[2])
+        return lambda env: _pow(base(env), exponent(env))
+    if kind == "call":
+        function = FUNCTIONS[node[1]][0]
+        args = [_compile(arg) for arg in node[2]]
+        if len(args) == 1:
+            only = args[0]
+            return lambda env: function(only(env))
+        return lambda env: function(*[arg(env) for arg in args])
+    # chain
+    first = _compile(node[1])
+    rest = [(_BINARY[op], _compile(operand)) for op, operand in node[2]]
+    if len(rest) == 1:
+        (apply, second), = rest
+        return lambda env: apply(first(env), second(env))
+
+    def chain(env):
+        value = first(env)
+        for apply, operand in rest:
+            value = apply(value, operand(env))
+        return value
+    return chain
+
+
+def _names(node) -> frozenset:
+    kind = node[0]
+    if kind == "name":
+        return frozenset() if node[1] in CONSTANTS else frozenset([node[1]])
+    if kind == "num":
+        return frozenset()
+    if kind == "neg":
+        return _names(node[1])
+    if kind == "pow":
+        return _names(node[1]) | _names(node[2])
+    if kind == "call":
+        return frozenset().union(*(_names(arg) for arg in node[2]))
+    return _names(node[1]).union(*(_names(operand) for _, operand in node[2]))
+
+
+class CompiledExpression:
+    """A parsed expression, reusable with different variable values"""
+
+    def __init__(self, source: str, tree):
+        self.source = source
+        self.names = _names(tree)
+        self._evaluate = _compile(tree)
+
+    def __call__(self, variables: Optional[Mapping[str, Number]] = None) -> Number:
+        try:
+            result = self._evaluate(variables or {})
+        except ExpressionError:
+            raise
+        except ZeroDivisionError:
+            raise ExpressionError("division by zero") from None
+        except OverflowError:
+            raise ExpressionError("result too large") from None
+        except (ValueError, TypeError) as e:
+            raise ExpressionError(str(e)) from None
+        if isinstance(result, float) and not math.isfinite(result):
+            raise ExpressionError("result is not finite")
+        return result
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(text: str) -> CompiledExpression:
+    """Parse and compile `text` (cached by expression text)"""
+    if len(text) > MAX_LENGTH:
+        raise ExpressionError(f"expression longer than {MAX_LENGTH} characters")
+    return CompiledExpression(text, _Parser(text).parse())
+
+
+def evaluate(text: str, variables: Optional[Mapping[str, Number]] = None) -> Number:
+    """Evaluate an arithmetic expression.
+
+    Supports + - * / // % ** (or ^), unary minus, parentheses, the functions
+    in FUNCTIONS, the constants pi, e and tau, and names bound in
+    `variables`. Raises ExpressionError for anything else.
+    """
+    return compile_expression(text.strip())(variables)
@@ -0,0 +1,114 @@
+import hashlib
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils.cache import MemoryCache
+from utils.tracing import record
+
+PRICE = "price"
+PERCENT_CHANGE = "percent_change"
+MARKET_CAP = "market_cap"
+PE_RATIO = "pe_ratio"
+
+_UNITS = {"t": 1e12, "trillion": 1e12, "b": 1e9, "billion": 1e9, "m": 1e6, "million": 1e6}
+_DOWN = {"down", "fell", "lost", "decreased", "dropped", "declined", "slipped"}
+
+_NUM = r"(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?"
+# One alternation scanned once over the findings. Labels (result titles and
+# ticker symbols) are matched in the same pass and apply to the facts after
+# them; earlier branches win at the same position.
+_FACTS = re.compile(
+    r"\*\*(?P<title>[^*\n]{1,120})\*\*"
+    r"|\((?P<ticker>[A-Z]{1,5}(?:\.[A-Z])?)\)"
+    rf"|(?i:\bmarket\s+cap(?:italization)?)\s*(?:of|:|is|was|at|=)?\s*(?:~|about|approximately|over)?\s*"
+    rf"\$?\s*(?P<cap>{_NUM})\s*(?P<cap_unit>(?i:trillion|billion|million)|[TBM])\b"
+    rf"|\b(?:P/?E|(?i:price[- ]to[- ]earnings))(?:\s+(?i:ratio))?\s*(?:of|:|is|was|at|=)?\s*(?P<pe>{_NUM})"
+    rf"|\b(?P<direction>(?i:up|down|rose|fell|gained|lost|increased|decreased|climbed|dropped|declined|slipped))"
+    rf"\s+(?:by\s+)?(?P<pct>{_NUM})\s*%"
+    rf"|\$\s?(?P<price>{_NUM})(?!\s*(?:(?i:trillion|billion|million)|[TBMK]\b)|\d|[,.]\d)"
+)
+
+
+class Fact(NamedTuple):
+    """A typed figure from the research findings"""
+
+    kind: str
+    value: float  # market caps in dollars, percent changes signed (2.3 means +2.3%)
+    label: Optional[str]  # ticker or result title the figure belongs to
+    text: str  # matched source text
+
+
+class FactSet:
+    """Facts in the order they appear in the findings"""
+
+    def __init__(self, facts: List[Fact]):
+        self.facts = facts
+        # (kind, label) and (kind, None) -> facts, so per-label lookups stay O(1)
+        self._index: Dict[Tuple[str, Optional[str]], List[Fact]] = {}
+        for fact in facts:
+            self._index.setdefault((fact.kind, None), []).append(fact)
+            if fact.label is not None:
+                self._index.setdefault((fact.kind, fact.label), []).append(fact)
+
+    def of(self, kind: str, label: Optional[str] = None) -> List[Fact]:
+        return list(self._index.get((kind, label), ()))
+
+    def first(self, kind: str, label: Optional[str] = None) -> Optional[Fact]:
+        return next(iter(self.of(kind, label)), None)
+
+    def labels(self) -> List[Optional[str]]:
+        return list(dict.fromkeys(f.label for f in self.facts))
+
+    def __iter__(self) -> Iterator[Fact]:
+        return iter(self.facts)
+
+    def __len__(self) -> int:
+        return len(self.facts)
+
+    def __repr__(self) -> str:
+        return f"FactSet({self.facts!r})"
+
+
+def _number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def parse_facts(findings: str) -> FactSet:
+    """Extract typed facts from research findings in a single regex pass"""
+    facts: List[Fact] = []
+    label: Optional[str] = None
+    for match in _FACTS.finditer(findings):
+        group = match.lastgroup
+        if group == "title":
+            label = match.group("title").strip()
+        elif group == "ticker":
+            label = match.group("ticker")
+        elif group == "cap_unit":
+            value = _number(match.group("cap")) * _UNITS[match.group("cap_unit").lower()]
+            facts.append(Fact(MARKET_CAP, value, label, match.group()))
+        elif group == "pe":
+            facts.append(Fact(PE_RATIO, _number(match.group("pe")), label, match.group()))
+        elif group == "pct":
+            value = _number(match.group("pct"))
+            if match.group("direction").lower() in _DOWN:
+                value = -value
+            facts.append(Fact(PERCENT_CHANGE, value, label, match.group()))
+        elif group == "price":
+            facts.append(Fact(PRICE, _number(match.group("price")), label, match.group()))
+    return FactSet(facts)
+
+
+# Extractions keyed by findings digest; findings are immutable once searched,
+# so the TTL only bounds memory for long-running processes
+_cache = MemoryCache(max_size=256, ttl=3600)
+
+
+def extract_facts(findings: str) -> FactSet:
+    """parse_facts() cached per findings hash"""
+    key = hashlib.sha256(findings.encode("utf-8")).hexdigest()
+    facts = _cache.get(key)
+    record("cache", "facts", hit=facts is not None)
+    if facts is None:
+        facts = parse_facts(findings)
+        _cache.set(key, facts)
+    return facts
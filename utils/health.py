@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.metrics import render_metrics
+
+
+# name -> check returning (ok, detail); evaluated on every /readyz request
+_readiness_checks: Dict[str, Callable[[], Tuple[bool, str]]] = {}
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def add_readiness_check(name: str, check: Callable[[], Tuple[bool, str]]) -> None:
+    """Register (or replace) a readiness check"""
+    _readiness_checks[name] = check
+
+
+def _google_api_key() -> Tuple[bool, str]:
+    ok = bool(os.getenv("GOOGLE_API_KEY"))
+    return ok, "configured" if ok else "GOOGLE_API_KEY not set"
+
+
+def _output_dir_writable() -> Tuple[bool, str]:
+    output_dir = Path(os.getenv("OUTPUT_DIR", "./outputs"))
+    try:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryFile(dir=output_dir):
+            pass
+        return True, str(output_dir)
+    except OSError as e:
+        return False, f"{output_dir}: {e}"
+
+
+add_readiness_check("google_api_key", _google_api_key)
+add_readiness_check("output_dir", _output_dir_writable)
+
+
+def readiness() -> Tuple[bool, Dict[str, Dict[str, object]]]:
+    """Run every readiness check; a check that raises counts as failed"""
+    results = {}
+    for name, check in list(_readiness_checks.items()):
+        try:
+            ok, detail = check()
+        except Exception as e:
+            ok, detail = False, str(e)
+        results[name] = {"ok": ok, "detail": detail}
+    return all(r["ok"] for r in results.values()), results
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """/metrics (Prometheus text format), /healthz (liveness) and /readyz"""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._send(200, render_metrics(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/readyz":
+            ok, checks = readiness()
+            self._send_json(200 if ok else 503, {"status": "ready" if ok else "not_ready", "checks": checks})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _send_json(self, status: int, body: dict) -> None:
+        self._send(status, json.dumps(body), "application/json")
+
+    def _send(self, status: int, body: str, content_type: str) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Probes hit these endpoints every few seconds; keep them out of the logs
+        pass
+
+
+def start_health_server(port: Optional[int] = None, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve metrics and probes from a daemon thread (once per process).
+
+    The port defaults to METRICS_PORT; when neither is set the server is
+    not started and None is returned. Port 0 picks a free port.
+    """
+    global _server
+    if port is None:
+        if not os.getenv("METRICS_PORT"):
+            return None
+        port = int(os.getenv("METRICS_PORT"))
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), HealthHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="health-server", daemon=True).start()
+        return _server
+
+
+def stop_health_server() -> None:
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
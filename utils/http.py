@@ -0,0 +1,146 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable
+
+# requests, urllib3 and httpx are imported on first use to keep startup fast
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None  # requests.Session
+_session_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _pool_size() -> int:
+    return int(os.getenv("HTTP_POOL_SIZE", "20"))
+
+
+def _max_retries() -> int:
+    return int(os.getenv("HTTP_MAX_RETRIES", "3"))
+
+
+def _backoff() -> float:
+    return float(os.getenv("HTTP_BACKOFF", "0.3"))
+
+
+def _build_retry():
+    """Connection-level retries only; 429/5xx responses are retried by
+    retrying(), above the caller's rate limiting"""
+    from urllib3.util.retry import Retry
+
+    options = dict(
+        total=_max_retries(),
+        backoff_factor=_backoff(),
+        status_forcelist=(),
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    try:
+        # urllib3 >= 2 supports jitter natively
+        return Retry(backoff_jitter=_backoff(), **options)
+    except TypeError:
+        return Retry(**options)
+
+
+def get_session():
+    """Process-wide keep-alive session with a sized pool and bounded
+    connection retries (wrap calls in retrying() to retry 429/5xx too).
+
+    Safe to share between threads; each thread checks a connection out of
+    the adapter's pool.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=_pool_size(),
+                    pool_maxsize=_pool_size(),
+                    max_retries=_build_retry(),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_async_client():
+    """Keep-alive httpx client for the running event loop (one per loop)"""
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=_pool_size(), max_keepalive_connections=_pool_size()),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _retry_delay(attempt: int, response: Any = None) -> float:
+    """Retry-After when the server sent one, else jittered exponential backoff"""
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return float(retry_after)
+    return _backoff() * (2 ** attempt) + random.uniform(0, _backoff())
+
+
+def retrying(send: Callable[[], Any]) -> Any:
+    """Call send() until its response is not a 429/5xx or HTTP_MAX_RETRIES
+    run out, sleeping between attempts.
+
+    Each attempt is a separate send() call, so a caller that rate-limits
+    inside send() spends budget and sees the status of every attempt, and
+    holds no concurrency slot while backing off.
+    """
+    retries = _max_retries()
+    for attempt in range(retries + 1):
+        response = send()
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            return response
+        time.sleep(_retry_delay(attempt, response))
+
+
+async def aretrying(send: Callable[[], Awaitable[Any]]) -> Any:
+    """Async variant of retrying() that also retries httpx transport errors"""
+    import httpx
+
+    retries = _max_retries()
+    for attempt in range(retries + 1):
+        try:
+            response = await send()
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+            response = None
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+
+async def apost(url: str, headers: dict, content: str, timeout: float = 10):
+    """POST with the shared async client, retrying 429/5xx with jittered backoff"""
+    client = get_async_client()
+    return await aretrying(lambda: client.post(url, headers=headers, content=content, timeout=timeout))
+
+
+def reset_http_clients() -> None:
+    """Drop pooled clients so the next call picks up new settings (tests, forks)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+    _async_clients.clear()
@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from utils.tracing import record
+
+
+class CachedLLM:
+    """Response cache between the workflow and the injected LLM.
+
+    Responses are keyed on the model name, temperature and a canonical hash
+    of the message list, and stored in any cache exposing get/set (e.g. a
+    utils.cache.TieredCache). Use for_agent() to get per-agent views that
+    share the cache but keep their own hit/miss counters.
+    """
+
+    def __init__(self, llm, cache, agent: str = "default", stats: Optional[Dict[str, Dict[str, int]]] = None):
+        self.llm = llm
+        self.cache = cache
+        self.agent = agent
+        self._stats = stats if stats is not None else {}
+        self._lock = threading.Lock()
+
+    def for_agent(self, agent: str) -> "CachedLLM":
+        view = CachedLLM(self.llm, self.cache, agent, self._stats)
+        view._lock = self._lock
+        return view
+
+    def cache_key(self, messages) -> str:
+        # Unnamed models are keyed by their class (seen through utils.ratelimit.LimitedLLM)
+        base = getattr(self.llm, "llm", self.llm)
+        model = getattr(self.llm, "model", None) or getattr(self.llm, "model_name", None) or type(base).__name__
+        temperature = getattr(self.llm, "temperature", None)
+        canonical = json.dumps(
+            {
+                "model": str(model),
+                "temperature": temperature,
+                "messages": [[getattr(m, "type", type(m).__name__), getattr(m, "content", str(m))] for m in messages],
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return "llm|" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def invoke(self, messages, **kwargs):
+        key = self.cache_key(messages)
+        cached = self._lookup(key)
+        if cached is not None:
+            return AIMessage(content=cached)
+        response = self.llm.invoke(messages, **kwargs)
+        self._store(key, response)
+        return response
+
+    async def ainvoke(self, messages, **kwargs):
+        key = self.cache_key(messages)
+        cached = self._lookup(key)
+        if cached is not None:
+            return AIMessage(content=cached)
+        response = await self._ainvoke_uncached(messages, **kwargs)
+        self._store(key, response)
+        return response
+
+    def stream(self, messages, **kwargs):
+        """Stream from the wrapped LLM; a cache hit arrives as a single chunk"""
+        key = self.cache_key(messages)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield AIMessageChunk(content=cached)
+            return
+        if not hasattr(self.llm, "stream"):
+            response = self.llm.invoke(messages, **kwargs)
+            self._store(key, response)
+            yield response
+            return
+        parts = []
+        for chunk in self.llm.stream(messages, **kwargs):
+            parts.append(getattr(chunk, "content", ""))
+            yield chunk
+        self._store(key, AIMessage(content="".join(p for p in parts if isinstance(p, str))))
+
+    async def astream(self, messages, **kwargs):
+        key = self.cache_key(messages)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield AIMessageChunk(content=cached)
+            return
+        if not hasattr(self.llm, "astream"):
+            response = await self._ainvoke_uncached(messages, **kwargs)
+            self._store(key, response)
+            yield response
+            return
+        parts = []
+        async for chunk in self.llm.astream(messages, **kwargs):
+            parts.append(getattr(chunk, "content", ""))
+            yield chunk
+        self._store(key, AIMessage(content="".join(p for p in parts if isinstance(p, str))))
+
+    async def _ainvoke_uncached(self, messages, **kwargs):
+        ainvoke = getattr(self.llm, "ainvoke", None)
+        if ainvoke is not None:
+            return await ainvoke(messages, **kwargs)
+        return await asyncio.to_thread(self.llm.invoke, messages, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent hits, misses and hit rate"""
+        with self._lock:
+            return {
+                agent: dict(counts, hit_rate=round(counts["hits"] / max(1, counts["hits"] + counts["misses"]), 3))
+                for agent, counts in self._stats.items()
+            }
+
+    def _lookup(self, key: str) -> Optional[str]:
+        value = self.cache.get(key)
+        with self._lock:
+            counts = self._stats.setdefault(self.agent, {"hits": 0, "misses": 0})
+            counts["hits" if value is not None else "misses"] += 1
+        record("cache", "llm", hit=value is not None, agent=self.agent)
+        return value
+
+    def _store(self, key: str, response) -> None:
+        content = getattr(response, "content", None)
+        # Only plain, non-empty text responses are worth caching
+        if isinstance(content, str) and content:
+            self.cache.set(key, content)
+
+    def __getattr__(self, name):
+        # Anything else (stream, bind, model, ...) goes to the wrapped LLM
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
@@ -0,0 +1,241 @@
+import bisect
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Latency buckets in seconds, from sub-millisecond tool calls to slow LLM runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with optional labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge set explicitly, or computed at scrape time by `collect`"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.collect = collect or self._snapshot
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _snapshot(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+                for key, v in sorted(self.collect().items())]
+
+
+class Registry:
+    """Ordered set of metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+WORKFLOW_RUNS = REGISTRY.register(Counter(
+    "workflow_runs_total", "Workflow runs by outcome", ["status"]))
+WORKFLOW_RUN_SECONDS = REGISTRY.register(Histogram(
+    "workflow_run_seconds", "End-to-end workflow run latency"))
+NODE_SECONDS = REGISTRY.register(Histogram(
+    "workflow_node_seconds", "Latency of each graph node (agent step)", ["node"]))
+LLM_CALLS = REGISTRY.register(Counter(
+    "llm_calls_total", "LLM calls by agent", ["agent"]))
+LLM_SECONDS = REGISTRY.register(Histogram(
+    "llm_call_seconds", "LLM call latency by agent", ["agent"]))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total", "LLM tokens by agent and direction (prompt/completion)", ["agent", "direction"]))
+TOOL_SECONDS = REGISTRY.register(Histogram(
+    "tool_call_seconds", "Tool call latency", ["tool"]))
+SEARCH_HTTP_ERRORS = REGISTRY.register(Counter(
+    "search_http_errors_total", "Failed Serper requests by reason (status/network/other)", ["reason"]))
+SEARCH_FALLBACKS = REGISTRY.register(Counter(
+    "search_fallbacks_total", "Searches answered from simulated fallback data"))
+FILE_BYTES_WRITTEN = REGISTRY.register(Counter(
+    "file_bytes_written_total", "Bytes written by the file tool", ["action"]))
+REDACTIONS = REGISTRY.register(Counter(
+    "output_redactions_total", "Sensitive values redacted by OutputFilter, by pattern", ["pattern"]))
+CONTEXT_TOKENS_SAVED = REGISTRY.register(Counter(
+    "context_tokens_saved_total", "Prompt tokens removed by context budgeting, by agent", ["agent"]))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "cache_lookups_total", "Cache lookups by cache and result (hit/miss)", ["cache", "result"]))
+
+PROVIDER_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "provider_wait_seconds", "Time provider calls waited for rate budget and a concurrency slot", ["provider"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)))
+PROVIDER_INFLIGHT = REGISTRY.register(Gauge(
+    "provider_inflight", "Provider calls in flight", ["provider"]))
+PROVIDER_QUEUED = REGISTRY.register(Gauge(
+    "provider_queued", "Provider calls waiting for a concurrency slot", ["provider"]))
+PROVIDER_CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "provider_concurrency_limit", "Current adaptive concurrency limit per provider", ["provider"]))
+PROVIDER_BACKOFFS = REGISTRY.register(Counter(
+    "provider_backoffs_total", "Concurrency limit decreases by provider and cause (overload/latency)",
+    ["provider", "reason"]))
+SINGLEFLIGHT_COALESCED = REGISTRY.register(Counter(
+    "singleflight_coalesced_total", "Calls that shared an identical in-flight call instead of making their own",
+    ["call"]))
+
+API_JOBS = REGISTRY.register(Counter(
+    "api_jobs_total", "API job submissions and outcomes (accepted/deduplicated/rejected/succeeded/failed)", ["outcome"]))
+API_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "api_queue_depth", "Jobs waiting for an API worker"))
+
+
+def _cache_hit_ratios() -> Dict[Tuple[str, ...], float]:
+    with CACHE_LOOKUPS._lock:
+        counts = dict(CACHE_LOOKUPS._values)
+    ratios = {}
+    for cache in {key[0] for key in counts}:
+        hits = counts.get((cache, "hit"), 0)
+        total = hits + counts.get((cache, "miss"), 0)
+        ratios[(cache,)] = round(hits / total, 4) if total else 0.0
+    return ratios
+
+
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "cache_hit_ratio", "Share of cache lookups that were hits", ["cache"], collect=_cache_hit_ratios))
+
+
+def observe_event(kind: str, name: str, fields: Dict[str, Any]) -> None:
+    """Fold a run-trace event (see utils.tracing) into the exported metrics"""
+    seconds = fields.get("duration_ms", 0.0) / 1000
+    if kind == "node":
+        NODE_SECONDS.observe(seconds, node=name)
+    elif kind == "llm" and not fields.get("coalesced"):
+        # Calls that joined another run's request are in singleflight_coalesced_total
+        LLM_CALLS.inc(agent=name)
+        LLM_SECONDS.observe(seconds, agent=name)
+        LLM_TOKENS.inc(fields.get("prompt_tokens", 0), agent=name, direction="prompt")
+        LLM_TOKENS.inc(fields.get("completion_tokens", 0), agent=name, direction="completion")
+    elif kind == "tool":
+        TOOL_SECONDS.observe(seconds, tool=name)
+    elif kind == "cache":
+        CACHE_LOOKUPS.inc(cache=name, result="hit" if fields.get("hit") else "miss")
+    elif kind == "context":
+        CONTEXT_TOKENS_SAVED.inc(fields.get("tokens_before", 0) - fields.get("tokens_after", 0), agent=name)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
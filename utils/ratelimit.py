@@ -0,0 +1,379 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, List, Optional
+
+from utils.metrics import (PROVIDER_BACKOFFS, PROVIDER_CONCURRENCY_LIMIT, PROVIDER_INFLIGHT, PROVIDER_QUEUED,
+                           PROVIDER_WAIT_SECONDS)
+from utils.tracing import estimate_prompt_tokens, estimate_tokens
+
+# Provider responses that mean "slow down"
+OVERLOAD_STATUSES = (429, 503)
+_OVERLOAD_MARKERS = ("429", "resource exhausted", "resource_exhausted", "rate limit", "quota", "too many requests")
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an exception from a provider client signals rate limiting
+    (HTTP 429/503, or Gemini's ResourceExhausted/quota errors)"""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status in OVERLOAD_STATUSES:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in _OVERLOAD_MARKERS)
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate_per_minute`, holding at most `burst`
+    (one minute's worth by default).
+
+    reserve() takes tokens immediately, letting the balance go negative,
+    and returns how long the caller must wait before using them. Later
+    callers queue behind earlier ones without any lock held while waiting,
+    so the same bucket serves threads and event loops alike.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or rate_per_minute)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """Take `amount` tokens (capped at the capacity); seconds to wait"""
+        with self._lock:
+            self._refill()
+            self._tokens -= min(amount, self.capacity)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def charge(self, amount: float) -> None:
+        """Take tokens used after the fact (e.g. completion tokens); only
+        later callers wait for them"""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit adjusted by AIMD from call outcomes.
+
+    Each successful call raises the limit by 1/limit (about +1 per round of
+    calls) up to `max_limit`; an overloaded call (429) or a latency spike
+    (over `latency_spike` times the smoothed latency of its latency class,
+    e.g. a prompt size bucket, so long prompts are not compared with short
+    ones) multiplies it by `backoff`, at most once per `cooldown` seconds so
+    one burst of failures counts once. Waiters are admitted in FIFO order, threads and coroutines
+    alike.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, initial: Optional[int] = None,
+                 backoff: float = 0.5, latency_spike: float = 3.0, cooldown: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic, name: str = "default"):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial or max_limit)
+        self.backoff = backoff
+        self.latency_spike = latency_spike
+        self.cooldown = cooldown
+        self.clock = clock
+        self.name = name
+        self.inflight = 0
+        # Smoothed latency and sample count of healthy calls, per latency class
+        self.latencies: Dict[Optional[Hashable], List[float]] = {}
+        self._last_backoff = float("-inf")
+        self._waiters = deque()  # [threading.Event] or [(loop, future)] entries
+        self._lock = threading.Lock()
+        self._publish()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._admit():
+                return
+            event = threading.Event()
+            self._waiters.append([event])
+            self._publish()
+        # The releasing thread takes the slot on our behalf before setting it
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = [(loop, future)]
+        with self._lock:
+            if self._admit():
+                return
+            self._waiters.append(entry)
+            self._publish()
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = entry in self._waiters
+                if queued:
+                    self._waiters.remove(entry)
+                    self._publish()
+            if not queued and future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot back
+                self._free()
+            raise
+
+    def release(self, latency: float, overloaded: bool = False,
+                latency_class: Optional[Hashable] = None) -> None:
+        """Return a slot and adapt the limit to how the call went"""
+        with self._lock:
+            self.inflight -= 1
+            baseline = self.latencies.get(latency_class)
+            spike = (not overloaded and baseline is not None and baseline[1] >= 10
+                     and latency > baseline[0] * self.latency_spike)
+            if overloaded or spike:
+                now = self.clock()
+                if now - self._last_backoff >= self.cooldown:
+                    self._last_backoff = now
+                    self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                    PROVIDER_BACKOFFS.inc(provider=self.name, reason="overload" if overloaded else "latency")
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+                if baseline is None:
+                    self.latencies[latency_class] = [latency, 1]
+                else:
+                    baseline[0] = 0.9 * baseline[0] + 0.1 * latency
+                    baseline[1] += 1
+            self._wake()
+
+    def _free(self) -> None:
+        """Return a slot without adapting the limit (call never ran)"""
+        with self._lock:
+            self.inflight -= 1
+            self._wake()
+
+    def _admit(self) -> bool:
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            self._publish()
+            return True
+        return False
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()[0]
+            self.inflight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(self._grant, future)
+        self._publish()
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            self._free()
+        else:
+            future.set_result(None)
+
+    def _publish(self) -> None:
+        PROVIDER_INFLIGHT.set(self.inflight, provider=self.name)
+        PROVIDER_QUEUED.set(len(self._waiters), provider=self.name)
+        PROVIDER_CONCURRENCY_LIMIT.set(int(self.limit), provider=self.name)
+
+
+class CallOutcome:
+    """Filled in by the caller inside ProviderLimiter.call()/acall()"""
+
+    def __init__(self):
+        self.overloaded = False  # set on a 429-style response
+        self.completion_tokens = 0  # charged to the tokens/min bucket afterwards
+
+
+class ProviderLimiter:
+    """Traffic shaping for one provider: requests/min and tokens/min buckets
+    plus an adaptive concurrency limit, each optional.
+
+    Wrap every provider call in call() (threads) or acall() (coroutines).
+    Both wait for rate budget and a concurrency slot, time the call, treat
+    overload exceptions (see is_overload_error) as back-off signals and
+    export wait time, in-flight and queued calls and the current limit
+    under the provider's name.
+    """
+
+    def __init__(self, name: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 concurrency: Optional[AdaptiveConcurrency] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        self.concurrency = concurrency
+        self.clock = clock
+
+    def _reserve(self, tokens: int) -> float:
+        wait = self.requests.reserve() if self.requests else 0.0
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    @contextmanager
+    def call(self, tokens: int = 0, latency_class: Optional[Hashable] = None):
+        start = self.clock()
+        wait = self._reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        if self.concurrency:
+            self.concurrency.acquire()
+        with self._running(start, latency_class) as outcome:
+            yield outcome
+
+    @asynccontextmanager
+    async def acall(self, tokens: int = 0, latency_class: Optional[Hashable] = None):
+        start = self.clock()
+        wait = self._reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        if self.concurrency:
+            await self.concurrency.aacquire()
+        with self._running(start, latency_class) as outcome:
+            yield outcome
+
+    @contextmanager
+    def _running(self, queued_at: float, latency_class: Optional[Hashable]):
+        began = self.clock()
+        PROVIDER_WAIT_SECONDS.observe(began - queued_at, provider=self.name)
+        outcome = CallOutcome()
+        try:
+            yield outcome
+        except Exception as e:
+            outcome.overloaded = outcome.overloaded or is_overload_error(e)
+            raise
+        finally:
+            if self.concurrency:
+                self.concurrency.release(self.clock() - began, outcome.overloaded, latency_class)
+            if self.tokens and outcome.completion_tokens:
+                self.tokens.charge(outcome.completion_tokens)
+
+
+def _env_number(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+@lru_cache(maxsize=None)
+def provider_limiter(provider: str) -> Optional[ProviderLimiter]:
+    """Process-wide limiter for "llm" or "search", built from
+    <PROVIDER>_RPM, <PROVIDER>_TPM and <PROVIDER>_MAX_CONCURRENCY; None
+    (no shaping) when none of them is set"""
+    prefix = provider.upper()
+    rpm, tpm = _env_number(f"{prefix}_RPM"), _env_number(f"{prefix}_TPM")
+    max_concurrency = _env_number(f"{prefix}_MAX_CONCURRENCY")
+    if not (rpm or tpm or max_concurrency):
+        return None
+    concurrency = AdaptiveConcurrency(int(max_concurrency), name=provider) if max_concurrency else None
+    return ProviderLimiter(provider, rpm, tpm, concurrency)
+
+
+def reset_provider_limiters() -> None:
+    """Drop the shared limiters so the next call picks up new settings (tests)"""
+    provider_limiter.cache_clear()
+
+
+@contextmanager
+def limited(provider: str, tokens: int = 0, latency_class: Optional[Hashable] = None):
+    """provider_limiter(provider).call(), or a no-op when unconfigured"""
+    limiter = provider_limiter(provider)
+    if limiter is None:
+        yield CallOutcome()
+        return
+    with limiter.call(tokens, latency_class) as outcome:
+        yield outcome
+
+
+@asynccontextmanager
+async def alimited(provider: str, tokens: int = 0, latency_class: Optional[Hashable] = None):
+    """Async variant of limited()"""
+    limiter = provider_limiter(provider)
+    if limiter is None:
+        yield CallOutcome()
+        return
+    async with limiter.acall(tokens, latency_class) as outcome:
+        yield outcome
+
+
+def _completion_tokens(content, usage) -> int:
+    if isinstance(usage, dict) and "output_tokens" in usage:
+        return usage["output_tokens"]
+    return estimate_tokens(content if isinstance(content, str) else "")
+
+
+class LimitedLLM:
+    """Chat model wrapper that sends every call through provider_limiter().
+
+    The workflow puts it directly above the model, below the response cache
+    (utils.llm_cache.CachedLLM), so cache hits neither use rate budget nor
+    skew the latency the concurrency limit adapts to. Calls are classed by
+    prompt size (powers of two in tokens) for latency spike detection, and
+    completion tokens are charged to the tokens/min budget afterwards.
+    """
+
+    def __init__(self, llm, provider: str = "llm"):
+        self.llm = llm
+        self.provider = provider
+
+    def invoke(self, messages, **kwargs):
+        tokens = estimate_prompt_tokens(messages)
+        with limited(self.provider, tokens, tokens.bit_length()) as call:
+            response = self.llm.invoke(messages, **kwargs)
+            call.completion_tokens = _completion_tokens(getattr(response, "content", ""),
+                                                        getattr(response, "usage_metadata", None))
+        return response
+
+    async def ainvoke(self, messages, **kwargs):
+        tokens = estimate_prompt_tokens(messages)
+        async with alimited(self.provider, tokens, tokens.bit_length()) as call:
+            if hasattr(self.llm, "ainvoke"):
+                response = await self.llm.ainvoke(messages, **kwargs)
+            else:
+                response = await asyncio.to_thread(self.llm.invoke, messages, **kwargs)
+            call.completion_tokens = _completion_tokens(getattr(response, "content", ""),
+                                                        getattr(response, "usage_metadata", None))
+        return response
+
+    def stream(self, messages, **kwargs):
+        if not hasattr(self.llm, "stream"):
+            yield self.invoke(messages, **kwargs)
+            return
+        tokens = estimate_prompt_tokens(messages)
+        with limited(self.provider, tokens, tokens.bit_length()) as call:
+            parts, usage = [], None
+            for chunk in self.llm.stream(messages, **kwargs):
+                parts.append(getattr(chunk, "content", ""))
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+            call.completion_tokens = _completion_tokens("".join(p for p in parts if isinstance(p, str)), usage)
+
+    async def astream(self, messages, **kwargs):
+        if not hasattr(self.llm, "astream"):
+            yield await self.ainvoke(messages, **kwargs)
+            return
+        tokens = estimate_prompt_tokens(messages)
+        async with alimited(self.provider, tokens, tokens.bit_length()) as call:
+            parts, usage = [], None
+            async for chunk in self.llm.astream(messages, **kwargs):
+                parts.append(getattr(chunk, "content", ""))
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+            call.completion_tokens = _completion_tokens("".join(p for p in parts if isinstance(p, str)), usage)
+
+    def __getattr__(self, name):
+        # Anything else (model, temperature, bind, ...) goes to the wrapped LLM
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
@@ -0,0 +1,251 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Company names the agents recognize, resolved to tickers when indexing and
+# searching so "Tesla" and "TSLA" find the same reports
+COMPANY_TICKERS = {
+    "apple": "AAPL",
+    "microsoft": "MSFT",
+    "google": "GOOGL",
+    "alphabet": "GOOGL",
+    "amazon": "AMZN",
+    "tesla": "TSLA",
+    "meta": "META",
+    "facebook": "META",
+    "netflix": "NFLX",
+    "nvidia": "NVDA",
+}
+
+REPORT_SUFFIXES = (".md", ".txt")
+DEFAULT_FILENAME = ".report_index.db"
+SYNC_BATCH = 500
+
+_PAREN_TICKER = re.compile(r"\(([A-Z]{1,5}(?:\.[A-Z])?)\)")
+_UPPER_WORD = re.compile(r"\b[A-Z]{2,5}\b")
+_WORD = re.compile(r"\w+")
+_REPORT_NAME = re.compile(r"^(?P<words>.*?)_?report_(?P<stamp>\d{8}_\d{6})$")
+# All-caps words in queries that are not tickers
+_NOT_TICKERS = {"AND", "OR", "NOT", "THE", "FOR", "VS", "USD", "EPS", "CEO", "AI", "PE", "YOY", "QOQ", "ETF"}
+
+
+class ReportHit(NamedTuple):
+    filename: str
+    query: str
+    tickers: List[str]
+    created_at: float
+    score: float  # higher is more relevant; 0 for listings without search text
+    snippet: str
+
+
+def extract_tickers(query: str, content: str = "") -> List[str]:
+    """Tickers named in a query or report: "(TSLA)" in the content, all-caps
+    symbols in the query and known company names in either"""
+    tickers = dict.fromkeys(_PAREN_TICKER.findall(content))
+    tickers.update(dict.fromkeys(w for w in _UPPER_WORD.findall(query) if w not in _NOT_TICKERS))
+    lowered = f"{query}\n{content}".lower()
+    for company, ticker in COMPANY_TICKERS.items():
+        if company in lowered:
+            tickers[ticker] = None
+    return list(tickers)
+
+
+def parse_report_name(filename: str) -> tuple:
+    """(query words, timestamp) from `<words>_report_<YYYYmmdd_HHMMSS>.md`;
+    either is None when the name does not follow that pattern"""
+    match = _REPORT_NAME.match(Path(filename).stem)
+    if match is None:
+        return None, None
+    created = datetime.strptime(match.group("stamp"), "%Y%m%d_%H%M%S").timestamp()
+    return match.group("words").replace("_", " ") or None, created
+
+
+def _match_expression(text: str) -> Optional[str]:
+    """Every word of `text` as a quoted FTS5 term (implicit AND), so user
+    input can never be read as query syntax"""
+    words = _WORD.findall(text)
+    return " ".join(f'"{word}"' for word in words) if words else None
+
+
+class ReportIndex:
+    """Full-text index of the reports in OUTPUT_DIR (SQLite FTS5).
+
+    Each report is keyed by filename with its query, tickers, creation time
+    and content. FileTool adds reports as they are created; sync() catches
+    up with files written by anything else. Searches use the FTS index and
+    the ticker/time indexes, so they do not depend on the number of files.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                " id INTEGER PRIMARY KEY, filename TEXT NOT NULL UNIQUE, query TEXT NOT NULL,"
+                " tickers TEXT NOT NULL, created_at REAL NOT NULL, size INTEGER NOT NULL, mtime REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS reports_created ON reports(created_at)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_tickers ("
+                " ticker TEXT NOT NULL, report_id INTEGER NOT NULL, PRIMARY KEY (ticker, report_id)) WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5("
+                " query, tickers, content, tokenize='porter unicode61')"
+            )
+
+    def add(self, filename: str, content: str, query: Optional[str] = None,
+            created_at: Optional[float] = None, size: Optional[int] = None, mtime: float = 0.0) -> None:
+        """Index (or re-index) a report. The query and timestamp default to
+        those in a `<words>_report_<timestamp>.md` name, then to the name and
+        the current time"""
+        name_query, name_created = parse_report_name(filename)
+        query = query or name_query or Path(filename).stem
+        created_at = created_at or name_created or time.time()
+        size = len(content.encode("utf-8")) if size is None else size
+        with self._lock, self._conn:
+            self._upsert(filename, content, query, created_at, size, mtime)
+
+    def _upsert(self, filename: str, content: str, query: str, created_at: float, size: int, mtime: float) -> None:
+        tickers = extract_tickers(query, content)
+        row = self._conn.execute("SELECT id FROM reports WHERE filename = ?", (filename,)).fetchone()
+        if row is not None:
+            self._delete(row[0])
+        report_id = self._conn.execute(
+            "INSERT INTO reports (filename, query, tickers, created_at, size, mtime) VALUES (?, ?, ?, ?, ?, ?)",
+            (filename, query, " ".join(tickers), created_at, size, mtime),
+        ).lastrowid
+        self._conn.execute("INSERT INTO reports_fts (rowid, query, tickers, content) VALUES (?, ?, ?, ?)",
+                           (report_id, query, " ".join(tickers), content))
+        self._conn.executemany("INSERT INTO report_tickers (ticker, report_id) VALUES (?, ?)",
+                               [(ticker, report_id) for ticker in tickers])
+
+    def _upsert_many(self, batch: List[tuple]) -> None:
+        # One transaction per batch instead of one per file
+        with self._lock, self._conn:
+            for row in batch:
+                self._upsert(*row)
+
+    def _delete(self, report_id: int) -> None:
+        self._conn.execute("DELETE FROM reports WHERE id = ?", (report_id,))
+        self._conn.execute("DELETE FROM reports_fts WHERE rowid = ?", (report_id,))
+        self._conn.execute("DELETE FROM report_tickers WHERE report_id = ?", (report_id,))
+
+    def remove(self, filename: str) -> bool:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id FROM reports WHERE filename = ?", (filename,)).fetchone()
+            if row is not None:
+                self._delete(row[0])
+        return row is not None
+
+    def search(self, text: Optional[str] = None, ticker: Optional[str] = None, since: Optional[float] = None,
+               until: Optional[float] = None, limit: int = 20) -> List[ReportHit]:
+        """Reports matching every word of `text` (best first), or the newest
+        reports when no text is given; `ticker` accepts symbols or known
+        company names, `since`/`until` are epoch seconds"""
+        match = _match_expression(text or "")
+        conditions, params = [], []
+        if ticker:
+            conditions.append("r.id IN (SELECT report_id FROM report_tickers WHERE ticker = ?)")
+            params.append(COMPANY_TICKERS.get(ticker.lower(), ticker.upper()))
+        if since is not None:
+            conditions.append("r.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("r.created_at < ?")
+            params.append(until)
+
+        if match is not None:
+            sql = ("SELECT r.filename, r.query, r.tickers, r.created_at, -bm25(reports_fts, 5.0, 3.0, 1.0),"
+                   " snippet(reports_fts, 2, '[', ']', '...', 12)"
+                   " FROM reports_fts JOIN reports r ON r.id = reports_fts.rowid"
+                   " WHERE reports_fts MATCH ?" + "".join(f" AND {c}" for c in conditions) +
+                   " ORDER BY bm25(reports_fts, 5.0, 3.0, 1.0) LIMIT ?")
+            params = [match] + params
+        else:
+            sql = ("SELECT r.filename, r.query, r.tickers, r.created_at, 0.0, '' FROM reports r" +
+                   (" WHERE " + " AND ".join(conditions) if conditions else "") +
+                   " ORDER BY r.created_at DESC LIMIT ?")
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [ReportHit(filename, query, tickers.split(), created_at, score, snippet)
+                for filename, query, tickers, created_at, score, snippet in rows]
+
+    def get(self, filename: str) -> Optional[ReportHit]:
+        with self._lock:
+            row = self._conn.execute("SELECT filename, query, tickers, created_at FROM reports WHERE filename = ?",
+                                     (filename,)).fetchone()
+        return ReportHit(row[0], row[1], row[2].split(), row[3], 0.0, "") if row else None
+
+    def sync(self, directory: str, suffixes: Iterable[str] = REPORT_SUFFIXES) -> Dict[str, int]:
+        """Bring the index in line with the reports in `directory`: index new
+        or changed files (by size and mtime) and drop deleted ones. Queries
+        and timestamps already indexed for a file are kept"""
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        with self._lock:
+            known = {filename: (report_id, query, created_at, size, mtime)
+                     for report_id, filename, query, created_at, size, mtime in self._conn.execute(
+                         "SELECT id, filename, query, created_at, size, mtime FROM reports")}
+        seen, batch = set(), []
+        for entry in os.scandir(directory):
+            if not entry.is_file() or not entry.name.lower().endswith(tuple(suffixes)):
+                continue
+            seen.add(entry.name)
+            stat = entry.stat()
+            existing = known.get(entry.name)
+            if existing is not None and existing[3:] == (stat.st_size, stat.st_mtime):
+                counts["unchanged"] += 1
+                continue
+            if existing is None:
+                query, created_at = parse_report_name(entry.name)
+                query, created_at = query or Path(entry.name).stem, created_at or stat.st_mtime
+                counts["added"] += 1
+            else:
+                query, created_at = existing[1], existing[2]
+                counts["updated"] += 1
+            content = Path(entry.path).read_text(encoding="utf-8", errors="ignore")
+            batch.append((entry.name, content, query, created_at, stat.st_size, stat.st_mtime))
+            if len(batch) >= SYNC_BATCH:
+                self._upsert_many(batch)
+                batch = []
+        self._upsert_many(batch)
+        with self._lock, self._conn:
+            for filename in known.keys() - seen:
+                self._delete(known[filename][0])
+                counts["removed"] += 1
+        return counts
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=16)
+def _open_index(path: str) -> ReportIndex:
+    return ReportIndex(path)
+
+
+def index_for(output_root: Path) -> Optional[ReportIndex]:
+    """Shared ReportIndex for an output directory, or None when REPORT_INDEX=0.
+
+    The database lives at REPORT_INDEX_PATH, by default `.report_index.db`
+    inside the output directory.
+    """
+    if os.getenv("REPORT_INDEX", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    return _open_index(os.getenv("REPORT_INDEX_PATH") or str(Path(output_root) / DEFAULT_FILENAME))
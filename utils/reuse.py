@@ -0,0 +1,187 @@
+import copy
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from utils.report_index import COMPANY_TICKERS, extract_tickers
+from utils.tracing import record
+
+# Words that carry no meaning for matching a query to a previous one
+STOPWORDS = frozenset("""
+    a about all an and any are as at be been by can could did do does for from give has have how i in
+    is it its me my of on or please show should tell than that the their them there this to us vs was
+    we were what whats when where which who why will with would you your
+    analyze analyse analysis overview report summary summarize latest current today now recent look
+""".split())
+
+# Spellings folded onto one term, so "How is TSLA doing" matches
+# "Tesla stock performance"
+SYNONYMS = {
+    "doing": "performance", "performed": "performance", "performing": "performance", "perform": "performance",
+    "shares": "stock", "share": "stock", "stocks": "stock", "equity": "stock",
+    "prices": "price", "valued": "valuation", "value": "valuation", "worth": "valuation",
+    "earning": "earnings", "profit": "earnings", "profits": "earnings", "income": "earnings",
+    "revenues": "revenue", "sales": "revenue",
+    "compare": "comparison", "compared": "comparison", "versus": "comparison",
+}
+
+# Words a query uses to say what it wants to know. Any other word may name
+# the subject itself (a company missing from COMPANY_TICKERS, a product, a
+# person), so it has to match exactly
+VOCABULARY = frozenset("""
+    stock price performance valuation earnings revenue comparison growth margin margins cash flow debt
+    dividend dividends yield market cap capitalization ratio pe eps forecast outlook guidance trend trends
+    return returns volatility risk risks quarter quarterly annual year yearly month monthly week weekly
+    daily history historical change percent percentage rate calculate calculation average total
+    financial financials fundamentals metrics key news investment invest buy sell hold rating target
+    top best worst high low lately last past next future trading volume
+""".split()) | frozenset(SYNONYMS) | frozenset(SYNONYMS.values())
+
+_TOKEN = re.compile(r"[a-z][a-z']*|\d+(?:\.\d+)?")
+
+
+class QuerySignature(NamedTuple):
+    """What a query asks about: tickers, content terms and literal numbers.
+    `entities` are the terms outside VOCABULARY"""
+
+    tickers: FrozenSet[str]
+    terms: FrozenSet[str]
+    numbers: FrozenSet[str]
+    entities: FrozenSet[str]
+
+
+def _term(word: str) -> str:
+    word = word.rstrip("'").removesuffix("'s")
+    return SYNONYMS.get(word, word)
+
+
+def query_signature(query: str) -> QuerySignature:
+    """Normalize a query: company names and symbols become tickers, the
+    remaining words are lowercased, folded through SYNONYMS and stripped of
+    STOPWORDS, and numbers are kept verbatim"""
+    tickers = frozenset(extract_tickers(query))
+    ticker_words = {t.lower() for t in tickers} | {c for c, t in COMPANY_TICKERS.items() if t in tickers}
+    terms, numbers = set(), set()
+    for word in _TOKEN.findall(query.lower()):
+        if word[0].isdigit():
+            numbers.add(word)
+            continue
+        term = _term(word)
+        if term not in STOPWORDS and term not in ticker_words and len(term) > 1:
+            terms.add(term)
+    if tickers:
+        # A question about a company is about its stock whether or not it says so
+        terms.discard("stock")
+    entities = frozenset(term for term in terms if term not in VOCABULARY)
+    return QuerySignature(tickers, frozenset(terms), frozenset(numbers), entities)
+
+
+def similarity(a: QuerySignature, b: QuerySignature) -> float:
+    """0..1 similarity of two signatures. Queries about different tickers,
+    numbers or entities never match; otherwise the cosine of their term sets
+    (two term-less queries about the same tickers count as identical)"""
+    if a.tickers != b.tickers or a.numbers != b.numbers or a.entities != b.entities:
+        return 0.0
+    if not a.terms and not b.terms:
+        return 1.0 if a.tickers else 0.0
+    if not a.terms or not b.terms:
+        return 0.0
+    return len(a.terms & b.terms) / math.sqrt(len(a.terms) * len(b.terms))
+
+
+class ReuseHit(NamedTuple):
+    state: Dict[str, Any]
+    query: str  # the earlier query whose answer is reused
+    similarity: float
+    age_s: float
+
+
+class AnswerStore:
+    """Recent completed runs, looked up by query similarity.
+
+    A lookup returns the stored final state of the most similar earlier
+    query when it is at least `min_similarity` alike and younger than
+    `max_age` seconds. Entries are bucketed by ticker set, so a lookup only
+    compares against runs about the same companies.
+    """
+
+    def __init__(self, max_size: int = 1000, max_age: float = 3600, min_similarity: float = 0.8,
+                 clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.min_similarity = min_similarity
+        self.clock = clock
+        self._lock = threading.Lock()
+        # query -> (signature, stored_at, state); insertion order is age order
+        self._entries: "OrderedDict[str, Tuple[QuerySignature, float, Dict[str, Any]]]" = OrderedDict()
+        self._by_tickers: Dict[FrozenSet[str], List[str]] = {}
+        self.stats = {"hits": 0, "misses": 0, "stored": 0}
+
+    def lookup(self, query: str) -> Optional[ReuseHit]:
+        signature = query_signature(query)
+        now = self.clock()
+        best: Optional[ReuseHit] = None
+        with self._lock:
+            self._expire(now)
+            # Buckets are oldest first, so ties go to the most recent answer
+            for candidate in self._by_tickers.get(signature.tickers, ()):
+                stored, stored_at, state = self._entries[candidate]
+                score = similarity(signature, stored)
+                if score >= self.min_similarity and (best is None or score >= best.similarity):
+                    best = ReuseHit(state, candidate, score, now - stored_at)
+            self.stats["hits" if best else "misses"] += 1
+        record("cache", "reuse", hit=best is not None)
+        if best is None:
+            return None
+        return best._replace(state=copy.deepcopy(best.state))
+
+    def store(self, query: str, state: Dict[str, Any]) -> None:
+        signature = query_signature(query)
+        now = self.clock()
+        with self._lock:
+            if query in self._entries:
+                self._forget(query)
+            self._entries[query] = (signature, now, copy.deepcopy(state))
+            self._by_tickers.setdefault(signature.tickers, []).append(query)
+            self.stats["stored"] += 1
+            while len(self._entries) > self.max_size:
+                self._forget(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_tickers.clear()
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            query, (_, stored_at, _) = next(iter(self._entries.items()))
+            if now - stored_at < self.max_age:
+                return
+            self._forget(query)
+
+    def _forget(self, query: str) -> None:
+        signature = self._entries.pop(query)[0]
+        bucket = self._by_tickers[signature.tickers]
+        bucket.remove(query)
+        if not bucket:
+            del self._by_tickers[signature.tickers]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def answer_store_from_env() -> Optional[AnswerStore]:
+    """AnswerStore when WORKFLOW_REUSE is enabled (off by default), sized by
+    WORKFLOW_REUSE_MAX_AGE (seconds), WORKFLOW_REUSE_MIN_SIMILARITY and
+    WORKFLOW_REUSE_SIZE"""
+    if os.getenv("WORKFLOW_REUSE", "0").lower() not in ("1", "true", "yes", "on"):
+        return None
+    return AnswerStore(
+        max_size=int(os.getenv("WORKFLOW_REUSE_SIZE", "1000")),
+        max_age=float(os.getenv("WORKFLOW_REUSE_MAX_AGE", "3600")),
+        min_similarity=float(os.getenv("WORKFLOW_REUSE_MIN_SIMILARITY", "0.8")),
+    )
@@ -1,25 +1,204 @@
 import re
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import REDACTIONS
+
+
+# Sensitive-data patterns: name -> (regex, literals the text must contain for
+# the pattern to possibly match, or None). Regexes must only use
+# non-capturing groups; they are combined into one alternation with a named
+# group per pattern. Earlier entries win when two matches start at the same
+# position (entries starting with \b before the others).
+REDACTION_PATTERNS: Dict[str, Tuple[str, Optional[Tuple[str, ...]]]] = {
+    "credit_card": (r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b", tuple("0123456789")),
+    "api_key": (r"\b(?:sk-[A-Za-z0-9_-]{20,}|AIza[0-9A-Za-z_-]{35}|gh[pousr]_[A-Za-z0-9]{36,}|AKIA[0-9A-Z]{16})\b",
+                ("sk-", "AIza", "gh", "AKIA")),
+    "email": (r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b", ("@",)),
+    "ssn": (r"\b\d{3}-\d{2}-\d{4}\b", ("-",)),
+    "iban": (r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?\b", tuple("0123456789")),
+    # Country code, then digit groups with separators (so "+2500000" is an amount, not a number)
+    "phone": (r"\+\d{1,3}[ -](?:\(\d{1,4}\)[ -]?)?\d{1,4}(?:[ .-]\d{2,4}){1,4}\b", ("+",)),
+}
+
+# Compiled regexes, one per pattern: the list OutputFilter.SENSITIVE_PATTERNS
+# used to be, kept for existing callers (validators below are not applied)
+SENSITIVE_PATTERNS: List["re.Pattern"] = [re.compile(regex) for regex, _ in REDACTION_PATTERNS.values()]
+
+# Lengths of IBANs by country (ISO 13616 registry)
+IBAN_LENGTHS = {
+    "AD": 24, "AE": 23, "AL": 28, "AT": 20, "AZ": 28, "BA": 20, "BE": 16, "BG": 22, "BH": 22, "BR": 29,
+    "BY": 28, "CH": 21, "CR": 22, "CY": 28, "CZ": 24, "DE": 22, "DK": 18, "DO": 28, "EE": 20, "EG": 29,
+    "ES": 24, "FI": 18, "FO": 18, "FR": 27, "GB": 22, "GE": 22, "GI": 23, "GL": 18, "GR": 27, "GT": 28,
+    "HR": 21, "HU": 28, "IE": 22, "IL": 23, "IQ": 23, "IS": 26, "IT": 27, "JO": 30, "KW": 30, "KZ": 20,
+    "LB": 28, "LC": 32, "LI": 21, "LT": 20, "LU": 20, "LV": 21, "MC": 27, "MD": 24, "ME": 22, "MK": 19,
+    "MR": 27, "MT": 31, "MU": 30, "NL": 18, "NO": 15, "PK": 24, "PL": 28, "PS": 29, "PT": 25, "QA": 29,
+    "RO": 24, "RS": 22, "SA": 24, "SC": 31, "SE": 24, "SI": 19, "SK": 24, "SM": 27, "ST": 25, "SV": 28,
+    "TL": 23, "TN": 24, "TR": 26, "UA": 29, "VA": 22, "VG": 24, "XK": 20,
+}
+
+
+def valid_iban(text: str) -> bool:
+    """Known country, that country's length and a valid mod-97 checksum
+    (rules out look-alikes such as ISINs)"""
+    iban = text.replace(" ", "")
+    if IBAN_LENGTHS.get(iban[:2]) != len(iban):
+        return False
+    digits = "".join(str(int(c, 36)) for c in iban[4:] + iban[:4])
+    return int(digits) % 97 == 1
+
+
+def valid_phone(text: str) -> bool:
+    """8 to 15 digits in all, as in E.164 numbers"""
+    return 8 <= sum(c.isdigit() for c in text) <= 15
+
+
+# Checks a regex match must also pass to be redacted
+VALIDATORS: Dict[str, Callable[[str], bool]] = {"iban": valid_iban, "phone": valid_phone}
+
+REDACTED = "[REDACTED]"
+
+
+@lru_cache(maxsize=64)
+def _combined(patterns: Tuple[Tuple[str, str], ...]) -> "re.Pattern":
+    """One alternation regex with a named group per pattern.
+
+    Patterns starting with \\b share a single boundary check, so positions
+    inside words are rejected once rather than once per pattern.
+    """
+    bounded = [f"(?P<{name}>{regex[2:]})" for name, regex in patterns if regex.startswith(r"\b")]
+    branches = [f"(?P<{name}>{regex})" for name, regex in patterns if not regex.startswith(r"\b")]
+    if bounded:
+        branches.insert(0, r"\b(?:" + "|".join(bounded) + ")")
+    return re.compile("|".join(branches))
 
 
 class OutputFilter:
     """Minimal output filtering to reduce accidental leakage of sensitive data
     and prevent overly long outputs from impacting performance.
+
+    All patterns are applied in a single pass of one combined regex. Patterns
+    whose required literals are absent from the text are left out of that
+    regex, so clean text is mostly scanned at `str.__contains__` speed.
+    Compiled regexes are shared between instances; use the module-level
+    `output_filter` rather than constructing one per call.
     """
 
-    SENSITIVE_PATTERNS = [
-        re.compile(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b"),  # credit card-like
-        re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"),  # email
-        re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),  # SSN-like
-    ]
+    SENSITIVE_PATTERNS = SENSITIVE_PATTERNS
 
-    def __init__(self, max_len: int = 10000):
+    def __init__(self, max_len: int = 10000, patterns: Optional[Dict[str, Tuple[str, Optional[Tuple[str, ...]]]]] = None):
         self.max_len = max_len
+        if patterns is None and self.SENSITIVE_PATTERNS is not SENSITIVE_PATTERNS:
+            # Subclass still overriding the compiled-regex list
+            patterns = {f"pattern_{i}": (regex.pattern, None) for i, regex in enumerate(self.SENSITIVE_PATTERNS)}
+        self.patterns = dict(patterns if patterns is not None else REDACTION_PATTERNS)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {name: 0 for name in self.patterns}
 
     def filter_output(self, content: str) -> str:
-        text = content or ""
-        for pattern in self.SENSITIVE_PATTERNS:
-            text = pattern.sub("[REDACTED]", text)
+        return self.truncate(self.redact(content or ""))
+
+    def redact(self, text: str) -> str:
+        """Replace every sensitive match with [REDACTED] (no truncation)"""
+        regex = self._regex_for(text)
+        if regex is None:
+            return text
+        counts: Dict[str, int] = {}
+        text = regex.sub(lambda m: self._replace(m, counts), text)
+        self._count(counts)
+        return text
+
+    def truncate(self, text: str) -> str:
         if len(text) > self.max_len:
             text = text[: self.max_len - 50] + "\n...[TRUNCATED]"
         return text
 
+    def stream(self, holdback: int = 64) -> "StreamingRedactor":
+        """Redactor for text arriving in chunks (e.g. streamed LLM tokens)"""
+        return StreamingRedactor(self, holdback)
+
+    def match_counts(self) -> Dict[str, int]:
+        """Redactions per pattern since this filter was created"""
+        with self._lock:
+            return dict(self.stats)
+
+    def _regex_for(self, text: str) -> Optional["re.Pattern"]:
+        """Combined regex of the patterns that can match `text`"""
+        active = tuple(
+            (name, regex) for name, (regex, required) in self.patterns.items()
+            if required is None or any(literal in text for literal in required)
+        )
+        return _combined(active) if active else None
+
+    @staticmethod
+    def _replace(match: "re.Match", counts: Dict[str, int]) -> str:
+        validator = VALIDATORS.get(match.lastgroup)
+        if validator is not None and not validator(match.group()):
+            return match.group()
+        counts[match.lastgroup] = counts.get(match.lastgroup, 0) + 1
+        return REDACTED
+
+    def _count(self, counts: Dict[str, int]) -> None:
+        if not counts:
+            return
+        with self._lock:
+            for name, count in counts.items():
+                self.stats[name] += count
+        for name, count in counts.items():
+            REDACTIONS.inc(count, pattern=name)
+
+
+class StreamingRedactor:
+    """Incremental redaction for chunked text.
+
+    feed() returns the part of the input that can no longer change: the last
+    `holdback` characters (and any match reaching into them) are kept back
+    because a sensitive value may still be completing. Text is released once
+    at least `holdback` characters beyond that tail have accumulated, so
+    tiny chunks are scanned in batches. flush() releases the rest at the end
+    of the stream. Concatenated output equals redacting the
+    whole text at once for matches up to `holdback` characters long.
+    """
+
+    def __init__(self, output_filter: OutputFilter, holdback: int = 64):
+        self.filter = output_filter
+        self.holdback = holdback
+        self._pending = ""
+        # Last emitted character, kept so \b at the start of _pending sees it
+        self._context = ""
+
+    def feed(self, chunk: str) -> str:
+        self._pending += chunk
+        if len(self._pending) < 2 * self.holdback:
+            return ""
+        return self._emit(len(self._pending) - self.holdback)
+
+    def flush(self) -> str:
+        return self._emit(len(self._pending))
+
+    def _emit(self, cut: int) -> str:
+        text = self._context + self._pending
+        offset = len(self._context)
+        cut += offset
+        regex = self.filter._regex_for(text)
+        pieces, position, counts = [], offset, {}
+        if regex is not None:
+            for match in regex.finditer(text, offset):
+                if match.end() > cut:
+                    # Still completing (or could grow): hold it back whole
+                    cut = min(cut, match.start())
+                    break
+                pieces.append(text[position:match.start()])
+                pieces.append(OutputFilter._replace(match, counts))
+                position = match.end()
+        pieces.append(text[position:cut])
+        self.filter._count(counts)
+        if cut > offset:
+            self._context = text[cut - 1]
+        self._pending = text[cut:]
+        return "".join(pieces)
+
+
+# Shared instance used by the agents and the UI
+output_filter = OutputFilter()
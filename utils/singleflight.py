@@ -0,0 +1,99 @@
+import asyncio
+import os
+import threading
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable, ContextManager, Dict, Hashable, Optional, Tuple
+
+from utils.metrics import SINGLEFLIGHT_COALESCED
+
+
+def singleflight_enabled() -> bool:
+    """Coalescing is on unless SINGLEFLIGHT=0"""
+    return os.getenv("SINGLEFLIGHT", "1").lower() not in ("0", "false", "no", "off")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight wait for it and get the same result, or the same
+    exception. Nothing is kept once the call finishes, so this dedupes
+    only in-flight work; caching stays with the callers. Threads share
+    calls through do() and coroutines on the same event loop through ado().
+    `on_join` returns a context manager wrapped around a joining caller's
+    wait, e.g. a tracing span so the wait shows up on that caller's trace.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}  # keyed by (event loop, key)
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           on_join: Optional[Callable[[], ContextManager]] = None) -> Any:
+        if not singleflight_enabled():
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._count(leader)
+        if not leader:
+            with (on_join or nullcontext)():
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: Hashable, factory: Callable[[], Awaitable[Any]],
+                  on_join: Optional[Callable[[], ContextManager]] = None) -> Any:
+        if not singleflight_enabled():
+            return await factory()
+        loop = asyncio.get_running_loop()
+        flight = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(flight)
+            leader = task is None
+            if leader:
+                # The task runs in the leader's context, so its spans land on the leader's trace
+                task = self._tasks[flight] = loop.create_task(factory())
+                task.add_done_callback(lambda done: self._forget(flight, done))
+            self._count(leader)
+        # Shielded: a cancelled caller leaves the call running for the others
+        if leader:
+            return await asyncio.shield(task)
+        with (on_join or nullcontext)():
+            return await asyncio.shield(task)
+
+    def _forget(self, flight: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(flight) is task:
+                del self._tasks[flight]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller was cancelled
+
+    def _count(self, leader: bool) -> None:
+        self.stats["calls"] += 1
+        if not leader:
+            self.stats["coalesced"] += 1
+            SINGLEFLIGHT_COALESCED.inc(call=self.name)
@@ -0,0 +1,28 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+
+# Callback receiving LLM token chunks for the code currently running; set by
+# the workflow only while streaming so plain runs keep using llm.invoke
+_token_sink: ContextVar[Optional[Callable[[str], None]]] = ContextVar("token_sink", default=None)
+
+
+@contextmanager
+def token_sink(callback: Optional[Callable[[str], None]]):
+    """Route LLM token chunks produced inside the block to `callback`"""
+    token = _token_sink.set(callback)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+
+def current_token_sink() -> Optional[Callable[[str], None]]:
+    return _token_sink.get()
+
+
+def chunk_text(chunk) -> str:
+    """Text of a streamed chunk (AIMessageChunk, plain string, ...)"""
+    content = getattr(chunk, "content", chunk)
+    return content if isinstance(content, str) else ""
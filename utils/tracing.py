@@ -0,0 +1,148 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from utils.metrics import observe_event
+
+# Trace of the workflow run the current code belongs to; set per node by the
+# workflow so agents and tools can record timings without extra plumbing
+_current_trace: ContextVar[Optional["RunTrace"]] = ContextVar("run_trace", default=None)
+
+
+class RunTrace:
+    """Timing events of one workflow run plus their aggregated breakdown.
+
+    Events are (kind, name, fields) records: "node" for graph nodes, "llm"
+    for model calls, "tool" for tool calls, "cache" for cache lookups and
+    "context" for prompt budgeting (tokens before/after, see utils.context).
+    Every event also feeds the exported metrics (utils.metrics); when
+    `emit` is set it is logged through structlog as well.
+    """
+
+    def __init__(self, emit: bool = False):
+        self.emit = emit
+        self.started = time.perf_counter()
+        self.events = []
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, name: str, **fields: Any) -> None:
+        with self._lock:
+            self.events.append({"kind": kind, "name": name, **fields})
+        observe_event(kind, name, fields)
+        if self.emit:
+            get_logger().info(kind, name=name, **fields)
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-run breakdown: node, LLM and tool wall times, token counts, cache
+        hits and the prompt tokens saved by context budgeting"""
+        summary = {
+            "total_ms": _ms(time.perf_counter() - self.started),
+            "nodes": {},
+            "llm": {"calls": 0, "coalesced": 0, "total_ms": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+                    "by_agent": {}},
+            "tools": {},
+            "cache": {},
+            "context": {"tokens_before": 0, "tokens_after": 0, "tokens_saved": 0, "by_agent": {}},
+        }
+        with self._lock:
+            events = list(self.events)
+
+        for event in events:
+            kind, name = event["kind"], event["name"]
+            if kind == "node":
+                _add_timing(summary["nodes"], name, event)
+            elif kind == "tool":
+                _add_timing(summary["tools"], name, event)
+            elif kind == "llm":
+                llm = summary["llm"]
+                agent = llm["by_agent"].setdefault(
+                    name, {"calls": 0, "coalesced": 0, "total_ms": 0.0, "prompt_tokens": 0, "completion_tokens": 0})
+                for totals in (llm, agent):
+                    totals["calls"] += 1
+                    totals["coalesced"] += 1 if event.get("coalesced") else 0
+                    totals["total_ms"] = round(totals["total_ms"] + event.get("duration_ms", 0.0), 3)
+                    totals["prompt_tokens"] += event.get("prompt_tokens", 0)
+                    totals["completion_tokens"] += event.get("completion_tokens", 0)
+            elif kind == "cache":
+                counts = summary["cache"].setdefault(name, {"hits": 0, "misses": 0})
+                counts["hits" if event.get("hit") else "misses"] += 1
+            elif kind == "context":
+                context = summary["context"]
+                agent = context["by_agent"].setdefault(
+                    name, {"tokens_before": 0, "tokens_after": 0, "tokens_saved": 0})
+                for totals in (context, agent):
+                    totals["tokens_before"] += event.get("tokens_before", 0)
+                    totals["tokens_after"] += event.get("tokens_after", 0)
+                    totals["tokens_saved"] = totals["tokens_before"] - totals["tokens_after"]
+        return summary
+
+
+def get_logger():
+    """structlog logger for workflow events (structlog is imported on first use)"""
+    import structlog
+
+    return structlog.get_logger("workflow")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _add_timing(bucket: Dict[str, Dict[str, Any]], name: str, event: Dict[str, Any]) -> None:
+    totals = bucket.setdefault(name, {"calls": 0, "total_ms": 0.0})
+    totals["calls"] += 1
+    totals["total_ms"] = round(totals["total_ms"] + event.get("duration_ms", 0.0), 3)
+
+
+@contextmanager
+def use_trace(trace: Optional[RunTrace]):
+    """Make `trace` the active run trace inside the block"""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> Optional[RunTrace]:
+    return _current_trace.get()
+
+
+def record(kind: str, name: str, **fields: Any) -> None:
+    """Record an event on the active trace (no-op outside a traced run)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(kind, name, **fields)
+
+
+@contextmanager
+def span(kind: str, name: str, **fields: Any):
+    """Time the block and record it as one event.
+
+    Yields the event's field dict so the block can attach results (e.g.
+    token counts). Outside a traced run nothing is timed or recorded.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield fields
+        return
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException:
+        fields["error"] = True
+        raise
+    finally:
+        trace.record(kind, name, duration_ms=_ms(time.perf_counter() - start), **fields)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for models that report no usage"""
+    return (len(text) + 3) // 4
+
+
+def estimate_prompt_tokens(messages) -> int:
+    """estimate_tokens() over the contents of a chat message list"""
+    return estimate_tokens("".join(str(getattr(m, "content", "")) for m in messages))
@@ -0,0 +1,240 @@
+import atexit
+import os
+import queue
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from utils.metrics import FILE_BYTES_WRITTEN
+from utils.tracing import get_logger
+
+
+def atomic_write(path: Path, data: bytes, fsync: bool = True) -> None:
+    """Replace `path` with `data` via a temp file in the same directory and
+    a rename, so readers never see a partially written file"""
+    tmp = _write_temp(path, data)
+    try:
+        if fsync:
+            _fsync_path(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        _discard(tmp)
+        raise
+    if fsync:
+        _fsync_dir(path.parent)
+
+
+def _write_temp(path: Path, data: bytes) -> str:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+    except BaseException:
+        _discard(tmp)
+        raise
+    return tmp
+
+
+def _fsync_path(path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Makes renames durable; not supported on every platform (e.g. Windows)
+    try:
+        _fsync_path(directory)
+    except OSError:
+        pass
+
+
+def _discard(tmp: str) -> None:
+    try:
+        os.unlink(tmp)
+    except OSError:
+        pass
+
+
+class _Pending:
+    """Coalesced operations on one file within a batch"""
+
+    def __init__(self, mode: str):
+        self.mode = mode  # "write" (replace the file) or "append"
+        self.chunks: List[bytes] = []
+        self.ops: List[Tuple[str, int, Future]] = []  # (metric action, bytes, future)
+
+
+class ReportWriter:
+    """Background writer for report files.
+
+    write() and append() queue the operation and return a Future right away;
+    a single worker thread drains the queue in batches. Within a batch,
+    operations on the same file are coalesced (a write followed by appends
+    becomes one write, consecutive appends one append), whole-file writes go
+    through a temp file and rename, and all files touched by the batch are
+    fsynced together. flush() waits for everything queued so far; close()
+    also stops the worker, and runs automatically at interpreter exit.
+    """
+
+    def __init__(self, max_batch: int = 64, fsync: bool = True):
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {"operations": 0, "batches": 0, "files_written": 0, "errors": 0}
+
+    def write(self, path: Path, content: str, action: str = "write") -> Future:
+        """Queue replacing `path` with `content`"""
+        return self._submit("write", path, content, action)
+
+    def append(self, path: Path, content: str, action: str = "append") -> Future:
+        """Queue appending `content` to `path` (created if missing)"""
+        return self._submit("append", path, content, action)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every operation queued so far is on disk; False on timeout"""
+        with self._lock:
+            worker = self._worker
+            if worker is None:
+                return True
+            if self._closed or not worker.is_alive():
+                # No marker would ever be answered; the worker only drains
+                # what is left before it exits
+                marker = None
+            else:
+                marker = Future()
+                self._queue.put(("flush", None, b"", "", marker))
+        if marker is None:
+            worker.join(timeout)
+            return not worker.is_alive()
+        try:
+            marker.result(timeout)
+            return True
+        except (TimeoutError, FuturesTimeoutError):
+            return False
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush and stop the worker; later writes raise RuntimeError"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+            if worker is not None:
+                self._queue.put(None)
+        if worker is not None:
+            worker.join(timeout)
+
+    def _submit(self, mode: str, path: Path, content: str, action: str) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ReportWriter is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name="report-writer", daemon=True)
+                self._worker.start()
+                atexit.register(self.close)
+            self._queue.put((mode, Path(path), content.encode("utf-8"), action, future))
+        return future
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[tuple]) -> None:
+        pending: "OrderedDict[Path, _Pending]" = OrderedDict()
+        markers = []
+        for mode, path, data, action, future in batch:
+            if mode == "flush":
+                markers.append(future)
+                continue
+            entry = pending.get(path)
+            if entry is None:
+                entry = pending[path] = _Pending(mode)
+            elif mode == "write":
+                # Replaces whatever was queued before it in this batch; the
+                # earlier operations still complete (their content is superseded)
+                entry.mode = "write"
+                entry.chunks = []
+            entry.chunks.append(data)
+            entry.ops.append((action, len(data), future))
+
+        # Stage every file, fsync them together, then publish the renames
+        staged, done, synced_dirs = [], [], set()
+        for path, entry in pending.items():
+            try:
+                data = b"".join(entry.chunks)
+                if entry.mode == "write":
+                    staged.append((path, entry, _write_temp(path, data)))
+                else:
+                    with open(path, "ab") as f:
+                        f.write(data)
+                    staged.append((path, entry, None))
+            except Exception as e:
+                self._fail(path, entry, e)
+        for path, entry, tmp in staged:
+            try:
+                if self.fsync:
+                    _fsync_path(tmp or path)
+                if tmp is not None:
+                    os.replace(tmp, path)
+                    synced_dirs.add(path.parent)
+            except Exception as e:
+                if tmp is not None:
+                    _discard(tmp)
+                self._fail(path, entry, e)
+                continue
+            done.append(entry)
+        if self.fsync:
+            for directory in synced_dirs:
+                _fsync_dir(directory)
+        for entry in done:
+            for action, size, future in entry.ops:
+                FILE_BYTES_WRITTEN.inc(size, action=action)
+                future.set_result(size)
+        self.stats["files_written"] += len(done)
+
+        self.stats["operations"] += len(batch) - len(markers)
+        self.stats["batches"] += 1
+        for marker in markers:
+            marker.set_result(None)
+
+    def _fail(self, path: Path, entry: _Pending, error: Exception) -> None:
+        self.stats["errors"] += 1
+        get_logger().warning("report_write_failed", path=str(path), error=str(error))
+        for _, _, future in entry.ops:
+            if not future.done():
+                future.set_exception(error)
+
+
+def writer_from_env() -> Optional[ReportWriter]:
+    """ReportWriter when FILE_ASYNC_WRITES is enabled (off by default);
+    FILE_FSYNC=0 skips fsync"""
+    if os.getenv("FILE_ASYNC_WRITES", "0").lower() not in ("1", "true", "yes", "on"):
+        return None
+    return ReportWriter(fsync=os.getenv("FILE_FSYNC", "1").lower() not in ("0", "false", "no", "off"))
@@ -1,53 +1,153 @@
-from typing import Dict, Any
-from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterator, Iterable, Iterator, List, Optional
+from typing_extensions import Annotated, TypedDict
 from agents.researcher import ResearcherAgent
 from agents.analyst import AnalystAgent
 from agents.reporter import ReporterAgent
-from tools.search_tool import SearchTool
-from tools.calc_tool import CalculatorTool
-from tools.file_tool import FileTool
+from utils.cache import cache_from_env
+from utils.concurrency import StageLimiter
+from utils.llm_cache import CachedLLM
+from utils.metrics import WORKFLOW_RUN_SECONDS, WORKFLOW_RUNS
+from utils.ratelimit import LimitedLLM
+from utils.reuse import answer_store_from_env
+from utils.streaming import token_sink
+from utils.tracing import RunTrace, get_logger, span, use_trace
+from contextlib import contextmanager
+import asyncio
+import math
 import os
+import time
 from dotenv import load_dotenv
 
+# LangGraph, the Gemini client and the tools are imported where they are
+# first needed so that importing this module stays cheap
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableLambda
+    from langgraph.graph.state import CompiledStateGraph
+
 # Load environment variables
 load_dotenv()
 
 
+def _last_value(current: Any, update: Any) -> Any:
+    """Reducer for fields that parallel branches may both write: keep the latest"""
+    return update
+
+
+class WorkflowState(TypedDict, total=False):
+    """Graph state shared by all nodes.
+
+    Each field is written by exactly one node except `current_agent`, which
+    uses a reducer so concurrent branches in the parallel graph merge safely.
+    """
+    user_query: str
+    current_agent: Annotated[Optional[str], _last_value]
+    completed: bool
+    research_findings: str
+    research_summary: str
+    calculation_results: str
+    analysis_insights: str
+    final_report: str
+    save_result: str
+    # Per-run timing breakdown (see utils.tracing.RunTrace.summary), set by run()/arun()/stream()
+    timings: Dict[str, Any]
+    # Set when the answer was reused from an equivalent earlier run: {query, similarity, age_s}
+    reused_from: Dict[str, Any]
+
+
 class MultiAgentWorkflow:
-    def __init__(self, llm=None, tools=None):
+    def __init__(self, llm=None, tools=None, verbose: bool = True,
+                 stage_limits: Optional[Dict[str, int]] = None, parallel: bool = False,
+                 llm_cache=None, checkpoint_path: Optional[str] = None, answer_store=None):
         # Initialize LLM (allow injection for tests)
-        self.llm = llm or ChatGoogleGenerativeAI(
+        self.llm = llm or self._default_llm()
+
+        # Initialize tools (allow injection for tests)
+        self.tools = tools or self._default_tools()
+
+        # Structured progress and timing events (disable for batch/headless use)
+        self.verbose = verbose
+
+        # Per-stage concurrency caps shared by all agents, e.g. {"search": 4, "llm": 8}
+        self.limiter = StageLimiter(stage_limits)
+
+        # Optional LLM response cache (any get/set cache; LLM_CACHE* env vars by
+        # default, llm_cache=False to force it off)
+        if llm_cache is None:
+            llm_cache = cache_from_env("LLM", default_ttl=3600, enabled_by_default=False)
+        use_cache = llm_cache is not None and llm_cache is not False
+        # Provider rate limits (LLM_RPM/LLM_TPM/LLM_MAX_CONCURRENCY) wrap the model
+        # itself, below the cache, so cache hits never count against them
+        self.provider_llm = LimitedLLM(self.llm)
+        self.cached_llm = CachedLLM(self.provider_llm, llm_cache) if use_cache else None
+
+        # Optional reuse of recent equivalent answers (utils.reuse.AnswerStore;
+        # WORKFLOW_REUSE* env vars by default, answer_store=False to force it off)
+        if answer_store is None:
+            answer_store = answer_store_from_env()
+        self.answer_store = answer_store if answer_store is not False else None
+
+        # Initialize agents (each gets its own cache view for per-agent stats)
+        self.researcher = ResearcherAgent(self._agent_llm("researcher"), self.tools, self.limiter)
+        self.analyst = AnalystAgent(self._agent_llm("analyst"), self.tools, self.limiter)
+        self.reporter = ReporterAgent(self._agent_llm("reporter"), self.tools, self.limiter)
+
+        # Build workflow graph (parallel fan-out or the classic linear chain)
+        self.parallel = parallel
+        self.graph = self._build_parallel_graph() if parallel else self._build_graph()
+
+        # SQLite checkpointing for resumable runs (used by run(..., thread_id=...))
+        self.checkpoint_path = checkpoint_path or os.getenv("WORKFLOW_CHECKPOINT_PATH")
+        self._checkpointed_graph = None
+    
+    @staticmethod
+    def _default_llm():
+        """Gemini chat model (its client library is only imported when used)"""
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        
+        return ChatGoogleGenerativeAI(
             model="gemini-2.0-flash",
             temperature=0.3,
             google_api_key=os.getenv("GOOGLE_API_KEY")
         )
-
-        # Initialize tools (allow injection for tests)
-        self.tools = tools or [
+    
+    @staticmethod
+    def _default_tools() -> list:
+        from tools.search_tool import SearchTool
+        from tools.calc_tool import CalculatorTool
+        from tools.file_tool import FileTool
+        
+        return [
             SearchTool(),
             CalculatorTool(),
             FileTool()
         ]
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush and stop background tool work (e.g. queued report writes);
+        call at shutdown"""
+        for tool in self.tools:
+            if callable(getattr(tool, "close", None)):
+                tool.close(timeout)
 
-        # Initialize agents
-        self.researcher = ResearcherAgent(self.llm, self.tools)
-        self.analyst = AnalystAgent(self.llm, self.tools)
-        self.reporter = ReporterAgent(self.llm, self.tools)
-
-        # Build workflow graph
-        self.graph = self._build_graph()
+    def _agent_llm(self, agent: str):
+        """LLM handed to an agent: the per-agent cache view when caching is on"""
+        return self.cached_llm.for_agent(agent) if self.cached_llm else self.provider_llm
+    
+    def llm_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent LLM cache hit rates (empty when caching is off)"""
+        return self.cached_llm.stats() if self.cached_llm else {}
     
-    def _build_graph(self) -> StateGraph:
+    def _build_graph(self, checkpointer=None) -> "CompiledStateGraph":
         """Build the LangGraph workflow"""
+        from langgraph.graph import StateGraph, END
         
         # Define the state structure
-        workflow = StateGraph(dict)
+        workflow = StateGraph(WorkflowState)
         
-        # Add nodes for each agent
-        workflow.add_node("researcher", self._researcher_node)
-        workflow.add_node("analyst", self._analyst_node)
-        workflow.add_node("reporter", self._reporter_node)
+        # Add nodes for each agent (sync + async implementation each)
+        workflow.add_node("researcher", self._node("researcher", self._researcher_node, self._aresearcher_node))
+        workflow.add_node("analyst", self._node("analyst", self._analyst_node, self._aanalyst_node))
+        workflow.add_node("reporter", self._node("reporter", self._reporter_node, self._areporter_node))
         
         # Define the workflow edges (sequential execution)
         workflow.set_entry_point("researcher")
@@ -55,55 +155,377 @@ class MultiAgentWorkflow:
         workflow.add_edge("analyst", "reporter")
         workflow.add_edge("reporter", END)
         
-        return workflow.compile()
+        return workflow.compile(checkpointer=checkpointer)
     
-    def _researcher_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Researcher agent node"""
-        user_query = state.get("user_query", "")
-        print(f"🔍 Researcher Agent: Searching for information about '{user_query}'...")
+    def _build_parallel_graph(self, checkpointer=None) -> "CompiledStateGraph":
+        """Build the fan-out variant of the workflow.
+
+        After the search, the researcher's LLM summary and the analyst's
+        calculator + LLM analysis run as parallel branches and join before the
+        reporter, so only two LLM round-trips sit on the critical path.
+        """
+        from langgraph.graph import StateGraph, END
+        
+        workflow = StateGraph(WorkflowState)
+        
+        workflow.add_node("search", self._node("search", self._search_node, self._asearch_node))
+        workflow.add_node("summarize", self._node("summarize", self._summarize_node, self._asummarize_node))
+        workflow.add_node("analyst", self._node("analyst", self._parallel_analyst_node, self._aparallel_analyst_node))
+        workflow.add_node("reporter", self._node("reporter", self._reporter_node, self._areporter_node))
         
-        updated_state = self.researcher.execute(user_query, state)
+        workflow.set_entry_point("search")
+        workflow.add_edge("search", "summarize")
+        workflow.add_edge("search", "analyst")
+        # Join: the reporter waits for both branches
+        workflow.add_edge(["summarize", "analyst"], "reporter")
+        workflow.add_edge("reporter", END)
         
-        print(f"✅ Research completed. Found: {updated_state.get('research_summary', 'No summary')[:100]}...")
-        return updated_state
+        return workflow.compile(checkpointer=checkpointer)
     
-    def _analyst_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyst agent node"""
-        user_query = state.get("user_query", "")
-        print(f"📊 Analyst Agent: Analyzing data and performing calculations...")
+    def _node(self, name: str, func, afunc) -> "RunnableLambda":
+        """Wrap a node's sync/async bodies so the same graph serves invoke() and
+        ainvoke(), and emits node/token events when driven by stream()"""
+        from langchain_core.runnables import RunnableLambda
+        
+        def run(state: Dict[str, Any]) -> Dict[str, Any]:
+            with self._node_scope(name):
+                return func(state)
+        
+        async def arun(state: Dict[str, Any]) -> Dict[str, Any]:
+            with self._node_scope(name):
+                return await afunc(state)
         
-        updated_state = self.analyst.execute(user_query, state)
+        return RunnableLambda(run, afunc=arun, name=name)
+    
+    @contextmanager
+    def _node_scope(self, name: str):
+        """Activate the run's trace and token sink for one node and time it"""
+        from langgraph.config import get_config
+        
+        configurable = get_config().get("configurable", {})
+        with use_trace(configurable.get("run_trace")), \
+                token_sink(self._token_writer(name, configurable)), \
+                span("node", name):
+            yield
+    
+    def _token_writer(self, node: str, configurable: Dict[str, Any]):
+        """When driven by stream(), announce `node` and return its token callback"""
+        if not configurable.get("stream_tokens"):
+            return None
+        from langgraph.config import get_stream_writer
         
-        print(f"✅ Analysis completed. Insights: {updated_state.get('analysis_insights', 'No insights')[:100]}...")
-        return updated_state
+        writer = get_stream_writer()
+        writer({"type": "node_start", "node": node})
+        return lambda text: writer({"type": "token", "node": node, "content": text})
+    
+    def _researcher_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Researcher agent node"""
+        return self.researcher.execute(state.get("user_query", ""), state)
+    
+    def _analyst_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyst agent node"""
+        return self.analyst.execute(state.get("user_query", ""), state)
     
     def _reporter_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Reporter agent node"""
+        return self.reporter.execute(state.get("user_query", ""), state)
+    
+    async def _aresearcher_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Researcher agent node (async)"""
+        return await self.researcher.aexecute(state.get("user_query", ""), state)
+    
+    async def _aanalyst_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyst agent node (async)"""
+        return await self.analyst.aexecute(state.get("user_query", ""), state)
+    
+    async def _areporter_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Reporter agent node (async)"""
+        return await self.reporter.aexecute(state.get("user_query", ""), state)
+    
+    # Parallel graph nodes return only the fields they own so that
+    # concurrent branches never write the same key
+    
+    def _search_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Search step of the researcher (parallel graph)"""
         user_query = state.get("user_query", "")
-        print(f"📝 Reporter Agent: Generating final report...")
-        
-        updated_state = self.reporter.execute(user_query, state)
-        
-        print(f"✅ Report generated and saved: {updated_state.get('save_result', 'Not saved')}")
-        return updated_state
+        return {"research_findings": self.researcher.search(user_query), "current_agent": "researcher"}
     
-    def run(self, user_query: str) -> Dict[str, Any]:
-        """Execute the multi-agent workflow"""
-        print(f"\n🚀 Starting Multi-Agent Analysis for: '{user_query}'\n")
-        
-        # Initial state
-        initial_state = {
+    async def _asearch_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        user_query = state.get("user_query", "")
+        return {"research_findings": await self.researcher.asearch(user_query), "current_agent": "researcher"}
+    
+    def _summarize_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Summary step of the researcher (parallel graph)"""
+        summary = self.researcher.summarize(state.get("user_query", ""), state.get("research_findings", ""))
+        return {"research_summary": summary, "current_agent": "researcher"}
+    
+    async def _asummarize_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        summary = await self.researcher.asummarize(state.get("user_query", ""), state.get("research_findings", ""))
+        return {"research_summary": summary, "current_agent": "researcher"}
+    
+    def _parallel_analyst_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyst working from the raw findings only (parallel graph)"""
+        user_query = state.get("user_query", "")
+        findings = state.get("research_findings", "")
+        calculation_results = self.analyst.calculate(user_query, findings)
+        insights = self.analyst.analyze(user_query, findings, "", calculation_results)
+        return {"calculation_results": calculation_results, "analysis_insights": insights, "current_agent": "analyst"}
+    
+    async def _aparallel_analyst_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        user_query = state.get("user_query", "")
+        findings = state.get("research_findings", "")
+        calculation_results = await self.analyst.acalculate(user_query, findings)
+        insights = await self.analyst.aanalyze(user_query, findings, "", calculation_results)
+        return {"calculation_results": calculation_results, "analysis_insights": insights, "current_agent": "analyst"}
+    
+    def _log(self, event: str, **fields: Any) -> None:
+        """Emit a structured progress event unless running quietly"""
+        if self.verbose:
+            get_logger().info(event, **fields)
+    
+    @contextmanager
+    def _traced_run(self, user_query: str):
+        """Open the timing trace for one run (events are only logged when
+        verbose) and count the run as failed if the block raises"""
+        self._log("run_start", query=user_query)
+        trace = RunTrace(emit=self.verbose)
+        try:
+            yield trace
+        except Exception as e:
+            WORKFLOW_RUNS.inc(status="error")
+            WORKFLOW_RUN_SECONDS.observe(time.perf_counter() - trace.started)
+            self._log("run_failed", error=str(e))
+            raise
+    
+    def _finish_trace(self, final_state: Dict[str, Any], trace: RunTrace) -> Dict[str, Any]:
+        """Store the run's timing breakdown on the final state"""
+        final_state["timings"] = trace.summary()
+        if self.answer_store is not None and final_state.get("completed") and "reused_from" not in final_state:
+            self.answer_store.store(final_state["user_query"], final_state)
+        WORKFLOW_RUNS.inc(status="ok")
+        WORKFLOW_RUN_SECONDS.observe(final_state["timings"]["total_ms"] / 1000)
+        self._log("run_end", total_ms=final_state["timings"]["total_ms"])
+        return final_state
+    
+    def _reused_state(self, user_query: str, reuse: bool, trace: RunTrace) -> Optional[Dict[str, Any]]:
+        """Final state of a recent equivalent run when reuse is on and allowed
+        for this call, else None (the graph runs)"""
+        if not reuse or self.answer_store is None:
+            return None
+        with use_trace(trace):
+            hit = self.answer_store.lookup(user_query)
+        if hit is None:
+            return None
+        self._log("run_reused", reused_query=hit.query, similarity=round(hit.similarity, 3), age_s=round(hit.age_s, 1))
+        state = hit.state
+        state["user_query"] = user_query
+        state["reused_from"] = {"query": hit.query, "similarity": round(hit.similarity, 3), "age_s": round(hit.age_s, 1)}
+        return state
+    
+    def _initial_state(self, user_query: str) -> Dict[str, Any]:
+        """Build the initial graph state for a query"""
+        return {
             "user_query": user_query,
             "current_agent": None,
             "completed": False
         }
+    
+    def run(self, user_query: str, thread_id: Optional[str] = None, resume: bool = True,
+            rerun_from: Optional[str] = None, reuse: bool = True) -> Dict[str, Any]:
+        """Execute the multi-agent workflow.
+
+        With a `thread_id` (requires checkpoint_path / WORKFLOW_CHECKPOINT_PATH)
+        every completed node is checkpointed to SQLite. Running the same query
+        on the same thread again then resumes instead of starting over: an
+        interrupted or failed run continues after its last completed node, a
+        finished run is returned as-is, and `rerun_from="reporter"` (any node
+        name) re-executes only that node and everything downstream of it.
+        Pass resume=False to start the thread from scratch.
+
+        When an answer store is configured (WORKFLOW_REUSE=1), a recent run
+        of an equivalent query is returned instead of running the agents;
+        reuse=False bypasses it. Checkpointed runs never reuse.
+        """
+        with self._traced_run(user_query) as trace:
+            if thread_id is None:
+                final_state = self._reused_state(user_query, reuse, trace)
+                if final_state is None:
+                    # Run the workflow
+                    final_state = self.graph.invoke(self._initial_state(user_query),
+                                                    {"configurable": {"run_trace": trace}})
+            else:
+                final_state = self._run_checkpointed(user_query, thread_id, resume, rerun_from, trace)
+            
+            return self._finish_trace(final_state, trace)
+    
+    def _run_checkpointed(self, user_query: str, thread_id: str, resume: bool,
+                          rerun_from: Optional[str], trace: RunTrace) -> Dict[str, Any]:
+        graph = self._get_checkpointed_graph()
+        config = {"configurable": {"thread_id": thread_id, "run_trace": trace}}
+        snapshot = graph.get_state(config)
         
-        # Run the workflow
-        final_state = self.graph.invoke(initial_state)
+        if not (resume and snapshot.values.get("user_query") == user_query):
+            return graph.invoke(self._initial_state(user_query), config)
         
-        print(f"\n🎉 Multi-Agent Analysis Complete!\n")
+        if rerun_from:
+            predecessors = self._predecessors().get(rerun_from)
+            if predecessors is None:
+                # Entry node (or unknown name): nothing upstream to reuse
+                if rerun_from not in self.graph.nodes:
+                    raise ValueError(f"Unknown node '{rerun_from}'")
+                return graph.invoke(self._initial_state(user_query), config)
+            self._log("checkpoint_rerun", thread_id=thread_id, node=rerun_from)
+            # Mark the upstream nodes as just completed so the graph continues from rerun_from
+            for node in predecessors:
+                graph.update_state(config, {}, as_node=node)
+            return graph.invoke(None, config)
         
-        return final_state
+        if snapshot.next:
+            self._log("checkpoint_resume", thread_id=thread_id, next=list(snapshot.next))
+            return graph.invoke(None, config)
+        
+        self._log("checkpoint_hit", thread_id=thread_id)
+        return dict(snapshot.values)
+    
+    def _predecessors(self) -> Dict[str, List[str]]:
+        """Nodes whose completion triggers each non-entry node"""
+        if self.parallel:
+            return {"summarize": ["search"], "analyst": ["search"], "reporter": ["summarize", "analyst"]}
+        return {"analyst": ["researcher"], "reporter": ["analyst"]}
+    
+    def _get_checkpointed_graph(self):
+        """Compile (once) the graph with a SQLite checkpointer"""
+        if self._checkpointed_graph is None:
+            if not self.checkpoint_path:
+                raise ValueError("Checkpointing is not configured: pass checkpoint_path or set WORKFLOW_CHECKPOINT_PATH")
+            import sqlite3
+            from pathlib import Path
+            from langgraph.checkpoint.sqlite import SqliteSaver
+            
+            Path(self.checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
+            checkpointer = SqliteSaver(sqlite3.connect(self.checkpoint_path, check_same_thread=False))
+            build = self._build_parallel_graph if self.parallel else self._build_graph
+            self._checkpointed_graph = build(checkpointer)
+        return self._checkpointed_graph
+    
+    async def arun(self, user_query: str, reuse: bool = True) -> Dict[str, Any]:
+        """Execute the multi-agent workflow asynchronously.
+
+        Every LLM call and tool call is awaited, so many queries can be in
+        flight in one process (e.g. via asyncio.gather).
+        """
+        with self._traced_run(user_query) as trace:
+            final_state = self._reused_state(user_query, reuse, trace)
+            if final_state is None:
+                final_state = await self.graph.ainvoke(self._initial_state(user_query),
+                                                       {"configurable": {"run_trace": trace}})
+            
+            return self._finish_trace(final_state, trace)
+    
+    def stream(self, user_query: str, reuse: bool = True) -> Iterator[Dict[str, Any]]:
+        """Execute the workflow, yielding events as they happen.
+
+        Events are dicts with a "type":
+        - node_start: {"node"} when a node begins
+        - token: {"node", "content"} for each LLM token chunk
+        - node_end: {"node", "update"} with the fields the node produced
+        - final: {"state"} once, with the final state (including timings)
+
+        A reused answer (see run()) produces only the final event.
+        """
+        with self._traced_run(user_query) as trace:
+            final_state = self._reused_state(user_query, reuse, trace)
+            if final_state is not None:
+                yield {"type": "final", "state": self._finish_trace(final_state, trace)}
+                return
+            for mode, payload in self.graph.stream(self._initial_state(user_query),
+                                                   {"configurable": {"stream_tokens": True, "run_trace": trace}},
+                                                   stream_mode=["custom", "updates", "values"]):
+                if mode == "custom":
+                    yield payload
+                elif mode == "updates":
+                    for node, update in payload.items():
+                        yield {"type": "node_end", "node": node, "update": update}
+                else:
+                    final_state = payload
+            yield {"type": "final", "state": self._finish_trace(final_state, trace)}
+    
+    async def astream(self, user_query: str, reuse: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Async variant of stream()"""
+        with self._traced_run(user_query) as trace:
+            final_state = self._reused_state(user_query, reuse, trace)
+            if final_state is not None:
+                yield {"type": "final", "state": self._finish_trace(final_state, trace)}
+                return
+            async for mode, payload in self.graph.astream(self._initial_state(user_query),
+                                                          {"configurable": {"stream_tokens": True, "run_trace": trace}},
+                                                          stream_mode=["custom", "updates", "values"]):
+                if mode == "custom":
+                    yield payload
+                elif mode == "updates":
+                    for node, update in payload.items():
+                        yield {"type": "node_end", "node": node, "update": update}
+                else:
+                    final_state = payload
+            yield {"type": "final", "state": self._finish_trace(final_state, trace)}
+    
+    async def arun_batch(self, queries: Iterable[str], max_concurrency: int = 8,
+                         reuse: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Run many queries through the shared workflow, yielding results as they finish.
+
+        At most `max_concurrency` queries are in flight at once; `queries` is
+        consumed lazily so it may be a generator over a large file, and is read
+        in a worker thread so a slow source (e.g. stdin) does not stall the
+        queries already running. Each result is a dict with index, query, ok,
+        latency_s and either state or error.
+        """
+        query_iter = enumerate(queries)
+        read_lock = asyncio.Lock()  # iterators are not safe to advance from two threads
+        results: asyncio.Queue = asyncio.Queue()
+        
+        async def next_query():
+            async with read_lock:
+                return await asyncio.to_thread(next, query_iter, None)
+        
+        async def worker():
+            while (item := await next_query()) is not None:
+                index, query = item
+                start = time.perf_counter()
+                try:
+                    state = await self.arun(query, reuse)
+                    result = {"index": index, "query": query, "ok": True, "state": state}
+                except Exception as e:
+                    result = {"index": index, "query": query, "ok": False, "error": str(e)}
+                result["latency_s"] = time.perf_counter() - start
+                await results.put(result)
+            await results.put(None)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, max_concurrency))]
+        try:
+            remaining = len(workers)
+            while remaining:
+                result = await results.get()
+                if result is None:
+                    remaining -= 1
+                else:
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+    
+    def run_batch(self, queries: Iterable[str], max_concurrency: int = 8, reuse: bool = True) -> Dict[str, Any]:
+        """Run many queries concurrently and return ordered results plus stats"""
+        async def collect():
+            stats = BatchStats()
+            collected = []
+            async for result in self.arun_batch(queries, max_concurrency, reuse):
+                stats.add(result)
+                collected.append(result)
+            return collected, stats
+        
+        collected, stats = asyncio.run(collect())
+        collected.sort(key=lambda r: r["index"])
+        return {"results": collected, "stats": stats.summary()}
     
     def get_final_report(self, state: Dict[str, Any]) -> str:
         """Extract the final report from the state"""
@@ -116,6 +538,10 @@ class MultiAgentWorkflow:
         print("=" * 60)
         
         print(f"Query: {state.get('user_query', 'N/A')}")
+        reused = state.get('reused_from')
+        if reused:
+            print(f"♻️ Reused the answer to '{reused['query']}' from {reused['age_s']:.0f}s ago "
+                  f"(similarity {reused['similarity']:.2f})")
         print(f"\n🔍 Research Findings:")
         print(state.get('research_findings', 'No research findings'))
         
@@ -130,4 +556,49 @@ class MultiAgentWorkflow:
         # Print first 500 characters of the report
         print(final_report[:500] + "..." if len(final_report) > 500 else final_report)
         
+        timings = state.get('timings')
+        if timings:
+            print(f"\n⏱️ Timings ({timings['total_ms']:.0f} ms total):")
+            for node, node_timing in timings['nodes'].items():
+                print(f"  {node}: {node_timing['total_ms']:.0f} ms")
+            llm = timings['llm']
+            print(f"  LLM: {llm['calls']} calls, {llm['total_ms']:.0f} ms, "
+                  f"{llm['prompt_tokens']} prompt / {llm['completion_tokens']} completion tokens")
+        
         print("=" * 60)
+
+
+class BatchStats:
+    """Aggregate throughput and latency percentiles for a batch run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies: List[float] = []
+        self.failed = 0
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.latencies.append(result["latency_s"])
+        if not result.get("ok"):
+            self.failed += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        total = len(self.latencies)
+        return {
+            "total": total,
+            "succeeded": total - self.failed,
+            "failed": self.failed,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_qps": round(total / elapsed, 3) if elapsed > 0 else 0.0,
+            "p50_s": round(_percentile(self.latencies, 50), 3),
+            "p95_s": round(_percentile(self.latencies, 95), 3),
+        }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]